@@ -0,0 +1,146 @@
+"""
+Benchmark the hot paths of Game.
+
+Times generate_lucky_list, generate_lucky_number, check_guess,
+handle_wrong_guess and whole scripted rounds through
+start_new_round, for several list sizes, with input stubbed out
+and nothing shown. Results can be saved as a baseline and later runs
+compared with it to catch regressions.
+
+Run from the project directory:
+    python -m benchmarks.bench_game --save benchmarks/baseline.json
+    python -m benchmarks.bench_game --compare benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import os
+import sys
+from array import array
+from unittest.mock import patch
+from benchmarks.harness import (time_calls, summarize, print_results,
+                                save_results, compare_results)
+from game import Game, GameConfig
+from renderer import NullRenderer
+from rng import SessionRNG
+
+
+
+def make_game(list_size):
+    """
+    Return a seeded game with the given list size. The range grows
+    with the list so that large lists are not all duplicates.
+    """
+    config = GameConfig(list_size=list_size, high=max(100, list_size * 10))
+    game = Game(config, SessionRNG(list_size), renderer=NullRenderer())
+    game.reset_round()
+    return game
+
+
+def wrong_guess(game):
+    """
+    Return a number of the list that is not the lucky number,
+    or the lucky number if there is no other.
+    """
+    for number in game.lucky_list:
+        if number != game.lucky_number:
+            return number
+    return game.lucky_number
+
+
+def bench_generate_lucky_list(list_size, repeat):
+    game = make_game(list_size)
+    return time_calls(game.generate_lucky_list, repeat)
+
+
+def bench_generate_lucky_number(list_size, repeat):
+    game = make_game(list_size)
+
+    def prepare():
+        # Start from the 9 numbers of generate_lucky_list every time
+        game.lucky_list = array(game.config.typecode, game.lucky_list[:-1])
+    prepare()
+    return time_calls(game.generate_lucky_number, repeat, prepare)
+
+
+def bench_check_guess(list_size, repeat):
+    game = make_game(list_size)
+    guesses = iter(list(game.lucky_list) * (repeat // list_size + 1))
+
+    def prepare():
+        game.player_input = next(guesses)
+    return time_calls(game.check_guess, repeat, prepare)
+
+
+def bench_handle_wrong_guess(list_size, repeat):
+    game = make_game(list_size)
+
+    def prepare():
+        game.reset_round()
+        game.player_input = wrong_guess(game)
+    return time_calls(game.handle_wrong_guess, repeat, prepare)
+
+
+def bench_scripted_round(list_size, repeat):
+    game = make_game(list_size)
+
+    def answer(prompt):
+        # One wrong guess, then the lucky number
+        if game.tries_count == 1:
+            return str(wrong_guess(game))
+        return str(game.lucky_number)
+
+    with patch("builtins.input", new=answer):
+        return time_calls(game.start_new_round, repeat)
+
+
+BENCHMARKS = {
+    "generate_lucky_list": bench_generate_lucky_list,
+    "generate_lucky_number": bench_generate_lucky_number,
+    "check_guess": bench_check_guess,
+    "handle_wrong_guess": bench_handle_wrong_guess,
+    "scripted_round": bench_scripted_round,
+}
+
+
+def run(sizes, repeat):
+    """
+    Run every benchmark for every list size.
+
+    Return:
+        dict:
+            A summary for each benchmark, named "benchmark[size]".
+    """
+    results = {}
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        for name, benchmark in BENCHMARKS.items():
+            for size in sizes:
+                results[f"{name}[{size}]"] = summarize(
+                    benchmark(size, repeat))
+    return results
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--save", metavar="PATH",
+                        help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare the results with a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed median slowdown, 0.2 for 20%%")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    print_results(results)
+    if args.save:
+        save_results(results, args.save)
+        print(f"\nBaseline saved to {args.save}")
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks regressed.")
+            sys.exit(1)
@@ -0,0 +1,69 @@
+"""
+Benchmark the cost of recording metrics in Game.
+
+Plays the same scripted rounds as bench_game, once on a game
+without metrics and once on a game recording into GameMetrics,
+and prints the median slowdown of instrumenting a round.
+
+Run from the project directory:
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import contextlib
+import os
+from unittest.mock import patch
+from benchmarks.bench_game import make_game, wrong_guess
+from benchmarks.harness import time_calls, summarize, print_results
+from metrics import GameMetrics
+
+
+
+def bench_scripted_round(list_size, repeat, metrics):
+    game = make_game(list_size)
+    game.metrics = metrics
+
+    def answer(prompt):
+        # One wrong guess, then the lucky number
+        if game.tries_count == 1:
+            return str(wrong_guess(game))
+        return str(game.lucky_number)
+
+    with patch("builtins.input", new=answer):
+        return time_calls(game.start_new_round, repeat)
+
+
+def run(sizes, repeat):
+    """
+    Time scripted rounds with and without metrics.
+
+    Return:
+        dict:
+            A summary for each run, named "round[size]" or
+            "round_metrics[size]".
+    """
+    results = {}
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        for size in sizes:
+            results[f"round[{size}]"] = summarize(
+                bench_scripted_round(size, repeat, None))
+            results[f"round_metrics[{size}]"] = summarize(
+                bench_scripted_round(size, repeat, GameMetrics()))
+    return results
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--repeat", type=int, default=10000)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    print_results(results)
+    print()
+    for size in args.sizes:
+        plain = results[f"round[{size}]"]["p50_us"]
+        instrumented = results[f"round_metrics[{size}]"]["p50_us"]
+        print(f"Metrics overhead at list size {size}: "
+              f"{(instrumented / plain - 1) * 100:+.1f}% of the median round")
@@ -0,0 +1,69 @@
+"""
+Benchmark how a round scales with the list size and number range.
+
+For every size, a Game with that many numbers drawn from a range
+ten times as wide deals a round and then plays wrong guesses.
+Dealing includes drawing the list and building its index; each
+elimination step is Game.check_guess and Game.eliminate_guess,
+which removes the guess and counts the numbers left in the window.
+The shorter list is only built when it is shown, so the time to
+build it once is reported on its own.
+
+Run from the project directory:
+    python -m benchmarks.bench_scaling --max-size 100000000
+"""
+import argparse
+import time
+from game import Game, GameConfig
+
+
+
+def run(list_size, steps):
+    """
+    Deal one round of list_size numbers and time it
+    and a number of wrong guesses.
+
+    Return:
+        tuple:
+            The seconds taken to deal the round, the mean
+            seconds per elimination step and the seconds
+            taken to build the shorter list after the steps.
+    """
+    config = GameConfig(list_size=list_size, high=list_size * 10,
+                        window=list_size // 10 + 10)
+    game = Game(config)
+
+    start = time.perf_counter()
+    game.reset_round()
+    deal = time.perf_counter() - start
+
+    guesses = [num for num in game.lucky_list[:steps * 2]
+               if num != game.lucky_number][:steps]
+    start = time.perf_counter()
+    for guess in guesses:
+        game.player_input = guess
+        game.check_guess()
+        game.eliminate_guess()
+    step = (time.perf_counter() - start) / max(len(guesses), 1)
+
+    start = time.perf_counter()
+    game.shorter_lucky_list
+    shorter = time.perf_counter() - start
+    return deal, step, shorter
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--max-size", type=int, default=10_000_000)
+    parser.add_argument("--steps", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'list size':>12} {'range':>12} {'deal (s)':>10} "
+          f"{'per step (us)':>14} {'shorter list (ms)':>18}")
+    list_size = 10
+    while list_size <= args.max_size:
+        deal, step, shorter = run(list_size, args.steps)
+        print(f"{list_size:>12,} {list_size * 10:>12,} {deal:>10.4f} "
+              f"{step * 1e6:>14.2f} {shorter * 1e3:>18.3f}")
+        list_size *= 10
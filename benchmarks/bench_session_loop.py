@@ -0,0 +1,88 @@
+"""
+Benchmark the memory use of a long Game session.
+
+Plays many consecutive rounds through Game.play_session with
+scripted answers and reports the traced memory and the depth
+of the call stack as the session goes on. Both should stay
+flat no matter how many rounds are played.
+
+Run from the project directory:
+    python -m benchmarks.bench_session_loop --rounds 100000
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+from game import Game
+
+
+
+def stack_depth():
+    """
+    Return the number of frames on the current call stack.
+    """
+    depth = 0
+    frame = sys._getframe(1)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def run(rounds, report_every):
+    """
+    Play a session of the given number of rounds and
+    print the memory and stack depth along the way.
+
+    Args:
+        rounds (int): The number of rounds to play.
+        report_every (int): How many rounds between reports.
+    """
+    game = Game()
+    played = 0
+    samples = []
+
+    def answer(prompt):
+        nonlocal played
+        if prompt.startswith("Pick"):
+            # Make one wrong guess where possible, then find the number
+            if game.tries_count == 1 and game.lucky_list[0] != game.lucky_number:
+                return str(game.lucky_list[0])
+            return str(game.lucky_number)
+
+        # Asked to play again: a round has just been played
+        played += 1
+        if played % report_every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append((played, current, stack_depth()))
+        return "y" if played < rounds else "n"
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull), \
+            patch("builtins.input", new=answer):
+        try:
+            game.play_session()
+        except SystemExit:
+            pass
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{'rounds':>10} {'traced bytes':>14} {'stack depth':>12}")
+    for played_rounds, current, depth in samples:
+        print(f"{played_rounds:>10} {current:>14} {depth:>12}")
+    print(f"\n{played} rounds in {elapsed:.2f}s "
+          f"({played / elapsed:,.0f} rounds per second)")
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--report-every", type=int, default=10_000)
+    args = parser.parse_args()
+    run(args.rounds, args.report_every)
@@ -0,0 +1,110 @@
+"""
+Benchmark the memory used per live game session.
+
+Compares the bytes per session of a game keeping its state in
+an instance __dict__ with Python lists (the layout Game used to
+have), of the __slots__ based Game dealing from the thread's
+shared stream as the baseline deals from the random module, of a
+Game with its own spawned stream as the server's sessions have,
+and of a SessionStore row.
+
+Run from the project directory:
+    python -m benchmarks.bench_session_size --sessions 100000
+"""
+import argparse
+import random
+import tracemalloc
+from game import Game
+from rng import SessionRNG
+from session_store import SessionStore
+
+
+
+class DictGame:
+    """
+    A game with the attribute layout Game had before __slots__,
+    kept here as the baseline to compare against.
+    """
+    def __init__(self):
+        self.player_name = ""
+        self.player_birthdate = ""
+        self.player_age = 0
+        self.lucky_list = []
+        self.lucky_number = 0
+        self.tries_count = 1
+
+
+    def reset_round(self):
+        self.lucky_list = [random.randint(0, 100) for _ in range(9)]
+        self.lucky_number = random.randint(0, 100)
+        self.lucky_list.append(self.lucky_number)
+
+
+    def eliminate_guess(self):
+        self.lucky_list.remove(self.player_input)
+        self.shorter_lucky_list = [num for num in self.lucky_list
+                                   if abs(num - self.lucky_number) <= 10]
+
+
+def fill(game, index):
+    """
+    Give a game the state of a player in the middle of a round.
+    """
+    game.player_name = f"Player{index:06d}".replace("0", "o")
+    game.player_birthdate = "19901231"
+    game.player_age = 33
+    game.reset_round()
+    game.player_input = game.lucky_list[0]
+    game.eliminate_guess()
+    game.tries_count = 2
+    return game
+
+
+def measure(build, sessions):
+    """
+    Return the bytes allocated per session by build.
+    """
+    tracemalloc.start()
+    kept = build(sessions)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / sessions
+
+
+def build_dict_games(sessions):
+    return [fill(DictGame(), index) for index in range(sessions)]
+
+
+def build_slotted_games(sessions):
+    return [fill(Game(), index) for index in range(sessions)]
+
+
+def build_streamed_games(sessions):
+    streams = SessionRNG().spawn(sessions)
+    return [fill(Game(rng=stream), index)
+            for index, stream in enumerate(streams)]
+
+
+def build_store(sessions):
+    store = SessionStore(sessions)
+    game = Game()
+    for index in range(sessions):
+        store.save(store.allocate(), fill(game, index))
+    # The free slot list is empty once every slot is handed out,
+    # so what is left is the arrays themselves
+    return store
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'layout':<26} {'bytes per session':>18}")
+    for name, build in [("dict + lists (before)", build_dict_games),
+                        ("Game with __slots__", build_slotted_games),
+                        ("Game with its own stream", build_streamed_games),
+                        ("SessionStore row", build_store)]:
+        print(f"{name:<26} {measure(build, args.sessions):>18.1f}")
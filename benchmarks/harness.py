@@ -0,0 +1,126 @@
+"""
+Shared helpers for timing benchmarks, summarizing the timings
+and comparing them with saved baseline results.
+"""
+import json
+import time
+
+
+
+def time_calls(run, repeat, prepare=None):
+    """
+    Time a function call by call.
+
+    Args:
+        run (callable): The call to time.
+        repeat (int): How many times to call it.
+        prepare (callable): Called before every run, outside the
+            timing, to set up the state the call needs.
+
+    Return:
+        list:
+            The duration of every call in seconds.
+    """
+    timer = time.perf_counter
+    durations = []
+    for _ in range(repeat):
+        if prepare is not None:
+            prepare()
+        start = timer()
+        run()
+        durations.append(timer() - start)
+    return durations
+
+
+def percentile(sorted_values, share):
+    """
+    Return a percentile of sorted values, by nearest rank.
+
+    Args:
+        sorted_values (list): The values in ascending order.
+        share (float): The percentile as a share, 0.99 for p99.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(int(share * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(durations):
+    """
+    Summarize call durations.
+
+    Args:
+        durations (list): Call durations in seconds.
+
+    Return:
+        dict:
+            The calls per second and the 50th, 90th and 99th
+            percentiles in microseconds.
+    """
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return {
+        "ops_per_second": len(ordered) / total if total else 0.0,
+        "p50_us": percentile(ordered, 0.50) * 1e6,
+        "p90_us": percentile(ordered, 0.90) * 1e6,
+        "p99_us": percentile(ordered, 0.99) * 1e6,
+    }
+
+
+def print_results(results):
+    """
+    Print summarized results as a table.
+
+    Args:
+        results (dict): A summary for each benchmark name.
+    """
+    print(f"{'benchmark':<32} {'ops/s':>12} {'p50 us':>10} "
+          f"{'p90 us':>10} {'p99 us':>10}")
+    for name, summary in results.items():
+        print(f"{name:<32} {summary['ops_per_second']:>12,.0f} "
+              f"{summary['p50_us']:>10.2f} {summary['p90_us']:>10.2f} "
+              f"{summary['p99_us']:>10.2f}")
+
+
+def save_results(results, path):
+    """
+    Save summarized results as a JSON baseline.
+    """
+    with open(path, "w") as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+
+
+def compare_results(results, path, tolerance=0.2):
+    """
+    Compare results with a saved baseline and print the changes.
+
+    A benchmark has regressed when its median time grew by more
+    than the tolerance.
+
+    Args:
+        results (dict): The summaries of this run.
+        path (str): The baseline JSON file.
+        tolerance (float): The allowed slowdown, 0.2 for 20 %.
+
+    Return:
+        list:
+            The names of the benchmarks that regressed.
+    """
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline p50':>13} {'p50':>10} {'change':>8}")
+    for name, summary in results.items():
+        if name not in baseline or not baseline[name]["p50_us"]:
+            continue
+        before = baseline[name]["p50_us"]
+        change = summary["p50_us"] / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSED"
+        print(f"{name:<32} {before:>13.2f} {summary['p50_us']:>10.2f} "
+              f"{change:>+8.1%}{flag}")
+    return regressions
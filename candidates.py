@@ -0,0 +1,413 @@
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
+
+
+
+# The widest range of numbers indexed by a CandidateSet. Wider ranges
+# use a SortedCandidateSet, whose memory does not grow with the range.
+DENSE_RANGE_LIMIT = 4096
+
+
+
+class CandidateSet:
+    """
+    A class indexing the numbers a player can still pick in a round.
+
+    The lucky_list is kept as a bitmap with one bit set for every
+    value that is still present. Numbers drawn more than once (the
+    set is a multiset, so numbers drawn twice are counted twice) set
+    a bit in further layers of the same width, all packed in a second
+    integer that stays 0 while the list has no duplicates. Checking a
+    guess, removing a number and counting the numbers within the
+    elimination window of the lucky number are all constant time, and
+    the shorter list is read from the bitmap a machine word at a time.
+
+    Attributes:
+        low (int): The smallest value the set can hold.
+        high (int): The largest value the set can hold.
+        lucky_number (int): The lucky number of the round.
+        window (int): How far from the lucky number a number may be
+            and still stay in the shorter list.
+        window_count (int): How many numbers are left within window
+            of the lucky number, the lucky number included.
+    """
+    __slots__ = ("low", "high", "lucky_number", "window",
+                 "window_count", "_bitmap", "_extra")
+
+    def __init__(self, values, lucky_number, low=0, high=100, window=10):
+        """
+        Initialize the CandidateSet instance.
+
+        Args:
+            values (iterable): The numbers of the lucky_list.
+            lucky_number (int): The lucky number of the round.
+            low (int): The smallest value the set can hold.
+            high (int): The largest value the set can hold.
+            window (int): The elimination window of the shorter list.
+
+        Raises:
+            ValueError: If a number is outside [low, high].
+        """
+        self.low = low
+        self.high = high
+        self.lucky_number = lucky_number
+        self.window = window
+        self.window_count = 0
+        self._bitmap = 0
+        # Layer k holds the bit of a value drawn more than k + 1 times
+        self._extra = 0
+        width = high - low + 1
+        for value in values:
+            if not low <= value <= high:
+                raise ValueError(f"{value} is outside [{low}, {high}].")
+            bit = 1 << (value - low)
+            if not self._bitmap & bit:
+                self._bitmap |= bit
+            else:
+                # Set the bit in the first layer that does not have it
+                while self._extra & bit:
+                    bit <<= width
+                self._extra |= bit
+            if abs(value - lucky_number) <= window:
+                self.window_count += 1
+
+
+    def __len__(self):
+        """
+        Return how many numbers are left, duplicates included.
+        """
+        return self._bitmap.bit_count() + self._extra.bit_count()
+
+
+    def __contains__(self, value):
+        """
+        Check whether a number is still in the set.
+
+        Args:
+            value (int): The number to look for.
+
+        Return:
+            bool:
+                True if at least one copy of value is left.
+        """
+        return self.low <= value <= self.high and \
+            (self._bitmap >> (value - self.low)) & 1 == 1
+
+
+    def _extra_copies(self, offset):
+        """
+        Return how many copies beyond the first the number at
+        offset from low has, reading its bit in every layer.
+        """
+        extra = self._extra >> offset
+        width = self.high - self.low + 1
+        copies = 0
+        while extra & 1:
+            copies += 1
+            extra >>= width
+        return copies
+
+
+    def count(self, value):
+        """
+        Return how many copies of a number are left.
+        """
+        if value in self:
+            return 1 + self._extra_copies(value - self.low)
+        return 0
+
+
+    def remove(self, value):
+        """
+        Remove one copy of a number, as list.remove would.
+
+        Args:
+            value (int): The number to remove.
+
+        Return:
+            bool:
+                True if a copy was removed, False if the
+                number was not in the set.
+        """
+        if value not in self:
+            return False
+        offset = value - self.low
+        copies = self._extra_copies(offset)
+        if copies:
+            # Clear the bit of the highest layer holding the number
+            self._extra &= ~(1 << (offset + (copies - 1)
+                                   * (self.high - self.low + 1)))
+        else:
+            # The last copy is gone, clear its bit
+            self._bitmap &= ~(1 << offset)
+        if abs(value - self.lucky_number) <= self.window:
+            self.window_count -= 1
+        return True
+
+
+    def _values_between(self, first, last):
+        """
+        Return every number between first and last in ascending
+        order, each repeated as many times as it is left.
+        """
+        first = max(first, self.low)
+        last = min(last, self.high)
+        if first > last:
+            return []
+        # Cut the bits of the range out of the bitmap in one operation
+        offset = first - self.low
+        bits = (self._bitmap >> offset) & ((1 << (last - first + 1)) - 1)
+        values = []
+        while bits:
+            # Take the lowest set bit
+            lowest = bits & -bits
+            position = lowest.bit_length() - 1
+            values.append(first + position)
+            if self._extra:
+                values.extend([first + position]
+                              * self._extra_copies(offset + position))
+            bits ^= lowest
+        return values
+
+
+    def shorter_list(self):
+        """
+        Return the numbers within window of the lucky number.
+
+        Return:
+            list:
+                The shorter list in ascending order.
+        """
+        return self._values_between(self.lucky_number - self.window,
+                                    self.lucky_number + self.window)
+
+
+    def to_list(self):
+        """
+        Return every number left in ascending order.
+        """
+        return self._values_between(self.low, self.high)
+
+
+
+class SortedCandidateSet:
+    """
+    A class indexing the numbers still in play for large lucky lists.
+
+    It offers the same operations as CandidateSet, but keeps the
+    lucky_list as one sorted array and the removed numbers in a
+    small dictionary instead of a bit per possible value. Memory
+    follows the list size rather than the range, and checking or
+    removing a number is a binary search, so lists of millions of
+    numbers drawn from ranges of any size stay fast to play.
+
+    Attributes:
+        lucky_number (int): The lucky number of the round.
+        window (int): How far from the lucky number a number may be
+            and still stay in the shorter list.
+        window_count (int): How many numbers are left within window
+            of the lucky number, the lucky number included.
+    """
+    __slots__ = ("lucky_number", "window", "window_count", "_values",
+                 "_removed", "_removed_keys", "_size", "_type_min", "_type_max",
+                 "_scalar")
+
+    def __init__(self, values, lucky_number, window=10):
+        """
+        Initialize the SortedCandidateSet instance.
+
+        Args:
+            values (iterable): The numbers of the lucky_list.
+            lucky_number (int): The lucky number of the round.
+            window (int): The elimination window of the shorter list.
+        """
+        self.lucky_number = lucky_number
+        self.window = window
+        self._values = np.sort(np.asarray(values))
+        # The range of the array's type, for searching values outside it
+        info = np.iinfo(self._values.dtype)
+        self._type_min = int(info.min)
+        self._type_max = int(info.max)
+        self._scalar = self._values.dtype.type
+        # How many copies of each removed number are gone,
+        # and the removed numbers in ascending order
+        self._removed = {}
+        self._removed_keys = []
+        self._size = len(self._values)
+        first, last = self._window_bounds()
+        self.window_count = last - first
+
+
+    def _window_bounds(self):
+        """
+        Return the slice of the sorted values within the window.
+        """
+        return (self._search(self.lucky_number - self.window, "left"),
+                self._search(self.lucky_number + self.window, "right"))
+
+
+    def _search(self, value, side):
+        """
+        Return where value would be inserted in the sorted values.
+
+        Values the array's type can not hold fall before
+        or after every number instead of overflowing.
+        """
+        if value < self._type_min:
+            return 0
+        if value > self._type_max:
+            return len(self._values)
+        # Search with a scalar of the array's own type, otherwise
+        # NumPy converts the whole array to the type of value first
+        return int(self._values.searchsorted(self._scalar(value), side))
+
+
+    def __len__(self):
+        """
+        Return how many numbers are left, duplicates included.
+        """
+        return self._size
+
+
+    def count(self, value):
+        """
+        Return how many copies of a number are left.
+        """
+        first = self._search(value, "left")
+        last = self._search(value, "right")
+        return last - first - self._removed.get(value, 0)
+
+
+    def __contains__(self, value):
+        """
+        Check whether a number is still in the set.
+        """
+        if value in self._removed:
+            return self.count(value) > 0
+        # A number never removed is in the set if it was drawn,
+        # which one search tells
+        position = self._search(value, "left")
+        return position < len(self._values) and self._values[position] == value
+
+
+    def remove(self, value):
+        """
+        Remove one copy of a number, as list.remove would.
+
+        Args:
+            value (int): The number to remove.
+
+        Return:
+            bool:
+                True if a copy was removed, False if the
+                number was not in the set.
+        """
+        if value not in self:
+            return False
+        value = int(value)
+        if value not in self._removed:
+            insort(self._removed_keys, value)
+        self._removed[value] = self._removed.get(value, 0) + 1
+        self._size -= 1
+        if abs(value - self.lucky_number) <= self.window:
+            self.window_count -= 1
+        return True
+
+
+    def _values_between(self, first, last):
+        """
+        Return the sorted values in [first, last) by position,
+        without the removed copies.
+        """
+        values = self._values[first:last]
+        if not self._removed or len(values) == 0:
+            return values.tolist()
+        # Only the removed numbers within the slice are looked up,
+        # found by bisecting their sorted list
+        keys = self._removed_keys[
+            bisect_left(self._removed_keys, int(values[0])):
+            bisect_right(self._removed_keys, int(values[-1]))]
+        if not keys:
+            return values.tolist()
+        keep = np.ones(len(values), dtype=bool)
+        starts = np.searchsorted(values, np.array(keys, dtype=values.dtype))
+        for start, key in zip(starts.tolist(), keys):
+            keep[start:start + self._removed[key]] = False
+        return values[keep].tolist()
+
+
+    def shorter_list(self):
+        """
+        Return the numbers within window of the lucky number.
+
+        Return:
+            list:
+                The shorter list in ascending order.
+        """
+        return self._values_between(*self._window_bounds())
+
+
+    def to_list(self):
+        """
+        Return every number left in ascending order.
+        """
+        return self._values_between(0, len(self._values))
+
+
+
+def in_dealt_order(lucky_list, numbers):
+    """
+    Put numbers left of a lucky_list back in the order they were dealt.
+
+    A wrong guess removes the first copy of the number from the list,
+    so of a number drawn several times the last copies are left.
+
+    Args:
+        lucky_list (iterable): The numbers as they were dealt.
+        numbers (list): Numbers of the list in ascending order, each
+            repeated as many times as it is left, as shorter_list
+            returns them.
+
+    Return:
+        list:
+            The numbers in the order of the lucky_list.
+    """
+    if len(numbers) < 2:
+        return list(numbers)
+    dealt = np.asarray(lucky_list)
+    left = np.asarray(numbers, dtype=dealt.dtype)
+    # Only numbers between the smallest and largest left can be kept
+    values = dealt[(dealt >= left[0]) & (dealt <= left[-1])]
+    # A stable sort keeps the copies of a number in dealt order,
+    # counted here from the last copy
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    copy = (np.searchsorted(ordered, ordered, "right") - 1
+            - np.arange(len(ordered)))
+    copies_left = (np.searchsorted(left, ordered, "right")
+                   - np.searchsorted(left, ordered))
+    keep = np.empty(len(values), dtype=bool)
+    keep[order] = copy < copies_left
+    return values[keep].tolist()
+
+
+def make_candidates(values, lucky_number, config):
+    """
+    Index a lucky_list with the structure that suits the config.
+
+    Args:
+        values (iterable): The numbers of the lucky_list.
+        lucky_number (int): The lucky number of the round.
+        config (GameConfig): The list size, range and window.
+
+    Return:
+        CandidateSet or SortedCandidateSet:
+            A bitmap index for small ranges and short lists,
+            a sorted index otherwise.
+    """
+    # Long lists over a small range are mostly duplicates,
+    # which the sorted index holds without a dictionary entry each
+    if config.high - config.low < DENSE_RANGE_LIMIT and config.list_size < 256:
+        return CandidateSet(values, lucky_number, config.low,
+                            config.high, config.window)
+    return SortedCandidateSet(values, lucky_number, config.window)
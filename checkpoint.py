@@ -0,0 +1,319 @@
+import argparse
+import struct
+import time
+import zlib
+import numpy as np
+from game import GameConfig
+from session_store import SessionStore
+
+
+
+# The first bytes of every checkpoint file
+MAGIC = b"LNCP"
+# The version of the format written, raised whenever the layout changes
+FORMAT_VERSION = 2
+
+# The kinds of checkpoint
+FULL = 0
+DELTA = 1
+
+# magic, version, kind, sequence, slot count, capacity, list size,
+# name width, low, high, window, typecode and the CRC-32 of the body
+HEADER = struct.Struct("<4sHBxQQQIIqqq1s3xI")
+
+
+
+class CheckpointError(ValueError):
+    """
+    Raised when a checkpoint can not be read, or does not fit
+    the store or the checkpoints it is restored after.
+    """
+
+
+
+class Snapshot:
+    """
+    A class holding the sessions copied out of a store for one
+    checkpoint, until they are written.
+
+    Copying the rows is all capture does while the store must
+    stand still. Writing them, which takes longer, can then
+    happen while the sessions are played on.
+
+    Attributes:
+        kind (int): FULL for every live session, DELTA for only
+            the slots changed since the previous checkpoint.
+        sequence (int): The number of the checkpoint. A delta
+            applies on top of the checkpoint numbered one less.
+        capacity (int): The number of slots of the store.
+        config (GameConfig): The rules of the store's games.
+        name_width (int): The most bytes a player name may take.
+        slots (numpy.ndarray): The slots copied, or None for a full
+            checkpoint whose live slots are not picked out yet.
+        columns (dict): The rows of every field of those slots.
+    """
+    __slots__ = ("kind", "sequence", "capacity", "config", "name_width",
+                 "slots", "columns")
+
+    def __init__(self, kind, sequence, capacity, config, name_width, slots,
+                 columns):
+        self.kind = kind
+        self.sequence = sequence
+        self.capacity = capacity
+        self.config = config
+        self.name_width = name_width
+        self.slots = slots
+        self.columns = columns
+
+
+    def _pick_live(self):
+        """
+        Pick the live sessions out of the arrays of a full checkpoint,
+        which is left to writing as a straight copy is the faster capture.
+        """
+        if self.slots is None:
+            slots = np.flatnonzero(self.columns["in_use"])
+            self.columns = {name: column[slots]
+                            for name, column in self.columns.items()}
+            self.slots = slots.astype(_slot_dtype(self.capacity))
+
+
+    def write(self, stream):
+        """
+        Write the checkpoint to a binary stream.
+
+        The file is a fixed header followed by the slot numbers and
+        the rows of every field in SessionStore.fields order, each
+        as the raw bytes of its array.
+
+        Args:
+            stream (file): A binary file open for writing.
+        """
+        self._pick_live()
+        body = [self.slots.tobytes()]
+        body.extend(column.tobytes() for column in self.columns.values())
+        crc = 0
+        for part in body:
+            crc = zlib.crc32(part, crc)
+        config = self.config
+        stream.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.kind, self.sequence, len(self.slots),
+            self.capacity, config.list_size, self.name_width, config.low,
+            config.high, config.window, config.typecode.encode(), crc))
+        for part in body:
+            stream.write(part)
+
+
+    def apply(self, store):
+        """
+        Write the checkpoint's rows into a store.
+
+        Args:
+            store (SessionStore): A store with the same rules and
+                capacity as the one the checkpoint was taken from.
+
+        Raises:
+            CheckpointError: If the store does not match.
+        """
+        config = store.config
+        if (store.capacity, store.name_width, config.list_size, config.low,
+                config.high, config.window) != (
+                self.capacity, self.name_width, self.config.list_size,
+                self.config.low, self.config.high, self.config.window):
+            raise CheckpointError(
+                "The checkpoint was taken from a store of another shape.")
+        self._pick_live()
+        for name, field in store.fields().items():
+            field[self.slots] = self.columns[name]
+        store.dirty[self.slots] = False
+        store.rebuild_free_slots()
+
+
+
+def _slot_dtype(capacity):
+    return np.dtype("<u4") if capacity <= 2 ** 32 else np.dtype("<u8")
+
+
+def capture(store, full=False):
+    """
+    Copy the sessions of a store for a checkpoint.
+
+    The store must not change while this runs. It is the only pause
+    a checkpoint needs: a full checkpoint copies every array as a
+    block, and a delta finds the changed slots with one pass over the
+    dirty flags and copies them with one gather per field.
+
+    Args:
+        store (SessionStore): The store to checkpoint.
+        full (bool): Copy every live session, instead of only the
+            slots changed since the previous checkpoint.
+
+    Return:
+        Snapshot:
+            The copied sessions, to write.
+    """
+    sequence = store.checkpoint_sequence + 1
+    if full:
+        slots = None
+        columns = {name: field.copy()
+                   for name, field in store.fields().items()}
+        store.dirty[:] = False
+    else:
+        slots = np.flatnonzero(store.dirty).astype(
+            _slot_dtype(store.capacity))
+        columns = {name: field[slots]
+                   for name, field in store.fields().items()}
+        store.dirty[slots] = False
+    store.checkpoint_sequence = sequence
+    return Snapshot(FULL if full else DELTA, sequence, store.capacity,
+                    store.config, store.name_width, slots, columns)
+
+
+def read_snapshot(stream):
+    """
+    Read a checkpoint written by Snapshot.write.
+
+    Args:
+        stream (file): A binary file open for reading.
+
+    Return:
+        Snapshot:
+            The checkpoint.
+
+    Raises:
+        CheckpointError: If the file is not a checkpoint, is of
+            another version, or is cut short or damaged.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size or header[:4] != MAGIC:
+        raise CheckpointError("The file is not a checkpoint.")
+    (_, version, kind, sequence, count, capacity, list_size, name_width, low,
+     high, window, typecode, crc) = HEADER.unpack(header)
+    if version != FORMAT_VERSION:
+        raise CheckpointError(f"Checkpoint format version {version} is not "
+                              f"supported, only {FORMAT_VERSION}.")
+    config = GameConfig(list_size, low, high, window)
+    if config.typecode != typecode.decode():
+        raise CheckpointError("The checkpoint's number type does not match.")
+
+    body = stream.read()
+    if zlib.crc32(body) != crc:
+        raise CheckpointError("The checkpoint is damaged or cut short.")
+    slot_dtype = _slot_dtype(capacity)
+    slots = np.frombuffer(body, dtype=slot_dtype, count=count)
+    offset = slots.nbytes
+    columns = {}
+    # An empty store of one slot gives the type and width of every field
+    for name, field in SessionStore(1, config, name_width).fields().items():
+        column = np.frombuffer(body, dtype=field.dtype, offset=offset,
+                               count=count * field[0].size)
+        columns[name] = column.reshape((count,) + field.shape[1:])
+        offset += column.nbytes
+    return Snapshot(kind, sequence, capacity, config, name_width, slots,
+                    columns)
+
+
+def save(store, path, full=False):
+    """
+    Capture and write a checkpoint of a store.
+
+    Args:
+        store (SessionStore): The store to checkpoint.
+        path (str): The file to write.
+        full (bool): Write every live session, not only the changes.
+
+    Return:
+        Snapshot:
+            The checkpoint written.
+    """
+    snapshot = capture(store, full)
+    with open(path, "wb") as stream:
+        snapshot.write(stream)
+    return snapshot
+
+
+def restore(paths, store=None):
+    """
+    Restore a store from a full checkpoint and the deltas after it.
+
+    Args:
+        paths (list): The checkpoint files, the full one first and
+            the deltas in the order they were taken.
+        store (SessionStore): An empty store to restore into. One
+            of the checkpoint's shape is created if not given.
+
+    Return:
+        SessionStore:
+            The store holding the sessions as at the last checkpoint.
+
+    Raises:
+        CheckpointError: If the first checkpoint is not a full one,
+            or a delta does not follow the checkpoint before it.
+    """
+    sequence = None
+    for path in paths:
+        with open(path, "rb") as stream:
+            snapshot = read_snapshot(stream)
+        if sequence is None:
+            if snapshot.kind != FULL:
+                raise CheckpointError(f"{path} is a delta, restoring "
+                                      f"must start from a full checkpoint.")
+            if store is None:
+                store = SessionStore(snapshot.capacity, snapshot.config,
+                                     snapshot.name_width)
+        elif snapshot.kind != DELTA or snapshot.sequence != sequence + 1:
+            raise CheckpointError(f"{path} does not follow checkpoint "
+                                  f"{sequence}.")
+        snapshot.apply(store)
+        sequence = snapshot.sequence
+    if store is not None:
+        store.checkpoint_sequence = sequence
+    return store
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure checkpoint pause and restore times.")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--changed", type=float, default=0.01,
+                        help="the share of sessions changed between deltas")
+    parser.add_argument("--path", default="sessions.ckpt")
+    args = parser.parse_args()
+
+    store = SessionStore(args.sessions)
+    rng = np.random.default_rng(0)
+    store.in_use[:] = True
+    store.rebuild_free_slots()
+    store.lucky_lists[:] = rng.integers(0, 101, store.lucky_lists.shape)
+    store.list_lengths[:] = store.list_size
+    store.kept_numbers[:] = 0xFF
+    store.lucky_numbers[:] = store.lucky_lists[:, -1]
+    store.tries_counts[:] = 1
+    store.player_names[:] = b"Player"
+
+    start = time.perf_counter()
+    snapshot = capture(store, full=True)
+    pause = time.perf_counter() - start
+    with open(args.path, "wb") as stream:
+        snapshot.write(stream)
+    print(f"Full: {pause * 1e3:.1f} ms pause, "
+          f"{time.perf_counter() - start:.2f} s with writing")
+
+    changed = rng.choice(args.sessions, int(args.sessions * args.changed),
+                         replace=False)
+    store.tries_counts[changed] += 1
+    store.dirty[changed] = True
+    delta_path = args.path + ".1"
+    start = time.perf_counter()
+    snapshot = capture(store)
+    pause = time.perf_counter() - start
+    with open(delta_path, "wb") as stream:
+        snapshot.write(stream)
+    print(f"Delta of {len(changed)} sessions: {pause * 1e3:.1f} ms pause, "
+          f"{time.perf_counter() - start:.2f} s with writing")
+
+    start = time.perf_counter()
+    restored = restore([args.path, delta_path])
+    print(f"Restore: {time.perf_counter() - start:.2f} s, "
+          f"{len(restored)} sessions")
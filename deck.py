@@ -0,0 +1,230 @@
+import argparse
+import struct
+import time
+import numpy as np
+from game import GameConfig
+
+
+
+# The first bytes of every deck file
+MAGIC = b"LNDK"
+# The version of the format written, raised whenever the layout changes
+FORMAT_VERSION = 2
+# magic, version, list size, low, high, window, rounds and typecode,
+# padded so the rounds start on a 64 byte boundary
+HEADER = struct.Struct("<4sHxxIqqqQ1s")
+HEADER_SIZE = 64
+
+
+
+class DeckExhausted(Exception):
+    """
+    Raised when every round of a deck, or of its shard, has been dealt.
+    """
+
+
+
+def round_dtype(config):
+    """
+    Return the record type of one round of a deck.
+
+    Every round holds its lucky_list, the lucky number (the last
+    number of the list) and how many numbers of the list are within
+    the window of the lucky number, the lucky number included. A
+    round is over once fewer than two of those are left, so
+    window_count - 1 wrong guesses inside the window end it.
+
+    Args:
+        config (GameConfig): The rules the rounds are dealt by.
+
+    Return:
+        numpy.dtype:
+            The record type.
+    """
+    value = np.dtype(config.typecode)
+    count = np.dtype(np.uint16 if config.list_size < 2 ** 16 else np.uint32)
+    return np.dtype([("numbers", value, (config.list_size,)),
+                     ("lucky_number", value),
+                     ("window_count", count)])
+
+
+def build_deck(path, rounds, config=None, seed=None, chunk_size=1_000_000):
+    """
+    Deal rounds ahead of time into a deck file.
+
+    The rounds are drawn in chunks the way Game.reset_round draws one
+    list, with their window counts worked out for the whole chunk at
+    once, and written through a memory map.
+
+    Args:
+        path (str): The file to write.
+        rounds (int): The number of rounds to deal.
+        config (GameConfig): The rules to deal by.
+        seed (int): The seed to draw from, for a reproducible deck.
+        chunk_size (int): The rounds dealt at a time.
+    """
+    config = config if config is not None else GameConfig()
+    dtype = round_dtype(config)
+    with open(path, "wb") as deck:
+        deck.write(HEADER.pack(MAGIC, FORMAT_VERSION, config.list_size,
+                               config.low, config.high, config.window, rounds,
+                               config.typecode.encode()).ljust(HEADER_SIZE,
+                                                               b"\0"))
+        deck.truncate(HEADER_SIZE + dtype.itemsize * rounds)
+    if rounds == 0:
+        return
+    records = np.memmap(path, dtype=dtype, mode="r+", offset=HEADER_SIZE,
+                        shape=(rounds,))
+    rng = np.random.default_rng(seed)
+    for start in range(0, rounds, chunk_size):
+        stop = min(start + chunk_size, rounds)
+        numbers = rng.integers(config.low, config.high,
+                               size=(stop - start, config.list_size),
+                               dtype=np.dtype(config.typecode), endpoint=True)
+        lucky = numbers[:, -1].astype(np.int64)
+        distance = np.abs(numbers.astype(np.int64) - lucky[:, np.newaxis])
+        chunk = records[start:stop]
+        chunk["numbers"] = numbers
+        chunk["lucky_number"] = numbers[:, -1]
+        chunk["window_count"] = (distance <= config.window).sum(axis=1)
+    records.flush()
+    del records
+
+
+
+class RoundDeck:
+    """
+    A class dealing pre-generated rounds from a deck file.
+
+    The file is memory mapped, so opening a deck of millions of
+    rounds reads nothing, and drawing a round moves a cursor and
+    returns views into the map. A deck can be split into shards,
+    round i going to shard i % shards, so processes dealing from
+    different shards of one file never deal the same round.
+
+    Games deal whole rounds from a deck with deal: pass it as the
+    deck of a Game, GameEngine or Tournament and every round they
+    start is the next round of the deck, its window count read from
+    the deck instead of counted. Rounds dealt from a deck are not
+    replayed from the game's stream key, but from the deck file and
+    the cursor.
+
+    Attributes:
+        config (GameConfig): The rules the rounds were dealt by.
+        records (numpy.memmap): Every round of the file.
+        shard (int): The shard this deck deals from.
+        shards (int): The number of shards the file is split in.
+        cursor (int): How many rounds of the shard have been dealt.
+    """
+    __slots__ = ("config", "records", "shard", "shards", "cursor", "_rounds")
+
+    def __init__(self, path, shard=0, shards=1, cursor=0):
+        """
+        Initialize the RoundDeck instance.
+
+        Args:
+            path (str): The deck file, written by build_deck.
+            shard (int): The shard to deal from.
+            shards (int): The number of shards the file is split in.
+            cursor (int): How many rounds of the shard were already
+                dealt, to carry on after a restart.
+
+        Raises:
+            ValueError: If the file is not a deck of this version,
+                or the shard does not exist.
+        """
+        if not 0 <= shard < shards:
+            raise ValueError(f"There is no shard {shard} of {shards}.")
+        with open(path, "rb") as deck:
+            header = deck.read(HEADER_SIZE)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise ValueError(f"{path} is not a deck of rounds.")
+        (_, version, list_size, low, high, window, rounds,
+         typecode) = HEADER.unpack(header[:HEADER.size])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Deck format version {version} is not "
+                             f"supported, only {FORMAT_VERSION}.")
+        self.config = GameConfig(list_size, low, high, window)
+        if self.config.typecode != typecode.decode():
+            raise ValueError("The deck's number type does not match.")
+        self.records = (np.memmap(path, dtype=round_dtype(self.config),
+                                  mode="r", offset=HEADER_SIZE,
+                                  shape=(rounds,))
+                        if rounds else np.empty(0, round_dtype(self.config)))
+        self.shard = shard
+        self.shards = shards
+        self.cursor = cursor
+        # The number of rounds in this shard
+        self._rounds = max(0, (rounds - shard + shards - 1) // shards)
+
+
+    def __len__(self):
+        """
+        Return the number of rounds of the shard not dealt yet.
+        """
+        return max(0, self._rounds - self.cursor)
+
+
+    def draw(self):
+        """
+        Deal the next round of the shard.
+
+        Return:
+            int:
+                The index of the round in records.
+
+        Raises:
+            DeckExhausted: If every round of the shard was dealt.
+        """
+        if self.cursor >= self._rounds:
+            raise DeckExhausted()
+        index = self.shard + self.cursor * self.shards
+        self.cursor += 1
+        return index
+
+
+    def deal(self, config):
+        """
+        Deal the next round to a game.
+
+        Args:
+            config (GameConfig): The rules of the game, which
+                must be those the deck was dealt by.
+
+        Return:
+            tuple:
+                A read-only view of the round's lucky_list, the lucky
+                number last, and its window count.
+
+        Raises:
+            ValueError: If the game's rules are not the deck's.
+            DeckExhausted: If every round of the shard was dealt.
+        """
+        own = self.config
+        if (config.list_size, config.low, config.high, config.window) != (
+                own.list_size, own.low, own.high, own.window):
+            raise ValueError("The deck was dealt by other rules.")
+        record = self.records[self.draw()]
+        return record["numbers"], int(record["window_count"])
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Deal rounds ahead of time into a deck file.")
+    parser.add_argument("path")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_deck(args.path, args.rounds, seed=args.seed)
+    built = time.perf_counter() - start
+    deck = RoundDeck(args.path)
+    start = time.perf_counter()
+    for _ in range(min(len(deck), 1_000_000)):
+        deck.draw()
+    drawn = time.perf_counter() - start
+    print(f"Dealt {args.rounds:,} rounds in {built:.2f}s, "
+          f"{deck.records.nbytes / max(args.rounds, 1):.0f} bytes each; "
+          f"drawing takes {drawn / max(deck.cursor, 1) * 1e9:.0f} ns")
@@ -0,0 +1,309 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import NamedTuple
+import metrics as game_metrics
+from candidates import in_dealt_order
+from game import Game, GameConfig, MINIMUM_AGE
+from registration import NAME_WIDTH
+from rng import thread_stream
+
+
+
+# The phases of a session, which tell what the next answer is for
+PHASE_NAME = "name"
+PHASE_BIRTHDATE = "birthdate"
+PHASE_GUESS = "guess"
+PHASE_PLAY_AGAIN = "play_again"
+PHASE_OVER = "over"
+PHASES = (PHASE_NAME, PHASE_BIRTHDATE, PHASE_GUESS, PHASE_PLAY_AGAIN,
+          PHASE_OVER)
+
+# The effects that never change, built once and shared by every step.
+# Every effect is a tuple of its name and arguments. Effects named
+# after a Renderer method are shown by calling it with the arguments.
+PROMPT_NAME = ("prompt", game_metrics.PROMPT_NAME, "Enter your first name: ")
+PROMPT_BIRTHDATE = ("prompt", game_metrics.PROMPT_BIRTHDATE,
+                    "Enter your birthdate (YYYYMMDD): ")
+PROMPT_GUESS = ("prompt", game_metrics.PROMPT_GUESS,
+                "Pick a number from the list: ")
+PROMPT_PLAY_AGAIN = ("prompt", game_metrics.PROMPT_PLAY_AGAIN,
+                     "Do you want to play again?\n (y: Yes, n: No): ")
+INVALID_NAME = ("invalid_name",)
+NAME_TOO_LONG = ("message", f"Your game name can be at most "
+                            f"{NAME_WIDTH} bytes long.")
+INVALID_CHOICE = ("invalid_choice",)
+INVALID_NUMBER = ("invalid_number",)
+INVALID_PLAY_AGAIN = ("invalid_play_again",)
+GAME_OVER = ("game_over",)
+UNDERAGE = ("underage",)
+GOODBYE = ("goodbye",)
+EXIT = ("exit",)
+
+
+
+class GameState(NamedTuple):
+    """
+    The state of one session between two answers.
+
+    States are immutable tuples. A step returns a new state sharing
+    every field it did not change with the old one, so keeping,
+    copying or sending states between workers is cheap.
+
+    Attributes:
+        phase (str): What the next answer is for, a PHASE_ constant.
+        player_name (str): The player's name.
+        player_birthdate (str): The player's birthdate in YYYYMMDD format.
+        player_age (int): The player's age.
+        lucky_list (tuple): The numbers dealt this round, in order.
+        lucky_number (int): The lucky number of the round.
+        tries_count (int): The number of the player's next try.
+        remaining (tuple): The numbers still in play, in ascending order.
+        window_count (int): How many numbers in play are within the
+            window of the lucky number, the lucky number included.
+    """
+    phase: str = PHASE_NAME
+    player_name: str = ""
+    player_birthdate: str = ""
+    player_age: int = 0
+    lucky_list: tuple = ()
+    lucky_number: int = 0
+    tries_count: int = 1
+    remaining: tuple = ()
+    window_count: int = 0
+
+
+
+class GameEngine:
+    """
+    A class playing Lucky Number as pure state transitions.
+
+    Where Game asks for input and waits, the engine takes the
+    player's answer as an event and returns the next state with the
+    effects of the answer: what to show and what to ask next. It
+    never blocks, so one worker can advance any number of sessions
+    from an event loop, a batch job or a user interface. The rules
+    are those of Game, which validates names and birthdates.
+
+    The only randomness is in dealing rounds, which draw from the
+    engine's stream as Game.reset_round does, so an engine given a
+    seeded stream plays the same rounds as a Game given the same one.
+
+    Attributes:
+        config (GameConfig): The rules to play by.
+        rng (SessionRNG): The stream rounds are dealt from, or None
+            for the stream shared by the current thread.
+        year (int): The year ages are counted to.
+        deck (RoundDeck): Where rounds are dealt from instead of the
+            stream, or None.
+    """
+    __slots__ = ("config", "rng", "year", "deck")
+
+    def __init__(self, config=None, rng=None, year=None, deck=None):
+        """
+        Initialize the GameEngine instance.
+
+        Args:
+            config (GameConfig): The rules to play by. The original
+                10 numbers between 0 and 100 are used if not given.
+            rng (SessionRNG): The stream to deal rounds from.
+            year (int): The year to count ages to. The current
+                year is used if not given.
+            deck (RoundDeck): Pre-generated rounds to deal from
+                instead of drawing them, see deck.py.
+        """
+        self.config = config if config is not None else GameConfig()
+        self.rng = rng
+        self.year = year if year is not None else datetime.now().year
+        self.deck = deck
+
+
+    def start(self):
+        """
+        Start a session.
+
+        Return:
+            tuple:
+                The first state and its effects, asking for the name.
+        """
+        return GameState(), (PROMPT_NAME,)
+
+
+    def step(self, state, answer):
+        """
+        Advance a session by one answer of the player.
+
+        Args:
+            state (GameState): The state the answer is for.
+            answer (str): The answer as the player entered it.
+
+        Return:
+            tuple:
+                The next state and a tuple of effects, in the order
+                they happen. Unless the session is over, the last
+                effect is the prompt for the next answer.
+
+        Raises:
+            ValueError: If the session is already over.
+        """
+        phase = state.phase
+        if phase == PHASE_GUESS:
+            return self._guess(state, answer)
+        elif phase == PHASE_PLAY_AGAIN:
+            return self._play_again(state, answer)
+        elif phase == PHASE_NAME:
+            return self._name(state, answer)
+        elif phase == PHASE_BIRTHDATE:
+            return self._birthdate(state, answer)
+        raise ValueError("The session is over.")
+
+
+    def step_many(self, states, answers):
+        """
+        Advance many sessions by one answer each.
+
+        Args:
+            states (list): The state of every session.
+            answers (list): The answer of every session.
+
+        Return:
+            list:
+                (state, effects) for every session, in order.
+        """
+        step = self.step
+        return [step(state, answer) for state, answer in zip(states, answers)]
+
+
+    def _name(self, state, answer):
+        name = Game.validate_player_name(answer)
+        if name is None:
+            return state, (INVALID_NAME, PROMPT_NAME)
+        # Names are stored in columns of NAME_WIDTH bytes
+        if len(name.encode()) > NAME_WIDTH:
+            return state, (NAME_TOO_LONG, PROMPT_NAME)
+        return (state._replace(phase=PHASE_BIRTHDATE, player_name=name),
+                (PROMPT_BIRTHDATE,))
+
+
+    def _birthdate(self, state, answer):
+        error = Game.validate_birthdate(answer)
+        if error is not None:
+            return state, (("invalid_birthdate", error), PROMPT_BIRTHDATE)
+        age = self.year - int(answer[:4])
+        state = state._replace(player_birthdate=answer, player_age=age)
+        if age < MINIMUM_AGE:
+            return state._replace(phase=PHASE_OVER), (UNDERAGE, EXIT)
+        state, effects = self._deal(state)
+        return state, (("message",
+                        f"★ {state.player_name}, Let the game begin ★"),
+                       ) + effects
+
+
+    def _deal(self, state):
+        """
+        Deal a new round, drawing the whole list in one call with the
+        last number as the lucky number, as Game.reset_round does.
+        A round from a deck comes with its window count.
+        """
+        config = self.config
+        if self.deck is not None:
+            numbers, window_count = self.deck.deal(config)
+        else:
+            rng = self.rng if self.rng is not None else thread_stream()
+            numbers = rng.draw_numbers(config.list_size, config)
+            window_count = None
+        lucky_list = tuple(numbers.tolist())
+        lucky_number = lucky_list[-1]
+        remaining = tuple(sorted(lucky_list))
+        if window_count is None:
+            window_count = (
+                bisect_right(remaining, lucky_number + config.window)
+                - bisect_left(remaining, lucky_number - config.window))
+        state = state._replace(phase=PHASE_GUESS, lucky_list=lucky_list,
+                               lucky_number=lucky_number, tries_count=1,
+                               remaining=remaining, window_count=window_count)
+        return state, (("show_list", lucky_list), PROMPT_GUESS)
+
+
+    def _shorter_list(self, state):
+        """
+        Return the numbers in play within the window, found as a slice
+        of the sorted numbers by binary search, in the order dealt.
+        """
+        window = self.config.window
+        remaining = state.remaining
+        return tuple(in_dealt_order(
+            state.lucky_list,
+            remaining[bisect_left(remaining, state.lucky_number - window):
+                      bisect_right(remaining, state.lucky_number + window)]))
+
+
+    def _guess(self, state, answer):
+        tries_count = state.tries_count
+        try:
+            guess = int(answer)
+        except ValueError:
+            return (state._replace(tries_count=tries_count + 1),
+                    (INVALID_NUMBER, PROMPT_GUESS))
+
+        remaining = state.remaining
+        position = bisect_left(remaining, guess)
+        if position == len(remaining) or remaining[position] != guess:
+            return (state._replace(tries_count=tries_count + 1),
+                    (INVALID_CHOICE, PROMPT_GUESS))
+        if guess == state.lucky_number:
+            return (state._replace(phase=PHASE_PLAY_AGAIN),
+                    (("congratulate", tries_count),
+                     ("round_over", True, state.lucky_number, tries_count),
+                     PROMPT_PLAY_AGAIN))
+
+        # Remove one copy of the wrong guess, as list.remove would
+        window_count = state.window_count
+        if abs(guess - state.lucky_number) <= self.config.window:
+            window_count -= 1
+        state = state._replace(
+            remaining=remaining[:position] + remaining[position + 1:],
+            window_count=window_count)
+        if window_count < 2:
+            return (state._replace(phase=PHASE_PLAY_AGAIN),
+                    (GAME_OVER,
+                     ("round_over", False, state.lucky_number, tries_count),
+                     PROMPT_PLAY_AGAIN))
+        return (state._replace(tries_count=tries_count + 1),
+                (("wrong_guess", tries_count, self._shorter_list(state)),
+                 PROMPT_GUESS))
+
+
+    def _play_again(self, state, answer):
+        play_again = answer.strip().lower()
+        if play_again == "y":
+            return self._deal(state)
+        elif play_again == "n":
+            return state._replace(phase=PHASE_OVER), (GOODBYE, EXIT)
+        return state, (INVALID_PLAY_AGAIN, PROMPT_PLAY_AGAIN)
+
+
+
+def show_effects(effects, renderer):
+    """
+    Show the effects of a step with a renderer.
+
+    Args:
+        effects (tuple): The effects returned by GameEngine.step,
+            or an ("error", message) effect from a ShardManager.
+        renderer (Renderer): What shows the game to the player.
+
+    Return:
+        tuple:
+            The prompt kind and message to ask next, or None if
+            the session is over.
+    """
+    next_prompt = None
+    for effect in effects:
+        name = effect[0]
+        if name == "prompt":
+            next_prompt = effect[1:]
+        elif name == "error":
+            renderer.message(effect[1])
+        elif name != "round_over" and name != "exit":
+            getattr(renderer, name)(*effect[1:])
+    return next_prompt
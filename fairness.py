@@ -0,0 +1,332 @@
+import argparse
+import math
+import time
+from collections import deque
+import numpy as np
+from game import GameConfig
+from simulation import generate_rounds
+
+
+
+def chi_square_p_value(statistic, dof):
+    """
+    Return the chance of a chi-square statistic at least this large,
+    by the Wilson-Hilferty approximation, which is close for the
+    degrees of freedom of the monitor's histograms.
+
+    Args:
+        statistic (float): The chi-square statistic.
+        dof (int): Its degrees of freedom.
+
+    Return:
+        float:
+            The p-value, 1.0 if there are no degrees of freedom.
+    """
+    if dof < 1:
+        return 1.0
+    scale = 2 / (9 * dof)
+    z = ((statistic / dof) ** (1 / 3) - (1 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def chi_square(counts, expected):
+    """
+    Compare observed counts with the counts a fair generator gives.
+
+    Args:
+        counts (numpy.ndarray): The observed count of every bin.
+        expected (numpy.ndarray): The share of every bin, summing to 1.
+
+    Return:
+        tuple:
+            The statistic, the degrees of freedom and the p-value.
+    """
+    total = counts.sum()
+    if total == 0:
+        return 0.0, 0, 1.0
+    expected_counts = expected * total
+    used = expected_counts > 0
+    statistic = float((((counts[used] - expected_counts[used]) ** 2)
+                       / expected_counts[used]).sum())
+    dof = int(used.sum()) - 1
+    return statistic, dof, chi_square_p_value(statistic, dof)
+
+
+
+class FairnessMonitor:
+    """
+    A class checking that generated lucky lists look fair, as
+    they are generated.
+
+    The monitor takes lists in batches and keeps only running
+    counts, so its memory does not grow with the rounds seen. It
+    counts how often every number is drawn and drawn as the lucky
+    number, how many lists hold a number twice and where in the list
+    the lucky number first appears. Each is compared with what a
+    uniform generator gives: numbers and lucky numbers are equally
+    likely, a list of k numbers from n holds a duplicate with chance
+    1 - n!/((n-k)! n^k), and the lucky number, always the last of
+    the list, first appears at position i < k-1 with chance
+    (1-1/n)^i / n.
+
+    Every window of rounds is also tested on its own, and a window
+    whose p-value falls below alpha raises an alert, which catches
+    drift that the running totals would average away.
+
+    Attributes:
+        config (GameConfig): The rules the lists are generated by.
+        bins (int): The number of bins values are counted in. Every
+            number has its own bin unless the range is wider than
+            max_bins, then neighbouring numbers share bins.
+        rounds (int): The number of lists seen.
+        value_counts (numpy.ndarray): How often each bin was drawn.
+        lucky_counts (numpy.ndarray): How often each bin was drawn
+            as the lucky number.
+        position_counts (numpy.ndarray): Index i holds how many lucky
+            numbers first appeared at position i of their list.
+        duplicate_lists (int): The lists holding a number twice.
+        window_rounds (int): The rounds per drift window.
+        alpha (float): The p-value below which a window alerts.
+        alerts (collections.deque): The most recent alerts.
+        on_alert (callable): Called with every alert, if not None.
+    """
+    __slots__ = ("config", "bins", "rounds", "value_counts", "lucky_counts",
+                 "position_counts", "duplicate_lists", "window_rounds",
+                 "alpha", "alerts", "on_alert", "_span", "_bin_shares",
+                 "_position_shares", "_duplicate_share", "_window")
+
+    def __init__(self, config=None, window_rounds=1_000_000, alpha=1e-6,
+                 max_bins=4096, max_alerts=100, on_alert=None):
+        """
+        Initialize the FairnessMonitor instance.
+
+        Args:
+            config (GameConfig): The rules the lists are generated by.
+            window_rounds (int): The rounds per drift window.
+            alpha (float): The p-value below which a window alerts.
+                It is small as a window is tested several ways.
+            max_bins (int): The most bins to count values in.
+            max_alerts (int): How many alerts to keep.
+            on_alert (callable): Called with every alert.
+        """
+        self.config = config if config is not None else GameConfig()
+        span = self._span = self.config.high - self.config.low + 1
+        self.bins = min(span, max_bins)
+        size = self.config.list_size
+        self.rounds = 0
+        self.value_counts = np.zeros(self.bins, dtype=np.int64)
+        self.lucky_counts = np.zeros(self.bins, dtype=np.int64)
+        self.position_counts = np.zeros(size, dtype=np.int64)
+        self.duplicate_lists = 0
+        self.window_rounds = window_rounds
+        self.alpha = alpha
+        self.alerts = deque(maxlen=max_alerts)
+        self.on_alert = on_alert
+
+        # The share of every bin, which holds span // bins numbers or one
+        # more. _bin puts offset o in bin o * bins // span, so bin b
+        # starts at the first offset reaching b, ceil(b * span / bins)
+        edges = -(-np.arange(self.bins + 1, dtype=np.int64) * span // self.bins)
+        self._bin_shares = np.diff(edges) / span
+        miss = 1 - 1 / span
+        shares = miss ** np.arange(size) / span
+        shares[-1] = miss ** (size - 1)
+        self._position_shares = shares
+        self._duplicate_share = 1 - math.prod(
+            (span - index) / span for index in range(size))
+        # The counts of the current window: rounds, duplicates and
+        # the value, lucky and position histograms
+        self._window = [0, 0, np.zeros(self.bins, dtype=np.int64),
+                        np.zeros(self.bins, dtype=np.int64),
+                        np.zeros(size, dtype=np.int64)]
+
+
+    def _bin(self, values):
+        """
+        Return the bin of every value, as platform integers.
+        """
+        offsets = values.astype(np.intp)
+        if self.config.low:
+            offsets -= self.config.low
+        if self.bins < self._span:
+            offsets = offsets.astype(np.int64) * self.bins // self._span
+        return offsets
+
+
+    def update(self, lists):
+        """
+        Count a batch of generated lists.
+
+        Args:
+            lists (numpy.ndarray): One list per row, the lucky number
+                last, as simulation.generate_rounds makes them. A
+                single list is counted as a batch of one.
+        """
+        lists = np.asarray(lists)
+        if lists.ndim == 1:
+            lists = lists[np.newaxis]
+        # Split the batch where windows end, so every window is tested
+        # on exactly window_rounds rounds
+        start = 0
+        while start < len(lists):
+            room = self.window_rounds - self._window[0]
+            stop = min(start + room, len(lists))
+            self._count(lists[start:stop])
+            start = stop
+            if self._window[0] == self.window_rounds:
+                self._close_window()
+
+
+    def _count(self, lists):
+        rounds, size = lists.shape
+        # The columns are read one at a time, so make each contiguous
+        columns = np.ascontiguousarray(lists.T)
+        lucky = columns[-1]
+
+        position = np.full(rounds, size - 1, dtype=np.intp)
+        if size <= 16:
+            # Comparing every pair of columns beats sorting short lists
+            duplicates = np.zeros(rounds, dtype=bool)
+            for index in range(size - 1):
+                column = columns[index]
+                for other in columns[index + 1:]:
+                    duplicates |= column == other
+        else:
+            ordered = np.sort(lists, axis=1)
+            duplicates = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        # Walk backwards so the first position found last wins
+        for index in range(size - 2, -1, -1):
+            position[columns[index] == lucky] = index
+
+        values = np.bincount(self._bin(columns).ravel(), minlength=self.bins)
+        lucky_values = np.bincount(self._bin(lucky), minlength=self.bins)
+        positions = np.bincount(position, minlength=size)
+        duplicate_count = int(np.count_nonzero(duplicates))
+
+        self.rounds += rounds
+        self.value_counts += values
+        self.lucky_counts += lucky_values
+        self.position_counts += positions
+        self.duplicate_lists += duplicate_count
+        window = self._window
+        window[0] += rounds
+        window[1] += duplicate_count
+        window[2] += values
+        window[3] += lucky_values
+        window[4] += positions
+
+
+    def _duplicate_p_value(self, rounds, duplicates):
+        """
+        Return the two-sided p-value of a count of lists with
+        duplicates, by the normal approximation of the binomial.
+        """
+        share = self._duplicate_share
+        if rounds == 0 or share in (0.0, 1.0):
+            return 1.0
+        expected = rounds * share
+        spread = math.sqrt(expected * (1 - share))
+        return math.erfc(abs(duplicates - expected) / spread / math.sqrt(2))
+
+
+    def _tests(self, rounds, duplicates, values, lucky, positions):
+        """
+        Return the p-value of every test for a set of counts.
+        """
+        return {
+            "values": chi_square(values, self._bin_shares)[2],
+            "lucky_numbers": chi_square(lucky, self._bin_shares)[2],
+            "positions": chi_square(positions, self._position_shares)[2],
+            "duplicates": self._duplicate_p_value(rounds, duplicates),
+        }
+
+
+    def _close_window(self):
+        """
+        Test the window that just ended, alert on every failed
+        test, and start the next window.
+        """
+        window = self._window
+        for test, p_value in self._tests(*window).items():
+            if p_value < self.alpha:
+                alert = {"round": self.rounds, "test": test,
+                         "p_value": p_value}
+                self.alerts.append(alert)
+                if self.on_alert is not None:
+                    self.on_alert(alert)
+        window[0] = window[1] = 0
+        for counts in window[2:]:
+            counts[:] = 0
+
+
+    def duplicate_rate(self):
+        """
+        Return the share of lists seen that hold a number twice.
+        """
+        return self.duplicate_lists / self.rounds if self.rounds else 0.0
+
+
+    def report(self):
+        """
+        Return the statistics of every round seen so far.
+
+        Return:
+            dict:
+                The rounds seen, the chi-square statistic, degrees of
+                freedom and p-value of the value, lucky number and
+                position histograms, the duplicate rate with the rate
+                a fair generator gives and its p-value, and the
+                number of alerts raised.
+        """
+        report = {"rounds": self.rounds}
+        for name, counts, shares in [
+                ("values", self.value_counts, self._bin_shares),
+                ("lucky_numbers", self.lucky_counts, self._bin_shares),
+                ("positions", self.position_counts, self._position_shares)]:
+            statistic, dof, p_value = chi_square(counts, shares)
+            report[name] = {"chi_square": statistic, "dof": dof,
+                            "p_value": p_value}
+        report["duplicates"] = {
+            "rate": self.duplicate_rate(),
+            "expected_rate": self._duplicate_share,
+            "p_value": self._duplicate_p_value(self.rounds,
+                                               self.duplicate_lists),
+        }
+        report["alerts"] = len(self.alerts)
+        return report
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate lucky lists and check that they look fair.")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = GameConfig()
+    monitor = FairnessMonitor(config, on_alert=print)
+    rng = np.random.default_rng(args.seed)
+    generating = monitoring = 0.0
+    for start in range(0, args.rounds, args.batch_size):
+        count = min(args.batch_size, args.rounds - start)
+        started = time.perf_counter()
+        lists = generate_rounds(count, rng, config.list_size, config.low,
+                                config.high)
+        generated = time.perf_counter()
+        monitor.update(lists)
+        generating += generated - started
+        monitoring += time.perf_counter() - generated
+
+    report = monitor.report()
+    print(f"Rounds: {report['rounds']:,}, generated in {generating:.2f}s "
+          f"and monitored in {monitoring:.2f}s")
+    for name in ("values", "lucky_numbers", "positions"):
+        print(f"{name}: chi-square {report[name]['chi_square']:.1f} "
+              f"on {report[name]['dof']} dof, p = {report[name]['p_value']:.4f}")
+    duplicates = report["duplicates"]
+    print(f"duplicates: {duplicates['rate']:.5f} "
+          f"(fair {duplicates['expected_rate']:.5f}), "
+          f"p = {duplicates['p_value']:.4f}")
+    print(f"Alerts: {report['alerts']}")
@@ -1,5 +1,95 @@
+from array import array
 from datetime import datetime
-import random
+from time import perf_counter_ns
+import numpy as np
+from candidates import in_dealt_order, make_candidates
+from inputs import ConsoleInput
+import metrics as game_metrics
+from renderer import TerminalRenderer
+from rng import SessionRNG, thread_stream
+
+
+
+# The youngest age allowed to play the game
+MINIMUM_AGE = 18
+
+# The outcomes of a guess returned by Game.check_guess
+GUESS_WIN = "win"
+GUESS_WRONG = "wrong"
+GUESS_INVALID = "invalid"
+
+
+
+class GameConfig:
+    """
+    A class holding the rules of a Lucky Number variant.
+
+    The default values are those of the original game:
+    10 numbers between 0 and 100, and a shorter list keeping
+    the numbers within 10 of the lucky number.
+
+    Attributes:
+        list_size (int): The number of numbers in a lucky_list,
+            the lucky number included.
+        low (int): The smallest number that can be drawn.
+        high (int): The largest number that can be drawn.
+        window (int): How far from the lucky number a number may be
+            and still stay in the shorter list.
+        typecode (str): The array typecode that holds every number
+            between low and high.
+    """
+    __slots__ = ("list_size", "low", "high", "window", "typecode")
+
+    def __init__(self, list_size=10, low=0, high=100, window=10):
+        """
+        Initialize the GameConfig instance.
+
+        Args:
+            list_size (int): The number of numbers in a lucky_list.
+            low (int): The smallest number that can be drawn.
+            high (int): The largest number that can be drawn.
+            window (int): The elimination window of the shorter list.
+
+        Raises:
+            ValueError: If the values do not make a playable game.
+        """
+        if list_size < 1:
+            raise ValueError("A lucky_list needs at least one number.")
+        if low > high:
+            raise ValueError("The lowest number must not be above the highest.")
+        if window < 0:
+            raise ValueError("The window can not be negative.")
+        self.list_size = list_size
+        self.low = low
+        self.high = high
+        self.window = window
+        self.typecode = self._pick_typecode(low, high)
+
+
+    @staticmethod
+    def _pick_typecode(low, high):
+        """
+        Return the smallest array typecode holding low and high.
+        """
+        if low >= 0:
+            typecodes = "BHIQ"
+        else:
+            typecodes = "bhiq"
+        for typecode in typecodes:
+            info = np.iinfo(np.dtype(typecode))
+            if info.min <= low and high <= info.max:
+                return typecode
+        raise ValueError("The numbers do not fit in 64 bits.")
+
+
+
+# The rules, renderer and input of games that are not given their
+# own. The renderer writes every event at once and the input reads
+# standard input, so neither holds state between calls and one
+# instance serves every game.
+DEFAULT_CONFIG = GameConfig()
+DEFAULT_RENDERER = TerminalRenderer(buffered=False)
+DEFAULT_INPUT = ConsoleInput()
 
 
 
@@ -16,24 +106,147 @@ class Game:
         player_name (str): The player's name.
         player_birthdate (str): The player's birthdate in YYYYMMDD format.
         player_age (int): The player's age calculated from their birthdate.
-        lucky_list (list): A list of 10 random integers between 0 and 100.
+        config (GameConfig): The list size, number range and
+            window of the game.
+        lucky_list (array): An array of 10 random integers between 0 and 100,
+            or as many and as large as the config says.
         lucky_number (int): The lucky number that the player aims to guess.
         tries_count (int): Count the number of times the player has guessed.
-
+        player_input (int): The player's latest guess.
+        shorter_lucky_list (array): The numbers left to pick from
+            after a wrong guess, read from candidates when asked for.
+        candidates (CandidateSet or SortedCandidateSet): The numbers of the lucky_list that
+            have not been guessed yet. It is built from the lucky_list
+            when a round starts, or on the first guess if it is None.
+            Setting lucky_list or lucky_number sets it to None.
+        rng (SessionRNG): The game's own random number stream, or None
+            to deal from the stream shared by the games of the thread.
+            A game is given its own stream by session_rng, to be
+            replayed from its key.
+        deck (RoundDeck): Where rounds are dealt from instead of the
+            stream, whole rounds at a time by reset_round, or None.
+        metrics (GameMetrics): Where the game records its events and
+            prompt times, or None to record nothing.
+        history (RoundLog): Where the result of every round is
+            logged, or None to keep no history.
+        transcript (Transcript): Where the player's answers and the
+            round results are recorded for replay, or None.
+        renderer (Renderer): What shows the game to the player.
+        input_source (InputSource): Where the player's answers come from.
+
+    The attributes are declared in __slots__ so that a game
+    keeps no per-instance __dict__, which keeps the memory of
+    many live games small.
     """
-    def __init__(self) -> None:
+    __slots__ = ("config", "player_name", "player_birthdate", "player_age",
+                 "_lucky_list", "_lucky_number", "tries_count",
+                 "player_input", "candidates", "rng", "deck",
+                 "metrics", "history", "transcript", "renderer",
+                 "input_source")
+
+    def __init__(self, config=None, rng=None, metrics=None,
+                 history=None, transcript=None, renderer=None,
+                 input_source=None, deck=None) -> None:
         """
         Initialize the Game instance.
             
         Args:
-            None
+            config (GameConfig): The rules to play by. The original
+                10 numbers between 0 and 100 are used if not given.
+            rng (SessionRNG): The random number stream to draw from,
+                for example one spawned per session or seeded to
+                replay a game. The thread's shared stream is used
+                if not given.
+            metrics (GameMetrics): Where to record the game's events.
+                Nothing is recorded if not given.
+            history (RoundLog): Where to log the result of every round.
+            transcript (Transcript): Where to record the session for
+                replay, see Transcript.for_game.
+            renderer (Renderer): What shows the game to the player.
+                If not given, text is written to standard output as
+                soon as it is shown, like print would.
+            input_source (InputSource): Where to read the player's
+                answers from, ScriptedInput for example. Standard
+                input is read if not given.
+            deck (RoundDeck): Pre-generated rounds to deal from
+                instead of drawing them, see deck.py.
         """
+        self.config = config if config is not None else DEFAULT_CONFIG
         self.player_name = ""
         self.player_birthdate = ""
         self.player_age = 0
-        self.lucky_list = []
+        self.lucky_list = array(self.config.typecode)
         self.lucky_number = 0
         self.tries_count = 1
+        self.player_input = 0
+        self.candidates = None
+        self.rng = rng
+        self.deck = deck
+        self.metrics = metrics
+        self.history = history
+        self.transcript = transcript
+        self.renderer = renderer if renderer is not None else DEFAULT_RENDERER
+        self.input_source = (input_source if input_source is not None
+                             else DEFAULT_INPUT)
+
+
+    @property
+    def lucky_list(self):
+        return self._lucky_list
+
+
+    @lucky_list.setter
+    def lucky_list(self, value):
+        # The index describes the old list, build it again when needed
+        self._lucky_list = value
+        self.candidates = None
+
+
+    @property
+    def lucky_number(self):
+        return self._lucky_number
+
+
+    @lucky_number.setter
+    def lucky_number(self, value):
+        self._lucky_number = value
+        self.candidates = None
+
+
+    @property
+    def shorter_lucky_list(self):
+        # Built when shown rather than on every wrong guess,
+        # in the order the numbers were dealt
+        return array(self.config.typecode, in_dealt_order(
+            self.lucky_list, self.round_candidates().shorter_list()))
+
+
+    def prompt(self, message, kind):
+        """
+        Ask the player for input from the game's input source.
+        If the game has metrics, record how long the answer took,
+        and if it has a transcript, record the answer.
+
+        Args:
+            message (str): The prompt shown to the player.
+            kind (int): Which prompt it is, PROMPT_GUESS for example.
+
+        Return:
+            string:
+                The player's answer.
+        """
+        # Show everything the player has to see before the question
+        self.renderer.flush()
+        metrics = self.metrics
+        if metrics is None:
+            answer = self.input_source.read(message, kind)
+        else:
+            start = perf_counter_ns()
+            answer = self.input_source.read(message, kind)
+            metrics.time_prompt(kind, perf_counter_ns() - start)
+        if self.transcript is not None:
+            self.transcript.record_input(answer)
+        return answer
 
 
     def get_player_name(self):
@@ -51,21 +264,39 @@ class Game:
         while True:
             # Prompt the user to enter their full name
             # and store it in self.player_name
-            self.player_name = input("Enter your first name: ")
-            # Check if input contains only alphabetical characters
-            if self.player_name.isalpha():
-                # If the input is valid,
-                # capitalize the first letter of the name
-                self.player_name = self.player_name.capitalize()
+            name = self.validate_player_name(self.prompt(
+                "Enter your first name: ", game_metrics.PROMPT_NAME))
+            if name is not None:
+                self.player_name = name
                 # Return the capitalized name
                 return self.player_name
             else:
                 # If the input is not valid 
                 # (contains non-alphabetical characters),
-                # print error message and
+                # show an error message and
                 # loop to prompt for input again
-                print("Invalid input. \n"
-                      "Your game name can only contain characters.")
+                self.renderer.invalid_name()
+
+
+    @staticmethod
+    def validate_player_name(name):
+        """
+        Validate a first name.
+
+        Args:
+            name (str): The name entered by the player.
+
+        Return:
+            string:
+                The name with the first letter capitalized,
+                or None if it contains anything but characters.
+        """
+        # Check if input contains only alphabetical characters
+        if name.isalpha():
+            # If the input is valid,
+            # capitalize the first letter of the name
+            return name.capitalize()
+        return None
 
 
     def get_player_birthdate(self):
@@ -81,24 +312,45 @@ class Game:
         """
         while True:
             # Ask the user for their birthdate
-            birthdate_input = input("Enter your birthdate (YYYYMMDD): ")
-
-            # Check if the input has 8 characters and consists of digits
-            if len(birthdate_input) == 8 and birthdate_input.isdigit():
-                year = int(birthdate_input[:4])
-                month = int(birthdate_input[4:6])
-                day = int(birthdate_input[6:8])
-
-                # Validate year, month and day ranges
-                if 1900 <= year <= 9999 and 1 <= month <= 12 and \
-                     1 <= day <= 31:
-                    self.player_birthdate = birthdate_input
-                    # Return the valid input
-                    return self.player_birthdate
-                else:
-                    print("Invalid date. Please enter a valid date.")
+            birthdate_input = self.prompt("Enter your birthdate (YYYYMMDD): ",
+                                          game_metrics.PROMPT_BIRTHDATE)
+
+            error = self.validate_birthdate(birthdate_input)
+            if error is None:
+                self.player_birthdate = birthdate_input
+                # Return the valid input
+                return self.player_birthdate
             else:
-                print("Invalid format. Please use YYYYMMDD format.")
+                self.renderer.invalid_birthdate(error)
+
+
+    @staticmethod
+    def validate_birthdate(birthdate):
+        """
+        Validate a birthdate in YYYYMMDD format.
+
+        Args:
+            birthdate (str): The birthdate entered by the player.
+
+        Return:
+            string:
+                The error message to show the player,
+                or None if the birthdate is valid.
+        """
+        # Check if the input has 8 characters and consists of digits
+        if len(birthdate) == 8 and birthdate.isdigit():
+            year = int(birthdate[:4])
+            month = int(birthdate[4:6])
+            day = int(birthdate[6:8])
+
+            # Validate year, month and day ranges
+            if 1900 <= year <= 9999 and 1 <= month <= 12 and \
+                 1 <= day <= 31:
+                return None
+            else:
+                return "Invalid date. Please enter a valid date."
+        else:
+            return "Invalid format. Please use YYYYMMDD format."
 
 
     def calculate_player_age(self):
@@ -119,20 +371,63 @@ class Game:
         If they are - set the eligibility_checked attribute.
         If they're not - raise an AgeEligibilityError.
         """
-        if self.player_age >= 18:
+        if self.player_is_eligible():
             return self.player_age
         else:
-            print("You must be 18 years or older to play this game.\n"\
-                  "Exiting the game.")
+            self.renderer.underage()
+            self.renderer.flush()
             exit()
 
 
+    def player_is_eligible(self):
+        """
+        Check if the player is old enough to play, and count
+        the outcome if the game has metrics.
+
+        Return:
+            bool:
+                True if the player is 18 years or older.
+        """
+        eligible = self.player_age >= MINIMUM_AGE
+        if self.metrics is not None:
+            self.metrics.count(game_metrics.PLAYERS_ELIGIBLE if eligible
+                               else game_metrics.PLAYERS_UNDERAGE)
+        return eligible
+
+
+    def session_rng(self):
+        """
+        Return the game's own random number stream,
+        creating one if it has none yet.
+
+        Return:
+            SessionRNG:
+                The stream the game's next rounds are dealt from.
+        """
+        if self.rng is None:
+            self.rng = SessionRNG()
+        return self.rng
+
+
+    def dealing_rng(self):
+        """
+        Return the stream to deal the next numbers from: the game's
+        own stream, or the thread's shared stream if it has none.
+        """
+        return self.rng if self.rng is not None else thread_stream()
+
+
     def generate_lucky_list(self):
         """
         Generate a list of 9 integers between 0-100 and 
         save it in the lucky_list attribute.
+
+        The size and range come from the config, and the numbers
+        are drawn in one vectorized call however long the list is.
         """
-        self.lucky_list = [random.randint(0, 100) for _ in range(9)]
+        numbers = self.dealing_rng().draw_numbers(self.config.list_size - 1,
+                                                  self.config)
+        self.lucky_list = array(self.config.typecode, numbers.tobytes())
 
 
     def generate_lucky_number(self):
@@ -140,66 +435,143 @@ class Game:
         Generate a lucky number between 0 and 100 and
         add it to the lucky_list.
         """
-        self.lucky_number = random.randint(0, 100)
+        self.lucky_number = self.dealing_rng().draw_number(self.config)
         # Add the lucky number to the lucky_list
         self.lucky_list.append(self.lucky_number)
-        print(self.lucky_list)
+        # Appending changes the list without going through its setter
+        self.candidates = None
 
 
     def ask_for_player_input(self):
         """
         Continuously prompts the player for input
-        and handles guesses and errors.
+        and handles guesses and errors until the round is over.
+
+        Return:
+            bool:
+                True if the player guessed the lucky number,
+                False if the round ended in GAME OVER.
         """
         while True:
             try:
                 # Capture player's input
-                self.player_input = int(input("Pick a number from the list: "))
+                self.player_input = int(self.prompt(
+                    "Pick a number from the list: ", game_metrics.PROMPT_GUESS))
                 
-                # Check if the player's input is in the lucky_list
-                if self.player_input in self.lucky_list and self.player_input == self.lucky_number:
+                outcome = self.check_guess()
+                if outcome == GUESS_WIN:
                     self.congratulate_player(self.tries_count)
-                    if not self.play_again():
-                        print("Thank you for playing! Goodbye.")
-                        exit()
-                    return
-                # Handle cases where input is in lucky_list but doesn't match lucky_number
-                elif self.player_input in self.lucky_list and self.player_input != self.lucky_number:
-                    self.handle_wrong_guess()
+                    return True
+                elif outcome == GUESS_WRONG:
+                    if not self.handle_wrong_guess():
+                        return False
                 else:
-                    print("Invalid choice. Pick a number from the list.")
+                    self.renderer.invalid_choice()
             except ValueError:
-                print("Invalid input. Please enter a number.")
+                if self.metrics is not None:
+                    self.metrics.count(game_metrics.INVALID_GUESSES)
+                self.renderer.invalid_number()
 
             # Increment tries_count each time the player guesses
             self.tries_count += 1
 
 
-    def handle_wrong_guess(self):
+    def round_candidates(self):
         """
-        Handle the case when the player's guess is wrong.
-        Generates a new shorter list by removing the guessed number
-        and numbers differing by 10 or less from the lucky number.
+        Return the index of the numbers still in play this round,
+        building it from the lucky_list if there is none yet.
+
+        Return:
+            CandidateSet:
+                The numbers that have not been guessed yet.
+        """
+        if self.candidates is None:
+            self.candidates = make_candidates(self.lucky_list,
+                                              self.lucky_number, self.config)
+        return self.candidates
+
+
+    def check_guess(self):
+        """
+        Compare the player's input with the lucky_list
+        and the lucky number.
+
+        Return:
+            string:
+                GUESS_WIN if the input is the lucky number,
+                GUESS_WRONG if it is another number in the list and
+                GUESS_INVALID if it is not in the list at all.
+        """
+        # Check if the player's input is in the lucky_list,
+        # looking it up once for both outcomes
+        in_list = self.player_input in self.round_candidates()
+        if in_list and self.player_input == self.lucky_number:
+            outcome = GUESS_WIN
+        # Handle cases where input is in lucky_list but doesn't match lucky_number
+        elif in_list and self.player_input != self.lucky_number:
+            outcome = GUESS_WRONG
+        else:
+            outcome = GUESS_INVALID
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.count(game_metrics.GUESSES)
+            if outcome == GUESS_WIN:
+                metrics.round_over(True, self.tries_count)
+            elif outcome == GUESS_INVALID:
+                metrics.count(game_metrics.INVALID_GUESSES)
+        return outcome
+
+
+    def eliminate_guess(self):
         """
+        Remove the player's wrong guess from the numbers in play.
+        The shorter list, the numbers differing by the window or less
+        from the lucky number (10 in the default config), is read
+        from what is left when it is shown.
+
+        Return:
+            bool:
+                True if there are enough numbers left for another
+                guess, False if the round is over.
+        """
+        candidates = self.round_candidates()
         # Check if the lucky number is in the lucky_list
-        if self.lucky_number in self.lucky_list:
+        if self.lucky_number in candidates:
             # Remove the guessed number from the list
-            self.lucky_list.remove(self.player_input)
-
-        # Generate a new shorter list
-        self.shorter_lucky_list = [num for num in self.lucky_list if \
-                                   abs(num - self.lucky_number) <= 10]
+            candidates.remove(self.player_input)
 
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.count(game_metrics.WRONG_GUESSES)
         # Check if there are enough numbers for another guess
-        if len(self.shorter_lucky_list) >= 2:
-            print(f"Wrong number. This was your {self.tries_count} try.\n"
-                f"Let's try again from a shorter list.\n"
-                f"{self.shorter_lucky_list}")
+        if candidates.window_count < 2:
+            if metrics is not None:
+                metrics.round_over(False, self.tries_count)
+            return False
+
+        return True
+
+
+    def handle_wrong_guess(self):
+        """
+        Handle the case when the player's guess is wrong.
+        Generates a new shorter list by removing the guessed number
+        and numbers differing by the window or less from the lucky number.
+
+        Return:
+            bool:
+                True if there are enough numbers left for another
+                guess, False if the round is over.
+        """
+        if self.eliminate_guess():
+            self.renderer.wrong_guess(self.tries_count,
+                                      self.shorter_lucky_list)
+            return True
         else:
             # If there are not enough numbers in the shorter list
-            print("GAME OVER")
-            self.play_again()
-            exit()
+            self.renderer.game_over()
+            return False
 
 
     def congratulate_player(self, tries_count):
@@ -209,52 +581,133 @@ class Game:
         Args:
             tries_count (int): The number of attempts made by the player.
         """
-        print(f"Congratulations!\n"
-              f"You got the lucky number from try {tries_count}\n")
+        self.renderer.congratulate(tries_count)
 
 
     def play_again(self):
         """
         Allows the player to decide whether to play another round.
         Handles player input for different scenarios.
+
+        Return:
+            bool:
+                True if the player wants another round, False if not.
         """
         while True:
-            # Prompt the player for input and remove
-            # leading/trailing whitespace, make it lowercase
-            play_again = input \
-                ("Do you want to play again?\n (y: Yes, n: No): ")\
-                .strip().lower()
-            if play_again == 'y':
-                # Start a new round
-                self.start_new_round()
-            elif play_again == 'n':
-                # Exit the game
-                self.exit_game()
+            choice = self.play_again_answer(self.prompt(
+                "Do you want to play again?\n (y: Yes, n: No): ",
+                game_metrics.PROMPT_PLAY_AGAIN))
+            if choice is not None:
+                return choice
             else:
                 # Handle invalid input
                 self.handle_invalid_input()
 
 
-    def start_new_round(self):
+    def play_again_answer(self, answer):
         """
-        Reset game state and start a new round.
+        Read the player's answer to the play again question, and
+        count it if the game has metrics.
+
+        Args:
+            answer (str): The answer as the player entered it.
+
+        Return:
+            bool:
+                True for 'y', False for 'n' and None if the
+                answer is neither.
+        """
+        # Remove leading/trailing whitespace, make it lowercase
+        play_again = answer.strip().lower()
+        if play_again == 'y':
+            if self.metrics is not None:
+                self.metrics.count(game_metrics.PLAY_AGAIN_YES)
+            return True
+        elif play_again == 'n':
+            if self.metrics is not None:
+                self.metrics.count(game_metrics.PLAY_AGAIN_NO)
+            return False
+        return None
+
+
+    def reset_round(self):
+        """
+        Reset game state and generate the numbers of a new round.
         """
         # Reset the number of tries
         self.tries_count = 1
-        # Generate a new list of lucky numbers
-        self.generate_lucky_list()
-        # Generate a new lucky number
-        self.generate_lucky_number()
+        # Draw the whole list in one call, the last
+        # number being the lucky number as in generate_lucky_number
+        if self.deck is not None:
+            numbers, _ = self.deck.deal(self.config)
+        else:
+            numbers = self.dealing_rng().draw_numbers(self.config.list_size,
+                                                      self.config)
+        self.lucky_list = array(self.config.typecode, numbers.tobytes())
+        self.lucky_number = self.lucky_list[-1]
+        # Index the new list for the guesses to come
+        self.candidates = make_candidates(self.lucky_list,
+                                          self.lucky_number, self.config)
+        if self.metrics is not None:
+            self.metrics.count(game_metrics.ROUNDS_STARTED)
+
+
+    def start_new_round(self):
+        """
+        Reset game state and play a new round.
+
+        Return:
+            bool:
+                True if the player guessed the lucky number,
+                False if the round ended in GAME OVER.
+        """
+        self.reset_round()
+        # Show the player the list to pick from
+        self.renderer.show_list(self.lucky_list)
         # Ask for the player's input in the new round
-        self.ask_for_player_input()
+        won = self.ask_for_player_input()
+        self.finish_round(won)
+        return won
+
+
+    def finish_round(self, won):
+        """
+        Record the end of a round in the game's history and
+        transcript, if it has them.
+
+        Args:
+            won (bool): True if the player guessed the lucky number.
+        """
+        if self.history is not None:
+            self.history.append(self, won)
+        if self.transcript is not None:
+            self.transcript.record_result(self.lucky_number,
+                                          self.tries_count, won)
+
+
+    def play_session(self):
+        """
+        Play rounds until the player no longer wants to play,
+        then exit the game.
+
+        Each round runs to completion before the next one starts,
+        so a session uses the same amount of memory however
+        many rounds the player plays.
+        """
+        while True:
+            self.start_new_round()
+            if not self.play_again():
+                # Exit the game
+                self.exit_game()
 
 
     def exit_game(self):
         """
         Exit the game.
         """
-        # Print a message and exit the game
-        print("Thank you for playing! Goodbye.")
+        # Say goodbye and exit the game
+        self.renderer.goodbye()
+        self.renderer.flush()
         exit()
 
 
@@ -262,6 +715,6 @@ class Game:
         """
         Handle invalid input from the player.
         """
-        # Print an error message for invalid input
-        print("Invalid input. Enter 'y' for Yes or 'n' for No.")
+        # Show an error message for invalid input
+        self.renderer.invalid_play_again()
 
@@ -0,0 +1,478 @@
+import argparse
+import hashlib
+import os
+import time
+import numpy as np
+from game import GameConfig
+
+
+
+# The first bytes of every round log, and the size of its header
+MAGIC = b"LUCKYLOG"
+VERSION = 2
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"),
+                         ("list_size", "<u4"), ("low", "<i8"),
+                         ("high", "<i8"), ("window", "<i8")])
+
+# The totals of one player over the indexed rounds, and the best
+# tries of a player who has not won a round yet
+PLAYER_DTYPE = np.dtype([("player_id", "<u8"), ("first", "<u8"),
+                         ("rounds", "<u8"), ("wins", "<u8"),
+                         ("best_tries", "<u4")])
+NO_WIN = np.iinfo(np.uint32).max
+
+
+
+def player_id(name, birthdate):
+    """
+    Return the 64-bit id of a player, the same on every run.
+
+    Args:
+        name (str): The player's name.
+        birthdate (str): The player's birthdate in YYYYMMDD format.
+
+    Return:
+        int:
+            The id the player's rounds are indexed by.
+    """
+    digest = hashlib.blake2b(f"{name}|{birthdate}".encode(),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def record_dtype(config, name_width=32):
+    """
+    Return the type of one round record.
+
+    Every record has the same width, so record n of a log
+    starts at HEADER_SIZE + n * itemsize.
+
+    Args:
+        config (GameConfig): The rules the rounds were played by.
+            The list size and number type set the record width.
+        name_width (int): The most bytes a player name may take.
+
+    Return:
+        numpy.dtype:
+            A structured type with one field per column.
+    """
+    value_dtype = np.dtype(config.typecode).newbyteorder("<")
+    return np.dtype([
+        ("time", "<f8"),
+        ("player_id", "<u8"),
+        ("name", f"S{name_width}"),
+        ("birthdate", "<u4"),
+        ("tries", "<u4"),
+        ("won", "u1"),
+        ("lucky_number", value_dtype),
+        ("lucky_list", value_dtype, (config.list_size,)),
+    ])
+
+
+
+class RoundLog:
+    """
+    A class keeping the result of every round in an append-only file.
+
+    Rounds are collected in a preallocated batch and written
+    with one write call when the batch is full, so recording a
+    round costs no system call and never waits for the disk.
+    Records are fixed-width, so the file is read back as a
+    memory-mapped array however large it grows.
+
+    An index file next to the log holds the record numbers
+    sorted by player, and within a player in the order the
+    rounds were written. A players file holds every player's
+    totals over the indexed rounds, kept up to date with the
+    index, so leaderboards read one row per player instead of
+    every round. Records are appended in time order, so time
+    ranges are found by binary search on the log itself.
+
+    Attributes:
+        path (str): The log file.
+        index_path (str): The index file.
+        players_path (str): The file of per-player totals.
+        config (GameConfig): The rules the logged rounds are played by.
+        dtype (numpy.dtype): The type of one record.
+        batch_size (int): The number of records written at a time.
+    """
+    def __init__(self, path, config=None, batch_size=4096):
+        """
+        Initialize the RoundLog instance, creating the file if
+        it does not exist.
+
+        Args:
+            path (str): The log file.
+            config (GameConfig): The rules of the rounds to log.
+                Taken from the file if it exists.
+            batch_size (int): The number of records written at a time.
+
+        Raises:
+            ValueError: If the file is not a round log, or was
+                written with another list size or number type.
+        """
+        self.path = path
+        self.index_path = path + ".idx.npy"
+        self.players_path = path + ".players.npy"
+        self.batch_size = batch_size
+
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            with open(path, "rb") as log:
+                header = np.frombuffer(log.read(HEADER_DTYPE.itemsize),
+                                       dtype=HEADER_DTYPE)[0]
+            if header["magic"] != MAGIC or header["version"] != VERSION:
+                raise ValueError(f"{path} is not a round log.")
+            stored = GameConfig(int(header["list_size"]), int(header["low"]),
+                                int(header["high"]), int(header["window"]))
+            if config is not None and (
+                    config.list_size != stored.list_size
+                    or config.typecode != stored.typecode):
+                raise ValueError(f"{path} was written with another config.")
+            self.config = config if config is not None else stored
+        else:
+            self.config = config if config is not None else GameConfig()
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header["magic"] = MAGIC
+            header["version"] = VERSION
+            header["list_size"] = self.config.list_size
+            header["low"] = self.config.low
+            header["high"] = self.config.high
+            header["window"] = self.config.window
+            with open(path, "wb") as log:
+                log.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+
+        self.dtype = record_dtype(self.config)
+        # Drop a record cut short by a crash, so that
+        # the records appended next stay aligned
+        size = os.path.getsize(path)
+        excess = (size - HEADER_SIZE) % self.dtype.itemsize
+        if excess:
+            os.truncate(path, size - excess)
+        self._batch = np.zeros(batch_size, dtype=self.dtype)
+        self._pending = 0
+        self._file = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def append(self, game, won, timestamp=None):
+        """
+        Record the result of a finished round.
+
+        Args:
+            game (Game): The game whose round just ended.
+            won (bool): True if the player guessed the lucky number.
+            timestamp (float): When the round ended, in seconds since
+                the epoch. The current time is used if not given.
+        """
+        record = self._batch[self._pending]
+        record["time"] = time.time() if timestamp is None else timestamp
+        record["player_id"] = player_id(game.player_name,
+                                        game.player_birthdate)
+        record["name"] = game.player_name.encode()[:self.dtype["name"].itemsize]
+        record["birthdate"] = int(game.player_birthdate or 0)
+        record["tries"] = game.tries_count
+        record["won"] = won
+        record["lucky_number"] = game.lucky_number
+        record["lucky_list"] = game.lucky_list
+        self._pending += 1
+        if self._pending == self.batch_size:
+            self.flush()
+
+
+    def flush(self, sync=False):
+        """
+        Write the pending records to the file.
+
+        Args:
+            sync (bool): Also wait for the operating system to
+                write the file to disk.
+        """
+        if self._pending:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(self._batch[:self._pending].tobytes())
+            self._pending = 0
+        if self._file is not None:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+
+    def close(self):
+        """
+        Write the pending records and close the file.
+        """
+        self.flush(sync=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+    def records(self):
+        """
+        Return every written record as a read-only memory map.
+
+        Pending records are written first.
+
+        Return:
+            numpy.memmap or numpy.ndarray:
+                One entry per record, in the order they were written.
+        """
+        self.flush()
+        count = (os.path.getsize(self.path) - HEADER_SIZE) // self.dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode="r",
+                         offset=HEADER_SIZE, shape=(count,))
+
+
+    def build_index(self):
+        """
+        Bring the index and the per-player totals up to date
+        with the log.
+
+        Only the records written since the last build are sorted.
+        They are then merged with the old index by a stable sort,
+        which finds the two sorted runs and merges them in one pass.
+        The totals of the new records are added to the old ones
+        the same way.
+
+        Return:
+            int:
+                The number of records in the index.
+        """
+        records = self.records()
+        index = self.index()
+        start = len(index)
+        players = self.players()
+        recounted = int(players["rounds"].sum()) != start
+        if recounted:
+            # The totals were lost or written without their index,
+            # count them again from every indexed round
+            players = self._totals(records, np.asarray(index))
+        if start == len(records):
+            if recounted:
+                self._save(self.players_path, players)
+            return start
+
+        tail = np.arange(start, len(records), dtype=np.uint64)
+        tail = tail[np.argsort(records["player_id"][start:], kind="stable")]
+        merged = np.concatenate([index, tail])
+        # A stable sort keeps each player's rounds in write order
+        merged = merged[np.argsort(records["player_id"][merged], kind="stable")]
+
+        # The old totals come first, so a player's first round stays first
+        totals = np.concatenate([players, self._totals(records, tail)])
+        totals = totals[np.argsort(totals["player_id"], kind="stable")]
+        self._save(self.players_path, self._combine(totals))
+        self._save(self.index_path, merged)
+        return len(merged)
+
+
+    @staticmethod
+    def _save(path, array):
+        """
+        Write a new file and rename it, so that readers
+        never see a half written index or totals file.
+        """
+        temporary = path + ".tmp.npy"
+        np.save(temporary, array)
+        os.replace(temporary, path)
+
+
+    @staticmethod
+    def _totals(records, numbers):
+        """
+        Return the totals of every player over the given record
+        numbers, which are sorted by player in write order.
+        """
+        if len(numbers) == 0:
+            return np.zeros(0, dtype=PLAYER_DTYPE)
+        ids = records["player_id"][numbers]
+        won = records["won"][numbers]
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        totals = np.zeros(len(starts), dtype=PLAYER_DTYPE)
+        totals["player_id"] = ids[starts]
+        totals["first"] = numbers[starts]
+        totals["rounds"] = np.diff(np.append(starts, len(numbers)))
+        totals["wins"] = np.add.reduceat(won.astype(np.uint64), starts)
+        # Lost rounds count as more tries than any win
+        totals["best_tries"] = np.minimum.reduceat(
+            np.where(won == 1, records["tries"][numbers], NO_WIN), starts)
+        return totals
+
+
+    @staticmethod
+    def _combine(totals):
+        """
+        Add up the rows of the same player in totals sorted by player.
+        """
+        if len(totals) == 0:
+            return totals
+        ids = totals["player_id"]
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        combined = totals[starts].copy()
+        combined["rounds"] = np.add.reduceat(totals["rounds"], starts)
+        combined["wins"] = np.add.reduceat(totals["wins"], starts)
+        combined["best_tries"] = np.minimum.reduceat(totals["best_tries"],
+                                                     starts)
+        return combined
+
+
+    def index(self):
+        """
+        Return the record numbers sorted by player, memory-mapped.
+
+        Return:
+            numpy.ndarray:
+                The record numbers, empty if there is no index yet.
+        """
+        if not os.path.exists(self.index_path):
+            return np.zeros(0, dtype=np.uint64)
+        return np.load(self.index_path, mmap_mode="r")
+
+
+    def players(self):
+        """
+        Return the totals of every indexed player, memory-mapped.
+
+        Return:
+            numpy.ndarray:
+                One PLAYER_DTYPE row per player, sorted by player id,
+                empty if there is no index yet.
+        """
+        if not os.path.exists(self.players_path):
+            return np.zeros(0, dtype=PLAYER_DTYPE)
+        return np.load(self.players_path, mmap_mode="r")
+
+
+    def player_rounds(self, name, birthdate):
+        """
+        Return every indexed round of a player.
+
+        Args:
+            name (str): The player's name.
+            birthdate (str): The player's birthdate in YYYYMMDD format.
+
+        Return:
+            numpy.ndarray:
+                The player's records in the order they were written.
+        """
+        records = self.records()
+        index = self.index()
+        if len(index) == 0:
+            return np.zeros(0, dtype=self.dtype)
+        key = np.uint64(player_id(name, birthdate))
+        ids = records["player_id"]
+        # Binary search over the sorted ids without copying them
+        low, high = 0, len(index)
+        while low < high:
+            middle = (low + high) // 2
+            if ids[index[middle]] < key:
+                low = middle + 1
+            else:
+                high = middle
+        stop = low
+        while stop < len(index) and ids[index[stop]] == key:
+            stop += 1
+        return records[np.asarray(index[low:stop])]
+
+
+    def between(self, start, end):
+        """
+        Return the rounds that ended in a time range.
+
+        Args:
+            start (float): The earliest time, in seconds since the epoch.
+            end (float): The time to stop before.
+
+        Return:
+            numpy.ndarray:
+                The records from start up to end.
+        """
+        records = self.records()
+        times = records["time"]
+        return records[np.searchsorted(times, start, side="left"):
+                       np.searchsorted(times, end, side="left")]
+
+
+    def most_wins(self, count=10):
+        """
+        Return the players with the most rounds won.
+
+        Args:
+            count (int): The length of the leaderboard.
+
+        Return:
+            list:
+                (name, birthdate, wins) for each player,
+                most wins first.
+        """
+        players = self.players()
+        wins = players["wins"].astype(np.int64)
+        return self._leaders(players, -wins, wins, count)
+
+
+    def fewest_tries(self, count=10):
+        """
+        Return the players who won a round in the fewest tries.
+
+        Args:
+            count (int): The length of the leaderboard.
+
+        Return:
+            list:
+                (name, birthdate, tries) for each player who won
+                a round, fewest tries first.
+        """
+        players = self.players()
+        players = players[players["best_tries"] < NO_WIN]
+        best = players["best_tries"]
+        return self._leaders(players, best, best, count)
+
+
+    def _leaders(self, players, keys, values, count):
+        """
+        Return the players with the smallest keys, smallest first.
+        """
+        if len(keys) > count:
+            top = np.argpartition(keys, count - 1)[:count]
+        else:
+            top = np.arange(len(keys))
+        top = top[np.argsort(keys[top], kind="stable")]
+        # Only the leaders' first rounds are read from the log,
+        # for their names and birthdates
+        first = self.records()[np.asarray(players["first"][top])]
+        return [(name.decode(errors="replace"), f"{birthdate:08d}", int(value))
+                for name, birthdate, value
+                in zip(first["name"], first["birthdate"].tolist(),
+                       np.asarray(values)[top])]
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show the leaderboards of a round log.")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    log = RoundLog(args.path)
+    start = time.perf_counter()
+    log.build_index()
+    print(f"Indexed {len(log.index()):,} rounds "
+          f"in {time.perf_counter() - start:.2f}s")
+    print("Most wins:")
+    for name, birthdate, wins in log.most_wins(args.top):
+        print(f"  {name} ({birthdate}): {wins}")
+    print("Fewest tries:")
+    for name, birthdate, tries in log.fewest_tries(args.top):
+        print(f"  {name} ({birthdate}): {tries}")
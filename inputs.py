@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from time import perf_counter_ns
+
+
+
+class ScriptEnded(Exception):
+    """
+    Raised when a game asks a scripted input for more answers
+    than its script holds.
+    """
+
+
+
+class InputSource(ABC):
+    """
+    A class giving the game the player's answers.
+
+    Game asks its input source for every answer, through
+    Game.prompt, so a game can be played from the keyboard,
+    from a script or from anything else that answers prompts.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def read(self, message, kind):
+        """
+        Return the player's answer to a prompt.
+
+        Args:
+            message (str): The prompt shown to the player.
+            kind (int): Which prompt it is, PROMPT_GUESS for example.
+
+        Return:
+            string:
+                The answer as the player entered it.
+        """
+
+
+
+class ConsoleInput(InputSource):
+    """
+    A class reading the player's answers from standard input,
+    like the input built-in does.
+    """
+    __slots__ = ()
+
+    def read(self, message, kind):
+        return input(message)
+
+
+
+class ScriptedInput(InputSource):
+    """
+    A class answering prompts from a script, for tests, load
+    runs and regression runs.
+
+    The script is any iterable of answers and is read lazily, one
+    answer per prompt. A generator holding a reference to the game
+    can work out each answer from the game's state when it is
+    asked for, the lucky number of the current round for example.
+    Nothing is shared between scripted inputs, so games driven by
+    scripts can be played in many threads at once.
+
+    Attributes:
+        answered (int): The number of answers given so far.
+        latencies (list): If not None, the nanoseconds from giving
+            each answer to being asked for the next one, which is
+            the time the game took to handle the answer.
+    """
+    __slots__ = ("answered", "latencies", "_answers", "_answered_at")
+
+    def __init__(self, answers, latencies=None):
+        """
+        Initialize the ScriptedInput instance.
+
+        Args:
+            answers (iterable): The answers, in the order they are given.
+            latencies (list): Where to append how long the game took
+                to handle each answer. Nothing is timed if not given.
+        """
+        self.answered = 0
+        self.latencies = latencies
+        self._answers = iter(answers)
+        self._answered_at = None
+
+
+    def read(self, message, kind):
+        """
+        Return the next answer of the script.
+
+        Raises:
+            ScriptEnded: If every answer of the script has been given.
+        """
+        if self.latencies is not None and self._answered_at is not None:
+            self.latencies.append(perf_counter_ns() - self._answered_at)
+        answer = next(self._answers, None)
+        if answer is None:
+            raise ScriptEnded()
+        self.answered += 1
+        if self.latencies is not None:
+            self._answered_at = perf_counter_ns()
+        return str(answer)
@@ -0,0 +1,178 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from game import Game, GameConfig
+from inputs import ScriptedInput, ScriptEnded
+from renderer import NullRenderer
+from rng import SessionRNG
+
+
+
+def wrong_guess(game):
+    """
+    Return a number still in play that is not the lucky number,
+    or None if every number left is the lucky number.
+    """
+    for number in game.round_candidates().to_list():
+        if number != game.lucky_number:
+            return number
+    return None
+
+
+def player_script(game, rounds=3, wrong_guesses=1, name="Loadgen",
+                  birthdate="19900101"):
+    """
+    Yield the answers of a player playing a number of rounds.
+
+    The player registers, makes a number of wrong guesses in every
+    round and then picks the lucky number, unless the wrong guesses
+    ended the round in GAME OVER, and plays again until the last
+    round. Each answer is worked out from the game when it is asked
+    for, so the script follows whatever the game deals.
+
+    Args:
+        game (Game): The game the answers are for.
+        rounds (int): The number of rounds to play.
+        wrong_guesses (int): The wrong guesses made in every round.
+        name (str): The player's name.
+        birthdate (str): The player's birthdate in YYYYMMDD format.
+
+    Return:
+        generator:
+            The answers, as ScriptedInput reads them.
+    """
+    yield name
+    yield birthdate
+    for round_number in range(rounds):
+        round_over = False
+        for _ in range(wrong_guesses):
+            guess = wrong_guess(game)
+            if guess is None:
+                break
+            yield guess
+            # The game has handled the guess when the next answer
+            # is asked for, so the numbers left tell if it was the last
+            if game.round_candidates().window_count < 2:
+                round_over = True
+                break
+        if not round_over:
+            yield game.lucky_number
+        yield "y" if round_number < rounds - 1 else "n"
+
+
+def play_scripted(game):
+    """
+    Play a session with the steps of main.py, until the player
+    leaves, fails the age check or the script runs out.
+
+    Return:
+        int:
+            The number of answers the session took.
+    """
+    try:
+        game.get_player_name()
+        game.get_player_birthdate()
+        game.calculate_player_age()
+        game.check_age_eligibility()
+        game.play_session()
+    except (SystemExit, ScriptEnded):
+        pass
+    return game.input_source.answered
+
+
+def _run_sessions(streams, config, rounds, wrong_guesses):
+    """
+    Play one scripted session per stream in the calling thread.
+
+    Return:
+        tuple:
+            The seconds each session took, the nanoseconds the games
+            took to handle each answer and the number of answers.
+    """
+    durations = []
+    latencies = []
+    answers = 0
+    for stream in streams:
+        start = time.perf_counter()
+        game = Game(config, stream, renderer=NullRenderer())
+        game.input_source = ScriptedInput(
+            player_script(game, rounds, wrong_guesses), latencies)
+        answers += play_scripted(game)
+        durations.append(time.perf_counter() - start)
+    return durations, latencies, answers
+
+
+def run_load(sessions, rounds=3, wrong_guesses=1, threads=1, seed=None,
+             config=None):
+    """
+    Play many scripted sessions in-process and measure them.
+
+    Every session has its own random stream spawned from the seed,
+    its own scripted input and shows nothing, so sessions are
+    independent and can be spread over threads.
+
+    Args:
+        sessions (int): The number of sessions to play.
+        rounds (int): The rounds played per session.
+        wrong_guesses (int): The wrong guesses made per round.
+        threads (int): The number of threads playing sessions.
+        seed (int): The seed the sessions' streams are spawned from.
+        config (GameConfig): The rules to play by.
+
+    Return:
+        dict:
+            The sessions and answers played, the seconds taken, the
+            sessions per second, and the median, 90th and 99th
+            percentile of the session times in milliseconds and of
+            the answer handling times in microseconds.
+    """
+    config = config if config is not None else GameConfig()
+    streams = SessionRNG(seed).spawn(sessions)
+    shards = [streams[index::threads] for index in range(threads)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(
+            lambda shard: _run_sessions(shard, config, rounds, wrong_guesses),
+            shards))
+    elapsed = time.perf_counter() - start
+
+    durations = np.concatenate([result[0] for result in results]) * 1e3
+    latencies = np.concatenate([np.asarray(result[1], dtype=np.float64)
+                                for result in results]) / 1e3
+    report = {
+        "sessions": sessions,
+        "answers": sum(result[2] for result in results),
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(sessions / max(elapsed, 1e-9), 1),
+    }
+    for name, values, unit in [("session", durations, "ms"),
+                               ("answer", latencies, "us")]:
+        for percentile in (50, 90, 99):
+            report[f"{name}_p{percentile}_{unit}"] = (
+                round(float(np.percentile(values, percentile)), 3)
+                if len(values) else 0.0)
+    return report
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play scripted sessions in-process and report throughput.")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--wrong-guesses", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    report = run_load(args.sessions, args.rounds, args.wrong_guesses,
+                      args.threads, args.seed)
+    print(f"Sessions: {report['sessions']} ({report['answers']} answers) "
+          f"in {report['seconds']:.2f}s, "
+          f"{report['sessions_per_second']:,.0f} per second")
+    print(f"Session time (ms): p50 {report['session_p50_ms']}, "
+          f"p90 {report['session_p90_ms']}, p99 {report['session_p99_ms']}")
+    print(f"Answer handling (us): p50 {report['answer_p50_us']}, "
+          f"p90 {report['answer_p90_us']}, p99 {report['answer_p99_us']}")
@@ -1,12 +1,14 @@
 from datetime import datetime
 import random
 from game import Game
+from renderer import TerminalRenderer
 
 
 
 if __name__ == "__main__":
-    # Create an instance of the Game class
-    game = Game()
+    # Create an instance of the Game class, writing everything
+    # shown between two questions to the terminal at once
+    game = Game(renderer=TerminalRenderer())
 
     # Print a welcome message to the player
     print("\nWelcome to Lucky Number!\n")
@@ -35,21 +37,5 @@ if __name__ == "__main__":
     # Print a message indicating that the game will begin
     print(f"\n★ {name}, Let the game begin ★\n")
 
-    # Generate a list of lucky numbers using the game object
-    game.generate_lucky_list()
-
-    # Generate the lucky number that the player needs to guess
-    game.generate_lucky_number()
-
-    # Ask the player for their input (guess)
-    game.ask_for_player_input()
-
-    # Handle the case where the player's guess is wrong
-    game.handle_wrong_guess()
-
-    # Congratulate the player on guessing the
-    # lucky number and display the number of tries
-    game.congratulate_player(game.tries_count)
-
-    # Ask the player if they want to play the game again
-    game.play_again()
+    # Play rounds until the player wants to stop
+    game.play_session()
@@ -0,0 +1,166 @@
+from array import array
+import json
+import time
+
+
+
+# Counters, by index in GameMetrics.counters
+ROUNDS_STARTED = 0
+ROUNDS_WON = 1
+GAME_OVERS = 2
+GUESSES = 3
+WRONG_GUESSES = 4
+INVALID_GUESSES = 5
+PLAYERS_ELIGIBLE = 6
+PLAYERS_UNDERAGE = 7
+PLAY_AGAIN_YES = 8
+PLAY_AGAIN_NO = 9
+PROFILE_HITS = 10
+PROFILE_MISSES = 11
+PROFILE_EXPIRED = 12
+PROFILE_EVICTIONS = 13
+PROFILE_INVALID = 14
+COUNTER_NAMES = ("rounds_started", "rounds_won", "game_overs", "guesses",
+                 "wrong_guesses", "invalid_guesses", "players_eligible",
+                 "players_underage", "play_again_yes", "play_again_no",
+                 "profile_hits", "profile_misses", "profile_expired",
+                 "profile_evictions", "profile_invalid")
+
+# Prompts, by index in the prompt timing buffers
+PROMPT_NAME = 0
+PROMPT_BIRTHDATE = 1
+PROMPT_GUESS = 2
+PROMPT_PLAY_AGAIN = 3
+PROMPT_NAMES = ("name", "birthdate", "guess", "play_again")
+
+# Prompt times are counted in buckets of powers of two nanoseconds,
+# bucket n holding the times from 2**(n-1) up to 2**n nanoseconds
+TIME_BUCKETS = 64
+
+
+
+class GameMetrics:
+    """
+    A class collecting counters, histograms and timings of games.
+
+    Every buffer is an array allocated once, when the metrics are
+    created, so recording an event is an index and an add with no
+    allocation. A Game without metrics skips recording altogether.
+    One GameMetrics can be shared by every game in a process.
+
+    Attributes:
+        counters (array): One counter per event in COUNTER_NAMES.
+        tries_histogram (array): Index n holds the number of rounds
+            that ended on try n. The last index also holds every
+            round that took longer.
+        prompt_counts (array): How many answers each prompt got.
+        prompt_totals (array): The nanoseconds spent waiting for
+            the answers to each prompt.
+        prompt_buckets (array): The prompt times of each prompt in
+            TIME_BUCKETS power of two buckets, one row per prompt.
+    """
+    __slots__ = ("counters", "tries_histogram", "prompt_counts",
+                 "prompt_totals", "prompt_buckets")
+
+    def __init__(self, max_tries=64):
+        """
+        Initialize the GameMetrics instance.
+
+        Args:
+            max_tries (int): The largest number of tries counted
+                separately in the tries histogram.
+        """
+        self.counters = array("Q", bytes(8 * len(COUNTER_NAMES)))
+        self.tries_histogram = array("Q", bytes(8 * (max_tries + 1)))
+        self.prompt_counts = array("Q", bytes(8 * len(PROMPT_NAMES)))
+        self.prompt_totals = array("Q", bytes(8 * len(PROMPT_NAMES)))
+        self.prompt_buckets = array(
+            "Q", bytes(8 * len(PROMPT_NAMES) * TIME_BUCKETS))
+
+
+    def count(self, counter):
+        """
+        Add one to a counter.
+
+        Args:
+            counter (int): The index of the counter, ROUNDS_WON for example.
+        """
+        self.counters[counter] += 1
+
+
+    def round_over(self, won, tries_count):
+        """
+        Record a finished round.
+
+        Args:
+            won (bool): True if the lucky number was guessed.
+            tries_count (int): The number of tries the round took.
+        """
+        self.counters[ROUNDS_WON if won else GAME_OVERS] += 1
+        last = len(self.tries_histogram) - 1
+        self.tries_histogram[tries_count if tries_count < last else last] += 1
+
+
+    def time_prompt(self, prompt, nanoseconds):
+        """
+        Record how long the player took to answer a prompt.
+
+        Args:
+            prompt (int): The index of the prompt, PROMPT_GUESS for example.
+            nanoseconds (int): The time from asking to the answer.
+        """
+        self.prompt_counts[prompt] += 1
+        self.prompt_totals[prompt] += nanoseconds
+        bucket = min(nanoseconds.bit_length(), TIME_BUCKETS - 1)
+        self.prompt_buckets[prompt * TIME_BUCKETS + bucket] += 1
+
+
+    def merge(self, other):
+        """
+        Add the events recorded by other metrics to these.
+
+        Args:
+            other (GameMetrics): Metrics with the same max_tries.
+        """
+        for mine, theirs in ((self.counters, other.counters),
+                             (self.tries_histogram, other.tries_histogram),
+                             (self.prompt_counts, other.prompt_counts),
+                             (self.prompt_totals, other.prompt_totals),
+                             (self.prompt_buckets, other.prompt_buckets)):
+            for index, value in enumerate(theirs):
+                mine[index] += value
+
+
+    def snapshot(self):
+        """
+        Return a copy of everything recorded so far.
+
+        Return:
+            dict:
+                The counters by name, the tries histogram and for
+                each prompt the number of answers, the total seconds
+                and the bucket counts, with the time the snapshot
+                was taken.
+        """
+        prompts = {}
+        for index, name in enumerate(PROMPT_NAMES):
+            start = index * TIME_BUCKETS
+            prompts[name] = {
+                "count": self.prompt_counts[index],
+                "total_seconds": self.prompt_totals[index] / 1e9,
+                "buckets_ns_log2": self.prompt_buckets[
+                    start:start + TIME_BUCKETS].tolist(),
+            }
+        return {
+            "time": time.time(),
+            "counters": dict(zip(COUNTER_NAMES, self.counters)),
+            "tries_histogram": self.tries_histogram.tolist(),
+            "prompts": prompts,
+        }
+
+
+    def to_json(self):
+        """
+        Return a snapshot as a JSON string.
+        """
+        return json.dumps(self.snapshot())
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from datetime import datetime
+import metrics as game_metrics
+from game import Game, MINIMUM_AGE
+
+
+
+class PlayerProfile:
+    """
+    A class holding what registering a player works out: the
+    validated name, the parsed birthdate, the age and eligibility.
+
+    Attributes:
+        name (str): The name with the first letter capitalized.
+        birthdate (str): The birthdate in YYYYMMDD format.
+        birth_year (int): The year of the birthdate.
+        birth_month (int): The month of the birthdate.
+        birth_day (int): The day of the birthdate.
+        year (int): The year the age was counted to.
+        age (int): The player's age in that year.
+        eligible (bool): True if the player is old enough to play.
+    """
+    __slots__ = ("name", "birthdate", "birth_year", "birth_month",
+                 "birth_day", "year", "age", "eligible")
+
+    def __init__(self, name, birthdate, year):
+        """
+        Initialize the PlayerProfile instance.
+
+        Args:
+            name (str): The validated name.
+            birthdate (str): A valid birthdate in YYYYMMDD format.
+            year (int): The year to count the age to.
+        """
+        self.name = name
+        self.birthdate = birthdate
+        self.birth_year = int(birthdate[:4])
+        self.birth_month = int(birthdate[4:6])
+        self.birth_day = int(birthdate[6:8])
+        self.count_age(year)
+
+
+    def count_age(self, year):
+        """
+        Count the age and eligibility to a year, as
+        Game.calculate_player_age counts the age.
+
+        Args:
+            year (int): The year to count the age to.
+        """
+        self.year = year
+        self.age = year - self.birth_year
+        self.eligible = self.age >= MINIMUM_AGE
+
+
+
+class ProfileCache:
+    """
+    A class remembering the profiles of returning players.
+
+    Profiles are kept by lowercased name and birthdate, so a player
+    typing their name with other capitals still gets their profile,
+    and the least recently used profile is dropped when the cache
+    is full. Ages are counted by year, as Game counts them, so a
+    profile expires and its age is counted again when the year
+    changes.
+
+    Attributes:
+        max_size (int): The most profiles kept.
+        hits (int): The lookups answered from the cache.
+        misses (int): The lookups that had to validate and count
+            the profile, expired ones included.
+        invalid (int): The lookups of an invalid name or birthdate,
+            which are neither hits nor misses, so mistyped answers
+            do not lower the hit rate.
+        expired (int): The profiles found counted to an earlier year.
+        evictions (int): The profiles dropped to make room.
+        metrics (GameMetrics): Where the lookups are also counted,
+            or None.
+    """
+    __slots__ = ("max_size", "hits", "misses", "invalid", "expired",
+                 "evictions", "metrics", "_profiles")
+
+    def __init__(self, max_size=100_000, metrics=None):
+        """
+        Initialize the ProfileCache instance.
+
+        Args:
+            max_size (int): The most profiles to keep.
+            metrics (GameMetrics): Where to count the lookups.
+
+        Raises:
+            ValueError: If max_size is less than one.
+        """
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one profile.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalid = 0
+        self.expired = 0
+        self.evictions = 0
+        self.metrics = metrics
+        self._profiles = OrderedDict()
+
+
+    def __len__(self):
+        return len(self._profiles)
+
+
+    @property
+    def hit_rate(self):
+        """
+        The share of lookups answered from the cache, 0.0 before
+        the first lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+    def _count(self, counter):
+        if self.metrics is not None:
+            self.metrics.count(counter)
+
+
+    def lookup(self, name, birthdate, year=None):
+        """
+        Return the profile of a player, from the cache if it holds one.
+
+        Args:
+            name (str): The name as the player entered it.
+            birthdate (str): The birthdate as the player entered it.
+            year (int): The year to count the age to. The current
+                year is used if not given.
+
+        Return:
+            PlayerProfile:
+                The profile, or None if the name or birthdate is not
+                valid. Invalid answers are not kept.
+        """
+        if year is None:
+            year = datetime.now().year
+        # Game capitalizes names, so names differing in case are the same
+        key = (name.lower(), birthdate)
+        profiles = self._profiles
+        profile = profiles.get(key)
+        if profile is not None:
+            profiles.move_to_end(key)
+            if profile.year == year:
+                self.hits += 1
+                self._count(game_metrics.PROFILE_HITS)
+                return profile
+            self.expired += 1
+            self._count(game_metrics.PROFILE_EXPIRED)
+            self.misses += 1
+            self._count(game_metrics.PROFILE_MISSES)
+            profile.count_age(year)
+            return profile
+
+        valid_name = Game.validate_player_name(name)
+        if valid_name is None or Game.validate_birthdate(birthdate) is not None:
+            self.invalid += 1
+            self._count(game_metrics.PROFILE_INVALID)
+            return None
+        self.misses += 1
+        self._count(game_metrics.PROFILE_MISSES)
+        profile = profiles[key] = PlayerProfile(valid_name, birthdate, year)
+        if len(profiles) > self.max_size:
+            profiles.popitem(last=False)
+            self.evictions += 1
+            self._count(game_metrics.PROFILE_EVICTIONS)
+        return profile
+
+
+    def stats(self):
+        """
+        Return the cache's counters, for sizing it.
+
+        Return:
+            dict:
+                The size, most profiles, hits, misses, invalid
+                lookups, expired profiles, evictions and hit rate.
+        """
+        return {
+            "size": len(self._profiles),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalid": self.invalid,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,268 @@
+import argparse
+import csv
+import json
+import time
+from datetime import date
+from itertools import islice
+import numpy as np
+from game import MINIMUM_AGE
+
+
+
+# The reasons a record is rejected, written to the rejected output
+REJECT_NAME = "invalid_name"
+REJECT_FORMAT = "invalid_format"
+REJECT_DATE = "invalid_date"
+REJECT_AGE = "underage"
+REJECT_NAME_LENGTH = "name_too_long"
+REJECT_RECORD = "invalid_record"
+
+# The most UTF-8 bytes of a name, the width of the name
+# column of SessionStore and RoundLog
+NAME_WIDTH = 32
+
+
+
+class RegistrationSummary:
+    """
+    A class counting the records of a bulk registration.
+
+    Attributes:
+        read (int): The number of records read.
+        eligible (int): The number of players registered.
+        rejected (dict): The number of rejected records by reason.
+        reference_year (int): The year every age was counted to.
+    """
+    def __init__(self, reference_year):
+        """
+        Initialize the RegistrationSummary instance.
+
+        Args:
+            reference_year (int): The year every age is counted to.
+        """
+        self.read = 0
+        self.eligible = 0
+        self.rejected = {REJECT_NAME: 0, REJECT_FORMAT: 0,
+                         REJECT_DATE: 0, REJECT_AGE: 0,
+                         REJECT_NAME_LENGTH: 0, REJECT_RECORD: 0}
+        self.reference_year = reference_year
+
+
+
+def _json_record(line):
+    """
+    Return the name and birthdate of a JSONL line. A line that is
+    not a JSON object gives the line itself and None.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict):
+        return line.strip(), None
+    # A missing or null field is read as empty, not as "None"
+    name = record.get("name")
+    birthdate = record.get("birthdate")
+    return ("" if name is None else str(name),
+            "" if birthdate is None else str(birthdate))
+
+
+def read_chunks(path, chunk_size=100_000, file_format=None):
+    """
+    Read player records from a CSV or JSONL file in chunks.
+
+    A CSV file needs a header with name and birthdate columns, and
+    every line of a JSONL file is an object with those keys. A JSONL
+    line that is not an object is read with the line as its name and
+    None as its birthdate, so that it is rejected as REJECT_RECORD.
+    Only one chunk is held in memory at a time.
+
+    Args:
+        path (str): The file to read.
+        chunk_size (int): The most records per chunk.
+        file_format (str): "csv" or "jsonl". Taken from the
+            file extension if not given.
+
+    Return:
+        generator:
+            Pairs of lists holding the names and the birthdates
+            of a chunk, as strings.
+
+    Raises:
+        ValueError: If the format is unknown or a CSV file
+            has no name and birthdate columns.
+    """
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Unknown file format: {file_format}")
+
+    with open(path, newline="", encoding="utf-8") as source:
+        if file_format == "csv":
+            rows = csv.reader(source)
+            header = next(rows, [])
+            if "name" not in header or "birthdate" not in header:
+                raise ValueError("The CSV header needs name and birthdate.")
+            name_column = header.index("name")
+            birthdate_column = header.index("birthdate")
+            width = max(name_column, birthdate_column) + 1
+            # Short rows are padded rather than dropped, so that
+            # they end up in the rejected output
+            records = ((row[name_column], row[birthdate_column])
+                       if len(row) >= width else
+                       ((row + [""] * width)[name_column],
+                        (row + [""] * width)[birthdate_column])
+                       for row in rows)
+        else:
+            records = (_json_record(line) for line in source if line.strip())
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            names, birthdates = zip(*chunk)
+            yield list(names), list(birthdates)
+
+
+def validate_chunk(names, birthdates, reference_year):
+    """
+    Validate a chunk of player records at once.
+
+    Names follow the rules of Game.validate_player_name and
+    birthdates those of Game.validate_birthdate. Ages are
+    counted as in Game.calculate_player_age, from the birth
+    year to the reference year.
+
+    Names longer than NAME_WIDTH bytes are rejected, and so are
+    records whose birthdate is None, see read_chunks.
+
+    Args:
+        names (list): The names entered by the players.
+        birthdates (list): The birthdates in YYYYMMDD format.
+        reference_year (int): The year to count the ages to.
+
+    Return:
+        tuple:
+            The capitalized names, the ages and the reason each
+            record is rejected, an empty string for an eligible
+            player, all as NumPy arrays.
+    """
+    name_lengths = np.fromiter((len(name.encode()) for name in names),
+                               dtype=np.int64, count=len(names))
+    unreadable = np.fromiter((birthdate is None for birthdate in birthdates),
+                             dtype=bool, count=len(birthdates))
+    # Fixed widths, so that one overlong field does not widen every
+    # cell of the chunk. Longer fields are cut to one character past
+    # the widest valid value, which is still rejected.
+    names = np.array(names, dtype=f"U{NAME_WIDTH + 1}")
+    birthdates = np.array(["" if birthdate is None else birthdate
+                           for birthdate in birthdates], dtype="U9")
+    # Start from the reason checked last, so that
+    # the first failed check is the one kept
+    reasons = np.full(len(names), "", dtype=f"U{len(REJECT_RECORD)}")
+
+    # 8 digits, then the year, month and day ranges. Digits
+    # such as superscripts that int() can not read are refused
+    well_formed = ((np.char.str_len(birthdates) == 8)
+                   & np.char.isdecimal(birthdates))
+    numbers = np.where(well_formed, birthdates, "0").astype(np.int64)
+    year = numbers // 10000
+    month = numbers // 100 % 100
+    day = numbers % 100
+    in_range = ((1900 <= year) & (year <= 9999) & (1 <= month) & (month <= 12)
+                & (1 <= day) & (day <= 31))
+    ages = np.where(well_formed & in_range, reference_year - year, 0)
+
+    reasons[ages < MINIMUM_AGE] = REJECT_AGE
+    reasons[~in_range] = REJECT_DATE
+    reasons[~well_formed] = REJECT_FORMAT
+    reasons[~np.char.isalpha(names)] = REJECT_NAME
+    reasons[name_lengths > NAME_WIDTH] = REJECT_NAME_LENGTH
+    reasons[unreadable] = REJECT_RECORD
+    return np.char.capitalize(names), ages, reasons
+
+
+def register_players(source, eligible_path, rejected_path, chunk_size=100_000,
+                     reference_date=None, file_format=None):
+    """
+    Register the players of a file, writing eligible and
+    rejected records to separate CSV files.
+
+    The records are read, validated and written one chunk at a
+    time, so memory use does not grow with the file. Every age
+    is counted to the same reference date, read once.
+
+    Args:
+        source (str): The CSV or JSONL file of players.
+        eligible_path (str): Where to write the eligible players,
+            as name, birthdate and age.
+        rejected_path (str): Where to write the rejected records,
+            as name, birthdate and the reason.
+        chunk_size (int): The number of records handled at a time.
+        reference_date (datetime.date): The date to count ages to.
+            Today is used if not given.
+        file_format (str): "csv" or "jsonl", see read_chunks.
+
+    Return:
+        RegistrationSummary:
+            The number of records read, registered and rejected.
+    """
+    if reference_date is None:
+        reference_date = date.today()
+    summary = RegistrationSummary(reference_date.year)
+
+    with open(eligible_path, "w", newline="", encoding="utf-8") as eligible, \
+            open(rejected_path, "w", newline="", encoding="utf-8") as rejected:
+        eligible_writer = csv.writer(eligible)
+        rejected_writer = csv.writer(rejected)
+        eligible_writer.writerow(["name", "birthdate", "age"])
+        rejected_writer.writerow(["name", "birthdate", "reason"])
+
+        for names, birthdates in read_chunks(source, chunk_size, file_format):
+            capitalized, ages, reasons = validate_chunk(
+                names, birthdates, summary.reference_year)
+            accepted = reasons == ""
+            summary.read += len(names)
+            summary.eligible += int(np.count_nonzero(accepted))
+            for reason in summary.rejected:
+                summary.rejected[reason] += int(np.count_nonzero(
+                    reasons == reason))
+
+            eligible_writer.writerows(zip(
+                capitalized[accepted].tolist(),
+                (birthdates[row] for row in np.flatnonzero(accepted).tolist()),
+                ages[accepted].tolist()))
+            rejected_rows = np.flatnonzero(~accepted)
+            rejected_writer.writerows(
+                (names[row], birthdates[row], reasons[row])
+                for row in rejected_rows.tolist())
+    return summary
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Register players in bulk from a CSV or JSONL file.")
+    parser.add_argument("source")
+    parser.add_argument("--eligible", default="eligible.csv")
+    parser.add_argument("--rejected", default="rejected.csv")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--reference-date", default=None,
+                        help="count ages to this date, YYYYMMDD")
+    args = parser.parse_args()
+
+    reference_date = None
+    if args.reference_date:
+        reference_date = date(int(args.reference_date[:4]),
+                              int(args.reference_date[4:6]),
+                              int(args.reference_date[6:8]))
+    start = time.perf_counter()
+    summary = register_players(args.source, args.eligible, args.rejected,
+                               args.chunk_size, reference_date, args.format)
+    elapsed = time.perf_counter() - start
+
+    print(f"Records read: {summary.read} in {elapsed:.2f}s "
+          f"({summary.read / max(elapsed, 1e-9):,.0f} per second)")
+    print(f"Eligible players: {summary.eligible}")
+    for reason, count in summary.rejected.items():
+        print(f"Rejected, {reason}: {count}")
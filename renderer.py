@@ -0,0 +1,245 @@
+import sys
+from abc import ABC, abstractmethod
+
+
+
+# The text of every event, filled in with the event's fields
+MESSAGES = {
+    "message": "{text}",
+    "invalid_name": "Invalid input. \nYour game name can only contain characters.",
+    "invalid_birthdate": "{error}",
+    "underage": "You must be 18 years or older to play this game.\n"
+                "Exiting the game.",
+    "show_list": "{numbers}",
+    "invalid_choice": "Invalid choice. Pick a number from the list.",
+    "invalid_number": "Invalid input. Please enter a number.",
+    "wrong_guess": "Wrong number. This was your {tries_count} try.\n"
+                   "Let's try again from a shorter list.\n{numbers}",
+    "game_over": "GAME OVER",
+    "congratulate": "Congratulations!\n"
+                    "You got the lucky number from try {tries_count}\n",
+    "invalid_play_again": "Invalid input. Enter 'y' for Yes or 'n' for No.",
+    "goodbye": "Thank you for playing! Goodbye.",
+}
+
+
+
+def format_numbers(numbers, limit=None):
+    """
+    Format a list of numbers for the player, shortening long lists.
+
+    Args:
+        numbers (array or list): The numbers to show.
+        limit (int): The most numbers to show. A longer list shows
+            its first and last numbers and how many there are.
+            Every number is shown if not given.
+
+    Return:
+        string:
+            The numbers as a Python list would print them.
+    """
+    if limit is None or len(numbers) <= limit:
+        return str(numbers.tolist() if hasattr(numbers, "tolist")
+                   else list(numbers))
+    head = ", ".join(map(str, numbers[:limit // 2]))
+    tail = ", ".join(map(str, numbers[len(numbers) - (limit - limit // 2):]))
+    return f"[{head}, ..., {tail}] ({len(numbers)} numbers)"
+
+
+
+class Renderer(ABC):
+    """
+    A class showing the game to the player.
+
+    Game calls one method per thing it has to tell the player,
+    and every method hands an event with its fields to emit.
+    Backends decide what an event becomes: text on a terminal,
+    a structured record, or nothing at all.
+    """
+    __slots__ = ()
+
+    def message(self, text):
+        self.emit("message", text=text)
+
+
+    def invalid_name(self):
+        self.emit("invalid_name")
+
+
+    def invalid_birthdate(self, error):
+        self.emit("invalid_birthdate", error=error)
+
+
+    def underage(self):
+        self.emit("underage")
+
+
+    def show_list(self, numbers):
+        self.emit("show_list", numbers=numbers)
+
+
+    def invalid_choice(self):
+        self.emit("invalid_choice")
+
+
+    def invalid_number(self):
+        self.emit("invalid_number")
+
+
+    def wrong_guess(self, tries_count, numbers):
+        self.emit("wrong_guess", tries_count=tries_count, numbers=numbers)
+
+
+    def game_over(self):
+        self.emit("game_over")
+
+
+    def congratulate(self, tries_count):
+        self.emit("congratulate", tries_count=tries_count)
+
+
+    def invalid_play_again(self):
+        self.emit("invalid_play_again")
+
+
+    def goodbye(self):
+        self.emit("goodbye")
+
+
+    @abstractmethod
+    def emit(self, event, **fields):
+        """
+        Handle an event.
+
+        Args:
+            event (str): The name of the event, a key of MESSAGES.
+            fields: The values the event's text is filled in with.
+                Lists of numbers are passed as they are, unformatted.
+        """
+
+
+    def flush(self):
+        """
+        Show everything emitted so far. Called before the player
+        is asked for input and before the game exits.
+        """
+
+
+
+class TerminalRenderer(Renderer):
+    """
+    A class writing the game as text, one write per flush.
+
+    The text of every event is collected until the game flushes,
+    so everything shown between two prompts is written at once.
+
+    Attributes:
+        stream (file): Where the text is written. The current
+            sys.stdout is used if None.
+        max_numbers (int): The most numbers of a list shown in full,
+            see format_numbers.
+        buffered (bool): False to write every event at once.
+    """
+    __slots__ = ("stream", "max_numbers", "buffered", "_buffer")
+
+    def __init__(self, stream=None, max_numbers=100, buffered=True):
+        """
+        Initialize the TerminalRenderer instance.
+
+        Args:
+            stream (file): Where to write. sys.stdout if not given.
+            max_numbers (int): The most numbers of a list shown in full.
+            buffered (bool): False to write every event at once.
+        """
+        self.stream = stream
+        self.max_numbers = max_numbers
+        self.buffered = buffered
+        self._buffer = []
+
+
+    def emit(self, event, **fields):
+        numbers = fields.get("numbers")
+        if numbers is not None:
+            # Only lists that are shown are ever formatted
+            fields["numbers"] = format_numbers(numbers, self.max_numbers)
+        self._buffer.append(MESSAGES[event].format(**fields))
+        if not self.buffered:
+            self.flush()
+
+
+    def flush(self):
+        if self._buffer:
+            stream = self.stream if self.stream is not None else sys.stdout
+            self._buffer.append("")
+            stream.write("\n".join(self._buffer))
+            self._buffer.clear()
+
+
+
+class NullRenderer(Renderer):
+    """
+    A class showing nothing, for headless and benchmark runs.
+    Every method returns at once, without building an event.
+    """
+    __slots__ = ()
+
+    def _ignore(self, *args):
+        pass
+
+    message = invalid_name = invalid_birthdate = underage = _ignore
+    show_list = invalid_choice = invalid_number = wrong_guess = _ignore
+    game_over = congratulate = invalid_play_again = goodbye = _ignore
+
+
+    def emit(self, event, **fields):
+        pass
+
+
+
+class EventRenderer(Renderer):
+    """
+    A class turning the game into structured events,
+    for user interfaces, logs and tests.
+
+    Every event is a dict holding its name under "event" and its
+    fields. Lists of numbers are kept as the arrays the game holds,
+    which are never changed once shown.
+
+    Attributes:
+        events (list): The events not yet taken by drain, if no
+            sink was given.
+        sink (callable): Called with every event instead of keeping it.
+    """
+    __slots__ = ("events", "sink")
+
+    def __init__(self, sink=None):
+        """
+        Initialize the EventRenderer instance.
+
+        Args:
+            sink (callable): Called with every event. The events
+                are kept in events if not given.
+        """
+        self.events = []
+        self.sink = sink
+
+
+    def emit(self, event, **fields):
+        fields["event"] = event
+        if self.sink is not None:
+            self.sink(fields)
+        else:
+            self.events.append(fields)
+
+
+    def drain(self):
+        """
+        Return the kept events and forget them.
+
+        Return:
+            list:
+                The events in the order they were emitted.
+        """
+        events = self.events
+        self.events = []
+        return events
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from game import Game, GameConfig
+from renderer import NullRenderer
+from rng import SessionRNG
+
+
+
+class TranscriptEnded(Exception):
+    """
+    Raised when a replayed game asks for more input than was recorded,
+    as when the player disconnected in the middle of a session.
+    """
+
+
+
+class Transcript:
+    """
+    A class recording everything needed to replay a session.
+
+    The random stream key fixes every list the session dealt, so
+    the player's answers and when they were given are all that
+    has to be kept to play the session again. The result of every
+    round is kept as well, to check a replay against.
+
+    Attributes:
+        key (tuple): The entropy and spawn key of the session's stream.
+        config (GameConfig): The rules the session was played by.
+        started (float): When the session started, in seconds since
+            the epoch.
+        inputs (list): The player's answers, in order.
+        offsets (list): When each answer was given, in milliseconds
+            after started.
+        results (list): (lucky number, tries, won) for every round.
+    """
+    __slots__ = ("key", "config", "started", "inputs", "offsets", "results")
+
+    def __init__(self, key, config=None, started=None):
+        """
+        Initialize the Transcript instance.
+
+        Args:
+            key (tuple): The key of the session's random stream.
+            config (GameConfig): The rules of the session.
+            started (float): When the session started. The current
+                time is used if not given.
+        """
+        self.key = key
+        self.config = config if config is not None else GameConfig()
+        self.started = time.time() if started is None else started
+        self.inputs = []
+        self.offsets = []
+        self.results = []
+
+
+    @classmethod
+    def for_game(cls, game):
+        """
+        Start a transcript of a game and attach it to the game.
+
+        Return:
+            Transcript:
+                The new transcript.
+        """
+        transcript = cls(game.session_rng().key, game.config)
+        game.transcript = transcript
+        return transcript
+
+
+    def record_input(self, answer):
+        """
+        Record an answer of the player.
+
+        Args:
+            answer (str): The answer as it was read.
+        """
+        self.inputs.append(answer)
+        self.offsets.append(round((time.time() - self.started) * 1000))
+
+
+    def record_result(self, lucky_number, tries_count, won):
+        """
+        Record the end of a round.
+
+        Args:
+            lucky_number (int): The lucky number of the round.
+            tries_count (int): The number of tries the round took.
+            won (bool): True if the player guessed the lucky number.
+        """
+        self.results.append((int(lucky_number), int(tries_count), bool(won)))
+
+
+    def to_json(self):
+        """
+        Return the transcript as one line of JSON.
+        """
+        entropy, spawn_key = self.key
+        config = self.config
+        return json.dumps({
+            "key": [entropy, list(spawn_key)],
+            "config": [config.list_size, config.low, config.high,
+                       config.window],
+            "started": self.started,
+            "inputs": self.inputs,
+            "offsets": self.offsets,
+            "results": self.results,
+        }, separators=(",", ":"))
+
+
+    @classmethod
+    def from_json(cls, line):
+        """
+        Read a transcript written by to_json.
+
+        Return:
+            Transcript:
+                The transcript.
+        """
+        data = json.loads(line)
+        entropy, spawn_key = data["key"]
+        transcript = cls((entropy, tuple(spawn_key)),
+                         GameConfig(*data["config"]), data["started"])
+        transcript.inputs = data["inputs"]
+        transcript.offsets = data["offsets"]
+        transcript.results = [tuple(result) for result in data["results"]]
+        return transcript
+
+
+
+class TranscriptLog:
+    """
+    A class appending transcripts to a JSON lines file,
+    one finished session per line.
+
+    Attributes:
+        path (str): The file written to.
+    """
+    def __init__(self, path):
+        """
+        Initialize the TranscriptLog instance.
+
+        Args:
+            path (str): The file to append to.
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+
+    def write(self, transcript):
+        """
+        Append a transcript. It is written with the operating
+        system's buffering, without waiting for the disk.
+
+        Args:
+            transcript (Transcript): The transcript of a finished session.
+        """
+        self._file.write(transcript.to_json() + "\n")
+
+
+    def close(self):
+        """
+        Write what is buffered and close the file.
+        """
+        self._file.close()
+
+
+
+class ReplayGame(Game):
+    """
+    A class playing a recorded session again with the Game rules.
+
+    The answers come from a transcript instead of the player, and
+    ages are counted to the year the session was played in, so a
+    replay plays out the same on any day. Nothing is shown unless
+    a renderer is given. The replay records into
+    a new transcript, whose results are compared with the recorded ones.
+
+    Attributes:
+        recorded (Transcript): The transcript being replayed.
+    """
+    __slots__ = ("recorded", "_answers")
+
+    def __init__(self, recorded, renderer=None):
+        """
+        Initialize the ReplayGame instance.
+
+        Args:
+            recorded (Transcript): The session to replay.
+            renderer (Renderer): What shows the replay. A NullRenderer
+                if not given.
+        """
+        super().__init__(recorded.config, SessionRNG.from_key(recorded.key),
+                         renderer=renderer if renderer is not None
+                         else NullRenderer())
+        self.recorded = recorded
+        self._answers = iter(recorded.inputs)
+        self.transcript = Transcript(recorded.key, recorded.config,
+                                     recorded.started)
+
+
+    def prompt(self, message, kind):
+        """
+        Return the next recorded answer.
+
+        Raises:
+            TranscriptEnded: If every recorded answer has been used.
+        """
+        answer = next(self._answers, None)
+        if answer is None:
+            raise TranscriptEnded()
+        self.transcript.inputs.append(answer)
+        return answer
+
+
+    def calculate_player_age(self):
+        """
+        Calculate the player's age in the year the session was played.
+        """
+        year = datetime.fromtimestamp(self.recorded.started).year
+        self.player_age = year - int(self.player_birthdate[:4])
+
+
+
+def replay(recorded, renderer=None):
+    """
+    Replay a session with the steps of main.py.
+
+    Args:
+        recorded (Transcript): The session to replay.
+        renderer (Renderer): What shows the replay, nothing if not given.
+
+    Return:
+        list:
+            (lucky number, tries, won) for every round of the replay.
+    """
+    game = ReplayGame(recorded, renderer)
+    try:
+        game.get_player_name()
+        game.get_player_birthdate()
+        game.calculate_player_age()
+        game.check_age_eligibility()
+        game.play_session()
+    except (SystemExit, TranscriptEnded):
+        # Leaving, failing the age check or running out of answers
+        pass
+    return game.transcript.results
+
+
+def _replay_lines(lines):
+    """
+    Replay a batch of transcript lines in a worker process.
+
+    Return:
+        list:
+            The position in the batch, recorded results and replayed
+            results of every session that did not replay the same.
+    """
+    mismatches = []
+    for position, line in enumerate(lines):
+        recorded = Transcript.from_json(line)
+        replayed = replay(recorded)
+        if replayed != recorded.results:
+            mismatches.append((position, recorded.results, replayed))
+    return mismatches
+
+
+def replay_log(path, workers=None, batch_size=1000):
+    """
+    Replay every session of a transcript file in a process pool.
+
+    Args:
+        path (str): The JSON lines file written by TranscriptLog.
+        workers (int): The number of worker processes. One per
+            CPU core is used if not given.
+        batch_size (int): The number of sessions sent to a worker
+            at a time.
+
+    Return:
+        tuple:
+            The number of sessions replayed, and a list holding the
+            line number, recorded results and replayed results of
+            every session that did not replay the same.
+    """
+    sessions = 0
+    mismatches = []
+    workers = workers or os.cpu_count() or 1
+    # The batches sent and not yet collected, with the
+    # line number of their first session
+    pending = deque()
+
+    def collect():
+        first, future = pending.popleft()
+        for position, recorded, replayed in future.result():
+            mismatches.append((first + position, recorded, replayed))
+
+    with open(path, encoding="utf-8") as log, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        batch = []
+        first = None
+        for line_number, line in enumerate(log, 1):
+            if not line.strip():
+                continue
+            if not batch:
+                first = line_number
+            batch.append(line)
+            if len(batch) == batch_size:
+                pending.append((first, pool.submit(_replay_lines, batch)))
+                sessions += len(batch)
+                batch = []
+                # Keep a few batches per worker in flight, so that
+                # memory does not grow with the size of the log
+                if len(pending) > 2 * workers:
+                    collect()
+        if batch:
+            pending.append((first, pool.submit(_replay_lines, batch)))
+            sessions += len(batch)
+        while pending:
+            collect()
+    return sessions, mismatches
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay recorded sessions and check their results.")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sessions, mismatches = replay_log(args.path, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"Sessions replayed: {sessions} in {elapsed:.2f}s "
+          f"({sessions / max(elapsed, 1e-9):,.0f} per second)")
+    for line_number, recorded, replayed in mismatches:
+        print(f"Line {line_number} does not replay the same:\n"
+              f"  recorded {recorded}\n  replayed {replayed}")
+    print(f"Mismatches: {len(mismatches)}")
@@ -0,0 +1,223 @@
+import os
+import threading
+import numpy as np
+
+
+
+# One generator per thread, which streams are loaded into to draw,
+# and the stream games without their own draw from in the thread
+_local = threading.local()
+
+
+
+def _reset_after_fork():
+    """
+    Forget the shared stream in a forked child process, which would
+    otherwise deal the same rounds as its parent and its siblings,
+    so it is seeded with fresh entropy as the random module is.
+    """
+    _local.stream = None
+    _local.saved = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+
+def _thread_generator():
+    """
+    Return the generator of the current thread, creating it
+    the first time a stream draws in the thread.
+    """
+    generator = getattr(_local, "generator", None)
+    if generator is None:
+        generator = _local.generator = np.random.Generator(np.random.PCG64(0))
+    return generator
+
+
+
+def thread_stream():
+    """
+    Return the stream shared by the games of the current thread
+    that were not given a stream of their own, as the random module
+    is shared by a program. It is seeded with fresh entropy the
+    first time it is used in the thread.
+
+    Return:
+        SessionRNG:
+            The current thread's shared stream.
+    """
+    stream = getattr(_local, "stream", None)
+    if stream is None:
+        stream = _local.stream = SessionRNG()
+    return stream
+
+
+
+class SessionRNG:
+    """
+    A class giving one game session its own random number stream.
+
+    Every SessionRNG is a PCG64 stream seeded from a SeedSequence.
+    Sessions spawned from the same parent get independent,
+    non-overlapping streams, and any session can be replayed from
+    its key.
+
+    A NumPy generator with its seed sequence takes about a kilobyte,
+    more than everything else a game holds. A SessionRNG only keeps
+    the key and the 128-bit state of its stream, and draws by
+    loading the state into a generator owned by the current thread
+    and saving it back, so streams in different threads never share
+    a generator or a lock, and a live session costs about 150 bytes.
+
+    Attributes:
+        entropy (int): The entropy of the stream's seed.
+        spawn_key (tuple): Where the stream is in the tree of spawned
+            streams, empty for a stream that was not spawned.
+    """
+    __slots__ = ("entropy", "spawn_key", "_children", "_state")
+
+    def __init__(self, seed=None, seed_sequence=None):
+        """
+        Initialize the SessionRNG instance.
+
+        Args:
+            seed (int): The seed of a new stream. Fresh entropy
+                from the operating system is used if not given.
+            seed_sequence (numpy.random.SeedSequence): An existing
+                seed to continue from, instead of seed.
+        """
+        if seed_sequence is None:
+            seed_sequence = np.random.SeedSequence(seed)
+        self.entropy = seed_sequence.entropy
+        self.spawn_key = seed_sequence.spawn_key
+        self._children = seed_sequence.n_children_spawned
+        # The packed generator state, None until the first draw
+        self._state = None
+
+
+    @property
+    def seed_sequence(self):
+        """
+        The seed of the stream, as a numpy.random.SeedSequence.
+        """
+        return np.random.SeedSequence(self.entropy, spawn_key=self.spawn_key,
+                                      n_children_spawned=self._children)
+
+
+    @property
+    def key(self):
+        """
+        The entropy and spawn key identifying the stream.
+        Pass it to from_key to replay the stream from the start.
+        """
+        return (self.entropy, self.spawn_key)
+
+
+    @classmethod
+    def from_key(cls, key):
+        """
+        Recreate a stream from its key.
+
+        Args:
+            key (tuple): The entropy and spawn key of a stream.
+
+        Return:
+            SessionRNG:
+                A generator at the start of that stream.
+        """
+        entropy, spawn_key = key
+        return cls(seed_sequence=np.random.SeedSequence(
+            entropy, spawn_key=tuple(spawn_key)))
+
+
+    def spawn(self, count=None):
+        """
+        Create independent child streams, one per session.
+
+        Args:
+            count (int): How many streams to create. A single
+                stream is returned if not given.
+
+        Return:
+            SessionRNG or list:
+                The new stream, or a list of count streams.
+        """
+        children = self.seed_sequence.spawn(1 if count is None else count)
+        self._children += len(children)
+        streams = [SessionRNG(seed_sequence=child) for child in children]
+        return streams[0] if count is None else streams
+
+
+    def _load(self):
+        """
+        Return the thread's generator, set to this stream's state.
+        """
+        generator = _thread_generator()
+        if getattr(_local, "saved", None) is self._state is not None:
+            # The generator still holds this stream from its last draw
+            return generator
+        # Forget the saved stream until this one is saved, in case
+        # the draw fails with the generator set to this stream
+        _local.saved = None
+        if self._state is None:
+            generator.bit_generator.state = \
+                np.random.PCG64(self.seed_sequence).state
+        else:
+            packed = self._state
+            generator.bit_generator.state = {
+                "bit_generator": "PCG64",
+                "state": {"state": int.from_bytes(packed[:16], "little"),
+                          "inc": int.from_bytes(packed[16:32], "little")},
+                "has_uint32": packed[36],
+                "uinteger": int.from_bytes(packed[32:36], "little")}
+        return generator
+
+
+    def _save(self, generator):
+        """
+        Keep the state the generator reached, for the next draw.
+        """
+        state = generator.bit_generator.state
+        # 37 bytes in one bytes object instead of a tuple of big ints
+        self._state = (state["state"]["state"].to_bytes(16, "little")
+                       + state["state"]["inc"].to_bytes(16, "little")
+                       + state["uinteger"].to_bytes(4, "little")
+                       + bytes((state["has_uint32"],)))
+        _local.saved = self._state
+
+
+    def draw_numbers(self, count, config):
+        """
+        Draw numbers for a lucky_list in one call.
+
+        Args:
+            count (int): How many numbers to draw.
+            config (GameConfig): The range and number type to draw.
+
+        Return:
+            numpy.ndarray:
+                The numbers, in the type of the config's typecode.
+        """
+        generator = self._load()
+        numbers = generator.integers(config.low, config.high, size=count,
+                                     dtype=np.dtype(config.typecode),
+                                     endpoint=True)
+        self._save(generator)
+        return numbers
+
+
+    def draw_number(self, config):
+        """
+        Draw a single number in the config's range.
+
+        Return:
+            int:
+                The number drawn.
+        """
+        generator = self._load()
+        number = int(generator.integers(config.low, config.high,
+                                        endpoint=True))
+        self._save(generator)
+        return number
@@ -0,0 +1,511 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import deque
+from game import Game, GUESS_WIN, GUESS_WRONG
+from history import RoundLog
+import metrics as game_metrics
+from profiles import ProfileCache
+from renderer import TerminalRenderer
+from replay import Transcript, TranscriptLog
+from rng import SessionRNG
+
+
+
+class SessionClosed(Exception):
+    """
+    Raised when a client disconnects in the middle of a session.
+    """
+
+
+
+class ConnectionStream:
+    """
+    A class letting a renderer write text to a network connection.
+    """
+    __slots__ = ("writer",)
+
+    def __init__(self, writer):
+        self.writer = writer
+
+
+    def write(self, text):
+        self.writer.write(text.encode())
+
+
+
+class GameSession:
+    """
+    A class running one player's game over a network connection.
+
+    The session follows the same steps as main.py, but reads
+    the player's answers from the connection without blocking
+    the event loop. Every line sent by the client is one answer
+    and every line written back is one message or prompt. The
+    game's renderer collects the messages, which are written to
+    the connection with the next prompt.
+
+    Attributes:
+        session_id (int): A number identifying the session on the server.
+        game (Game): The game state and rules for this player.
+        rounds_played (int): The number of finished rounds.
+        latencies (list): Seconds from receiving each answer to
+            having the next prompt written back.
+        profiles (ProfileCache): The profiles of returning players,
+            or None to work out every player's profile again.
+    """
+    def __init__(self, session_id, reader, writer, rng=None, metrics=None,
+                 history=None, profiles=None):
+        """
+        Initialize the GameSession instance.
+
+        Args:
+            session_id (int): A number identifying the session.
+            reader (asyncio.StreamReader): The connection to read from.
+            writer (asyncio.StreamWriter): The connection to write to.
+            rng (SessionRNG): The session's random number stream.
+            metrics (GameMetrics): Where the game records its events.
+            history (RoundLog): Where the result of every round is logged.
+            profiles (ProfileCache): The profiles of returning players.
+        """
+        self.session_id = session_id
+        self.reader = reader
+        self.writer = writer
+        renderer = TerminalRenderer(ConnectionStream(writer))
+        self.game = Game(rng=rng, metrics=metrics, history=history,
+                         renderer=renderer)
+        self.rounds_played = 0
+        self.latencies = []
+        self.profiles = profiles
+        self._received_at = None
+
+
+    def send(self, text):
+        """
+        Queue a message for the client.
+
+        Args:
+            text (str): The message, without a trailing newline.
+        """
+        self.game.renderer.message(text)
+
+
+    async def ask(self, prompt, kind):
+        """
+        Send a prompt to the client and wait for the answer.
+        If the game has metrics, record how long the answer
+        took, as Game.prompt does.
+
+        Args:
+            prompt (str): The question to ask.
+            kind (int): Which prompt it is, PROMPT_GUESS for example.
+
+        Return:
+            string:
+                The answer with surrounding whitespace removed.
+
+        Raises:
+            SessionClosed: If the client has disconnected.
+        """
+        self.send(prompt)
+        self.game.renderer.flush()
+        self.record_latency()
+        await self.writer.drain()
+
+        asked_at = time.perf_counter_ns()
+        line = await self.reader.readline()
+        if not line:
+            raise SessionClosed()
+        self._received_at = time.perf_counter()
+        if self.game.metrics is not None:
+            self.game.metrics.time_prompt(kind,
+                                          time.perf_counter_ns() - asked_at)
+        answer = line.decode(errors="replace").strip()
+        if self.game.transcript is not None:
+            self.game.transcript.record_input(answer)
+        return answer
+
+
+    def record_latency(self):
+        """
+        Record the time taken to respond to the player's last answer.
+        """
+        # Everything since the previous answer was handled
+        # by the server, so this is the session's latency
+        if self._received_at is not None:
+            self.latencies.append(time.perf_counter() - self._received_at)
+            self._received_at = None
+
+
+    async def register_player(self):
+        """
+        Ask for the player's name and birthdate and check their age.
+
+        Return:
+            bool:
+                True if the player may play, False if not.
+        """
+        while True:
+            name = Game.validate_player_name(
+                await self.ask("Enter your first name: ",
+                               game_metrics.PROMPT_NAME))
+            if name is not None:
+                self.game.player_name = name
+                break
+            self.game.renderer.invalid_name()
+
+        profile = None
+        while True:
+            birthdate = await self.ask("Enter your birthdate (YYYYMMDD): ",
+                                       game_metrics.PROMPT_BIRTHDATE)
+            # A returning player's profile is already validated and counted
+            if self.profiles is not None:
+                profile = self.profiles.lookup(self.game.player_name,
+                                               birthdate)
+            if profile is not None:
+                error = None
+            else:
+                error = Game.validate_birthdate(birthdate)
+            if error is None:
+                self.game.player_birthdate = birthdate
+                break
+            self.game.renderer.invalid_birthdate(error)
+
+        if profile is not None:
+            self.game.player_age = profile.age
+        else:
+            self.game.calculate_player_age()
+        if not self.game.player_is_eligible():
+            self.game.renderer.underage()
+            return False
+        return True
+
+
+    async def play_round(self):
+        """
+        Play one round, from showing the list to the last guess.
+
+        Return:
+            bool:
+                True if the player guessed the lucky number,
+                False if the round ended in GAME OVER.
+        """
+        game = self.game
+        renderer = game.renderer
+        game.reset_round()
+        renderer.show_list(game.lucky_list)
+
+        while True:
+            try:
+                game.player_input = int(await self.ask(
+                    "Pick a number from the list: ", game_metrics.PROMPT_GUESS))
+
+                outcome = game.check_guess()
+                if outcome == GUESS_WIN:
+                    renderer.congratulate(game.tries_count)
+                    return True
+                elif outcome == GUESS_WRONG:
+                    if not game.eliminate_guess():
+                        renderer.game_over()
+                        return False
+                    renderer.wrong_guess(game.tries_count,
+                                         game.shorter_lucky_list)
+                else:
+                    renderer.invalid_choice()
+            except ValueError:
+                if game.metrics is not None:
+                    game.metrics.count(game_metrics.INVALID_GUESSES)
+                renderer.invalid_number()
+
+            # Increment tries_count each time the player guesses
+            game.tries_count += 1
+
+
+    async def play_again(self):
+        """
+        Ask the player whether to play another round.
+
+        Return:
+            bool:
+                True if the player wants another round, False if not.
+        """
+        while True:
+            choice = self.game.play_again_answer(await self.ask(
+                "Do you want to play again?\n (y: Yes, n: No): ",
+                game_metrics.PROMPT_PLAY_AGAIN))
+            if choice is not None:
+                return choice
+            self.game.renderer.invalid_play_again()
+
+
+    async def run(self):
+        """
+        Run the whole session until the player leaves.
+
+        Leaving the game, failing the age check or disconnecting
+        only ends this session, never the server.
+        """
+        try:
+            self.send("Welcome to Lucky Number!")
+            if not await self.register_player():
+                return
+            self.send(f"★ {self.game.player_name}, Let the game begin ★")
+            while True:
+                self.game.finish_round(await self.play_round())
+                self.rounds_played += 1
+                if not await self.play_again():
+                    self.game.renderer.goodbye()
+                    return
+        except SessionClosed:
+            pass
+        finally:
+            await self.close()
+
+
+    async def close(self):
+        """
+        Flush what is left to send and close the connection.
+        """
+        self.game.renderer.flush()
+        self.record_latency()
+        try:
+            await self.writer.drain()
+            self.writer.close()
+            await self.writer.wait_closed()
+        except ConnectionError:
+            # The client is already gone
+            pass
+
+
+    def report(self):
+        """
+        Summarize the session's latency.
+
+        Return:
+            dict:
+                The session id, player name, random stream key,
+                rounds played and the number, median, 99th percentile
+                and maximum of the latencies in milliseconds.
+        """
+        latencies = [latency * 1000 for latency in self.latencies]
+        report = {
+            "session": self.session_id,
+            "player": self.game.player_name,
+            "rng_key": self.game.session_rng().key,
+            "rounds": self.rounds_played,
+            "answers": len(latencies),
+            "p50_ms": 0.0,
+            "p99_ms": 0.0,
+            "max_ms": 0.0,
+        }
+        if len(latencies) >= 2:
+            percentiles = statistics.quantiles(latencies, n=100)
+            report["p50_ms"] = round(percentiles[49], 3)
+            report["p99_ms"] = round(percentiles[98], 3)
+        if latencies:
+            report["max_ms"] = round(max(latencies), 3)
+        return report
+
+
+
+class GameServer:
+    """
+    A class serving Lucky Number to many players over TCP.
+
+    Every connection gets its own GameSession, and all sessions
+    share one event loop.
+
+    Attributes:
+        host (str): The address to listen on.
+        port (int): The port to listen on, 0 for any free port.
+        active_sessions (int): The number of connected players.
+        reports (collections.deque): The latency reports of the
+            most recently finished sessions.
+        verbose (bool): Print each report when a session ends.
+        rng (SessionRNG): The stream every session's own
+            random number stream is spawned from.
+        metrics (GameMetrics): The events of every session's game,
+            or None to record nothing.
+        history (RoundLog): The log of every session's rounds,
+            or None to keep no history.
+        transcripts (TranscriptLog): Where the transcript of every
+            finished session is written, or None to record none.
+        profiles (ProfileCache): The profiles of returning players,
+            shared by every session, or None to keep none.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, verbose=True,
+                 keep_reports=1000, seed=None, metrics=None, history=None,
+                 transcripts=None, profiles=None):
+        """
+        Initialize the GameServer instance.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on, 0 for any free port.
+            verbose (bool): Print each report when a session ends.
+            keep_reports (int): How many finished session reports to keep.
+            seed (int): The seed of the server's random streams.
+            metrics (GameMetrics): Where every session records its events.
+            history (RoundLog): Where every session logs its rounds.
+            transcripts (TranscriptLog): Where to write the transcript
+                of every session, for replay.
+            profiles (ProfileCache): The profiles of returning players.
+        """
+        self.host = host
+        self.port = port
+        self.rng = SessionRNG(seed)
+        self.verbose = verbose
+        self.metrics = metrics
+        self.history = history
+        self.transcripts = transcripts
+        self.profiles = profiles
+        self.active_sessions = 0
+        self.reports = deque(maxlen=keep_reports)
+        self._next_session_id = 1
+        self._server = None
+
+
+    async def handle_connection(self, reader, writer):
+        """
+        Run a session for a newly connected client.
+
+        Args:
+            reader (asyncio.StreamReader): The connection to read from.
+            writer (asyncio.StreamWriter): The connection to write to.
+        """
+        session = GameSession(self._next_session_id, reader, writer,
+                              self.rng.spawn(), self.metrics, self.history,
+                              self.profiles)
+        if self.transcripts is not None:
+            Transcript.for_game(session.game)
+        self._next_session_id += 1
+        self.active_sessions += 1
+        try:
+            await session.run()
+        finally:
+            self.active_sessions -= 1
+            if self.transcripts is not None:
+                self.transcripts.write(session.game.transcript)
+            report = session.report()
+            self.reports.append(report)
+            if self.verbose:
+                print(report)
+
+
+    def export_metrics(self, path):
+        """
+        Write a snapshot of the metrics as JSON, replacing the file
+        in one step so that readers never see half a snapshot.
+
+        Args:
+            path (str): The file to write.
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as snapshot:
+            snapshot.write(self.metrics.to_json() + "\n")
+        os.replace(temporary, path)
+
+
+    async def export_metrics_every(self, path, interval):
+        """
+        Export the metrics every interval seconds until cancelled.
+
+        Args:
+            path (str): The file to write, see export_metrics.
+            interval (float): The seconds between two snapshots.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.export_metrics(path)
+
+
+    async def start(self):
+        """
+        Start listening for connections.
+
+        Return:
+            int:
+                The port the server is listening on.
+        """
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+
+    async def stop(self):
+        """
+        Stop listening for new connections.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+
+
+    async def serve_forever(self, metrics_path=None, metrics_interval=60.0):
+        """
+        Start the server and serve until cancelled.
+
+        Args:
+            metrics_path (str): Where to export a metrics snapshot
+                every metrics_interval seconds, see export_metrics.
+                Nothing is exported if not given.
+            metrics_interval (float): The seconds between two snapshots.
+        """
+        await self.start()
+        print(f"Lucky Number server listening on {self.host}:{self.port}")
+        exporter = None
+        if metrics_path is not None and self.metrics is not None:
+            exporter = asyncio.create_task(
+                self.export_metrics_every(metrics_path, metrics_interval))
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            if exporter is not None:
+                exporter.cancel()
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Lucky Number over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not print a report for every session")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--history", metavar="PATH",
+                        help="log the result of every round to this file")
+    parser.add_argument("--transcripts", metavar="PATH",
+                        help="record every session to this file for replay")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="export a metrics snapshot to this file as JSON")
+    parser.add_argument("--metrics-interval", type=float, default=60.0,
+                        help="seconds between two metrics snapshots")
+    parser.add_argument("--profile-cache", type=int, default=100_000,
+                        metavar="SIZE",
+                        help="the most returning players to remember, "
+                             "0 to remember none")
+    args = parser.parse_args()
+
+    history = RoundLog(args.history) if args.history else None
+    transcripts = TranscriptLog(args.transcripts) if args.transcripts else None
+    metrics = game_metrics.GameMetrics() if args.metrics else None
+    profiles = (ProfileCache(args.profile_cache, metrics)
+                if args.profile_cache else None)
+    server = GameServer(args.host, args.port, verbose=not args.quiet,
+                        seed=args.seed, metrics=metrics, history=history,
+                        transcripts=transcripts, profiles=profiles)
+    try:
+        asyncio.run(server.serve_forever(args.metrics, args.metrics_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics is not None:
+            # The last snapshot, with everything up to the shutdown
+            server.export_metrics(args.metrics)
+        if history is not None:
+            history.close()
+        if transcripts is not None:
+            transcripts.close()
@@ -0,0 +1,462 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from multiprocessing import shared_memory
+import numpy as np
+from engine import GameState, PHASES
+from candidates import make_candidates
+from game import Game, GameConfig
+
+
+
+def _columns(capacity, config, name_width):
+    """
+    Return the name, type and shape of every per-session array,
+    in the order they are laid out in shared memory.
+    """
+    # Store the numbers in the same type as Game.lucky_list
+    value_dtype = np.dtype(config.typecode)
+    length_dtype = np.uint8 if config.list_size < 256 else np.uint32
+    # One bit per number of the dealt list, set while it is still in play
+    kept_width = -(-config.list_size // 8)
+    return [
+        ("lucky_lists", value_dtype, (capacity, config.list_size)),
+        ("list_lengths", np.dtype(length_dtype), (capacity,)),
+        ("kept_numbers", np.dtype(np.uint8), (capacity, kept_width)),
+        ("lucky_numbers", value_dtype, (capacity,)),
+        ("tries_counts", np.dtype(np.uint32), (capacity,)),
+        # A guess may be any number, not only one of the range
+        ("player_inputs", np.dtype(np.int64), (capacity,)),
+        # Birthdates run to the year 9999, so ages can be negative
+        ("player_ages", np.dtype(np.int16), (capacity,)),
+        ("player_birthdates", np.dtype(np.uint32), (capacity,)),
+        ("player_names", np.dtype(f"S{name_width}"), (capacity,)),
+        ("phases", np.dtype(np.uint8), (capacity,)),
+        ("in_use", np.dtype(bool), (capacity,)),
+        ("dirty", np.dtype(bool), (capacity,)),
+    ]
+
+
+def _column_offsets(capacity, config, name_width):
+    """
+    Return where every array starts in a shared block, each on an
+    8 byte boundary, and the size of the block.
+    """
+    offsets = []
+    offset = 0
+    for name, dtype, shape in _columns(capacity, config, name_width):
+        offsets.append((name, dtype, shape, offset))
+        offset += -(-dtype.itemsize * int(np.prod(shape)) // 8) * 8
+    return offsets, max(offset, 1)
+
+
+def _check_fits(column, value, what):
+    """
+    Raise a ValueError if an integer does not fit the type of a column.
+    """
+    limits = np.iinfo(column.dtype)
+    if not limits.min <= value <= limits.max:
+        raise ValueError(f"The {what} {value} does not fit the store.")
+
+
+def _kept_numbers(lucky_list, remaining):
+    """
+    Return which numbers of a dealt list are still in play.
+
+    Args:
+        lucky_list (numpy.ndarray): The numbers as they were dealt.
+        remaining (iterable): The numbers not guessed yet,
+            in any order.
+
+    Return:
+        numpy.ndarray:
+            True for each position of lucky_list still in play. Of a
+            number drawn several times, the first copies are kept.
+    """
+    order = np.argsort(lucky_list, kind="stable")
+    ordered = lucky_list[order]
+    left = np.sort(np.asarray(remaining, dtype=lucky_list.dtype))
+    # Which copy of its number every position of the sorted list is
+    copy = np.arange(len(ordered)) - np.searchsorted(ordered, ordered)
+    copies_left = (np.searchsorted(left, ordered, "right")
+                   - np.searchsorted(left, ordered))
+    kept = np.empty(len(lucky_list), dtype=bool)
+    kept[order] = copy < copies_left
+    return kept
+
+
+
+class SessionStore:
+    """
+    A class holding the state of many games in a few flat arrays.
+
+    Instead of one Game object per player, every field of a game
+    is a column in a NumPy array with one row per session slot
+    (struct-of-arrays). A session costs a fixed number of bytes
+    and no Python objects, so hundreds of thousands of live
+    sessions fit in a few megabytes.
+
+    A store made with shared() keeps its arrays in one block of
+    shared memory, which other processes map with attach(), so
+    sessions can be played, inspected and moved between processes
+    without pickling them.
+
+    Attributes:
+        capacity (int): The number of session slots.
+        config (GameConfig): The rules of the games in the store.
+        list_size (int): The longest lucky_list a slot can hold.
+        lucky_lists (numpy.ndarray): The lucky lists as they were
+            dealt, one row per slot.
+        list_lengths (numpy.ndarray): How many numbers each row holds.
+        kept_numbers (numpy.ndarray): One bit per number of each row,
+            packed little-endian, set while it has not been guessed.
+        lucky_numbers (numpy.ndarray): The lucky number of each slot.
+        tries_counts (numpy.ndarray): The tries count of each slot.
+        player_inputs (numpy.ndarray): The latest guess of each slot.
+        player_ages (numpy.ndarray): The player age of each slot.
+        player_birthdates (numpy.ndarray): The birthdate of each slot
+            as the integer YYYYMMDD, 0 if not known yet.
+        player_names (numpy.ndarray): The UTF-8 encoded player names.
+        phases (numpy.ndarray): The index in engine.PHASES of the phase
+            of each slot, for sessions played with GameEngine.
+        in_use (numpy.ndarray): True for the slots holding a session.
+        dirty (numpy.ndarray): True for the slots changed since the
+            last checkpoint, see checkpoint.py.
+        name_width (int): The most bytes a player name may take.
+        checkpoint_sequence (int): The number of the last checkpoint
+            taken or restored, -1 if there is none.
+        shared_memory (SharedMemory): The block holding the arrays,
+            or None if they are private to this process.
+    """
+    def __init__(self, capacity, config=None, name_width=32,
+                 shared_memory=None):
+        """
+        Initialize the SessionStore instance.
+
+        Args:
+            capacity (int): The number of session slots.
+            config (GameConfig): The rules of the games in the store.
+                Its list size and range set the width of the arrays.
+            name_width (int): The most bytes a player name may take.
+            shared_memory (SharedMemory): A block to lay the arrays
+                out in, as shared() and attach() do. The arrays are
+                private to this process if not given.
+        """
+        self.capacity = capacity
+        self.config = config if config is not None else GameConfig()
+        self.list_size = self.config.list_size
+        self.name_width = name_width
+        self.checkpoint_sequence = -1
+        self.shared_memory = shared_memory
+        offsets, _ = _column_offsets(capacity, self.config, name_width)
+        for name, dtype, shape, offset in offsets:
+            if shared_memory is None:
+                column = np.zeros(shape, dtype=dtype)
+            else:
+                column = np.ndarray(shape, dtype=dtype,
+                                    buffer=shared_memory.buf, offset=offset)
+            setattr(self, name, column)
+        self.rebuild_free_slots()
+
+
+    def rebuild_free_slots(self):
+        """
+        List the free slots again from in_use, after the arrays
+        were filled in from elsewhere, a checkpoint for example.
+        """
+        # Free slots, popped from the end so that
+        # the lowest slots are handed out first
+        self._free_slots = np.flatnonzero(~self.in_use)[::-1].tolist()
+
+
+    @classmethod
+    def shared(cls, capacity, config=None, name_width=32):
+        """
+        Create an empty store in a new block of shared memory.
+
+        Args:
+            capacity (int): The number of session slots.
+            config (GameConfig): The rules of the games in the store.
+            name_width (int): The most bytes a player name may take.
+
+        Return:
+            SessionStore:
+                The store. Its shared_memory.name is what other
+                processes pass to attach.
+        """
+        config = config if config is not None else GameConfig()
+        _, size = _column_offsets(capacity, config, name_width)
+        # New blocks are zero filled, which is an empty store
+        block = shared_memory.SharedMemory(create=True, size=size)
+        return cls(capacity, config, name_width, block)
+
+
+    @classmethod
+    def attach(cls, name, capacity, config=None, name_width=32):
+        """
+        Map a store created with shared() in another process.
+
+        Args:
+            name (str): The name of its block of shared memory.
+            capacity (int): The number of session slots.
+            config (GameConfig): The rules of the games in the store.
+            name_width (int): The most bytes a player name may take.
+
+        Return:
+            SessionStore:
+                A store seeing the same arrays as the original.
+        """
+        block = shared_memory.SharedMemory(name=name)
+        return cls(capacity, config, name_width, block)
+
+
+    def close(self, unlink=False):
+        """
+        Unmap the store's shared memory, if it has any.
+
+        Args:
+            unlink (bool): Also free the block, which the process
+                that created it does once every process is done.
+        """
+        if self.shared_memory is None:
+            return
+        # The arrays point into the block and must go before it closes
+        for name in self.fields():
+            setattr(self, name, None)
+        self.dirty = None
+        self.shared_memory.close()
+        if unlink:
+            self.shared_memory.unlink()
+        self.shared_memory = None
+
+
+    def fields(self):
+        """
+        Return every per-session array by name.
+
+        Return:
+            dict:
+                The attribute name and array of every field.
+        """
+        return {
+            "lucky_lists": self.lucky_lists,
+            "list_lengths": self.list_lengths,
+            "kept_numbers": self.kept_numbers,
+            "lucky_numbers": self.lucky_numbers,
+            "tries_counts": self.tries_counts,
+            "player_inputs": self.player_inputs,
+            "player_ages": self.player_ages,
+            "player_birthdates": self.player_birthdates,
+            "player_names": self.player_names,
+            "phases": self.phases,
+            "in_use": self.in_use,
+        }
+
+
+    def __len__(self):
+        """
+        Return the number of slots holding a session.
+        """
+        return self.capacity - len(self._free_slots)
+
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes used by the session arrays.
+        """
+        return sum(field.nbytes for field in self.fields().values())
+
+
+    def allocate(self):
+        """
+        Reserve a free slot for a new session.
+
+        Return:
+            int:
+                The slot number.
+
+        Raises:
+            MemoryError: If every slot is in use.
+        """
+        if not self._free_slots:
+            raise MemoryError("Every session slot is in use.")
+        slot = self._free_slots.pop()
+        self.in_use[slot] = True
+        self.dirty[slot] = True
+        return slot
+
+
+    def release(self, slot):
+        """
+        Free a slot and clear its session.
+
+        Args:
+            slot (int): The slot to free.
+        """
+        if not self.in_use[slot]:
+            return
+        for field in self.fields().values():
+            # The zero value of the field's type, b"" for names
+            field[slot] = field.dtype.type()
+        self.dirty[slot] = True
+        self._free_slots.append(slot)
+
+
+    def _write_list(self, slot, lucky_list, remaining):
+        """
+        Write a dealt list and which of its numbers are still in play.
+        """
+        length = len(lucky_list)
+        if length > self.list_size:
+            raise ValueError(f"The lucky_list has {length} numbers, "
+                             f"the store holds at most {self.list_size}.")
+        self.lucky_lists[slot, :length] = lucky_list
+        self.lucky_lists[slot, length:] = 0
+        self.list_lengths[slot] = length
+        if remaining is None:
+            kept = np.ones(length, dtype=bool)
+        else:
+            kept = _kept_numbers(self.lucky_lists[slot, :length], remaining)
+        packed = np.packbits(kept, bitorder="little")
+        self.kept_numbers[slot, :len(packed)] = packed
+        self.kept_numbers[slot, len(packed):] = 0
+
+
+    def _read_list(self, slot):
+        """
+        Return the dealt list of a slot and the numbers still in play.
+        """
+        length = int(self.list_lengths[slot])
+        lucky_list = self.lucky_lists[slot, :length]
+        kept = np.unpackbits(self.kept_numbers[slot], count=length,
+                             bitorder="little").astype(bool)
+        return lucky_list, lucky_list[kept]
+
+
+    def save(self, slot, game):
+        """
+        Copy the state of a Game into a slot.
+
+        Args:
+            slot (int): The slot to write to.
+            game (Game): The game to copy.
+
+        Raises:
+            ValueError: If the lucky_list, player name, tries count
+                or latest guess do not fit.
+        """
+        name = game.player_name.encode()
+        if len(name) > self.player_names.itemsize:
+            raise ValueError("The player name is too long to store.")
+        _check_fits(self.tries_counts, game.tries_count, "tries count")
+        _check_fits(self.player_inputs, game.player_input, "guess")
+        _check_fits(self.player_ages, game.player_age, "player age")
+        remaining = (None if game.candidates is None
+                     else game.candidates.to_list())
+        self._write_list(slot, game.lucky_list, remaining)
+
+        self.lucky_numbers[slot] = game.lucky_number
+        self.tries_counts[slot] = game.tries_count
+        self.player_inputs[slot] = game.player_input
+        self.player_ages[slot] = game.player_age
+        self.player_birthdates[slot] = int(game.player_birthdate or 0)
+        self.player_names[slot] = name
+        self.dirty[slot] = True
+
+
+    def load(self, slot, game=None):
+        """
+        Copy the state of a slot into a Game.
+
+        Args:
+            slot (int): The slot to read from.
+            game (Game): The game to fill in. A new one
+                is created if not given.
+
+        Return:
+            Game:
+                The game holding the slot's state, with the lucky_list
+                as it was dealt and the numbers guessed already
+                left out of its candidates.
+        """
+        if game is None:
+            game = Game(self.config)
+        lucky_list, remaining = self._read_list(slot)
+        game.lucky_list = array(self.config.typecode, lucky_list.tobytes())
+        game.lucky_number = int(self.lucky_numbers[slot])
+        if len(remaining) < len(lucky_list):
+            game.candidates = make_candidates(remaining.tolist(),
+                                              game.lucky_number, self.config)
+        game.tries_count = int(self.tries_counts[slot])
+        game.player_input = int(self.player_inputs[slot])
+        game.player_age = int(self.player_ages[slot])
+        birthdate = int(self.player_birthdates[slot])
+        game.player_birthdate = f"{birthdate:08d}" if birthdate else ""
+        game.player_name = self.player_names[slot].decode()
+        return game
+
+
+    def copy_to(self, slot, store, target):
+        """
+        Copy a session to a slot of another store with the same rules,
+        as when moving it to another process.
+
+        Args:
+            slot (int): The slot to copy.
+            store (SessionStore): The store to copy to.
+            target (int): The slot of that store to write to.
+        """
+        fields = store.fields()
+        for name, field in self.fields().items():
+            fields[name][target] = field[slot]
+        store.dirty[target] = True
+
+
+    def save_state(self, slot, state):
+        """
+        Copy a GameEngine session state into a slot.
+
+        Args:
+            slot (int): The slot to write to.
+            state (GameState): The state to copy.
+
+        Raises:
+            ValueError: If the numbers, player name, tries count
+                or player age do not fit.
+        """
+        name = state.player_name.encode()
+        if len(name) > self.player_names.itemsize:
+            raise ValueError("The player name is too long to store.")
+        _check_fits(self.tries_counts, state.tries_count, "tries count")
+        _check_fits(self.player_ages, state.player_age, "player age")
+        self._write_list(slot, state.lucky_list, state.remaining)
+
+        self.lucky_numbers[slot] = state.lucky_number
+        self.tries_counts[slot] = state.tries_count
+        self.player_ages[slot] = state.player_age
+        self.player_birthdates[slot] = int(state.player_birthdate or 0)
+        self.player_names[slot] = name
+        self.dirty[slot] = True
+        self.phases[slot] = PHASES.index(state.phase)
+
+
+    def load_state(self, slot):
+        """
+        Read the GameEngine session state of a slot.
+
+        Return:
+            GameState:
+                The state.
+        """
+        lucky_list, remaining = self._read_list(slot)
+        remaining = tuple(np.sort(remaining).tolist())
+        lucky_number = int(self.lucky_numbers[slot])
+        window = self.config.window
+        birthdate = int(self.player_birthdates[slot])
+        return GameState(
+            PHASES[self.phases[slot]], self.player_names[slot].decode(),
+            f"{birthdate:08d}" if birthdate else "",
+            int(self.player_ages[slot]), tuple(lucky_list.tolist()),
+            lucky_number, int(self.tries_counts[slot]), remaining,
+            bisect_right(remaining, lucky_number + window)
+            - bisect_left(remaining, lucky_number - window))
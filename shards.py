@@ -0,0 +1,417 @@
+import argparse
+import multiprocessing
+import os
+import time
+from bisect import bisect
+from hashlib import blake2b
+from engine import EXIT, GameEngine
+from game import GameConfig
+from rng import SessionRNG
+from session_store import SessionStore
+
+
+
+def _hash(key):
+    """
+    Return a 64-bit hash of a string that is the same in every process,
+    unlike the built-in hash of strings.
+    """
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(),
+                          "little")
+
+
+
+class HashRing:
+    """
+    A class mapping keys to nodes by consistent hashing.
+
+    Every node is placed at a number of points on a ring of 64-bit
+    hashes, and a key belongs to the node of the first point after
+    the key's hash. Adding or removing a node only moves the keys
+    of the ring arcs it gains or loses, about one key in N.
+
+    Attributes:
+        replicas (int): The number of points per node, which
+            evens out the share of keys each node gets.
+    """
+    __slots__ = ("replicas", "_points", "_nodes")
+
+    def __init__(self, nodes=(), replicas=64):
+        """
+        Initialize the HashRing instance.
+
+        Args:
+            nodes (iterable): The nodes to start with.
+            replicas (int): The number of points per node.
+        """
+        self.replicas = replicas
+        self._points = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+
+    def add(self, node):
+        """
+        Place a node on the ring.
+
+        Args:
+            node (int): The node, a worker number for example.
+        """
+        for replica in range(self.replicas):
+            point = _hash(f"{node}:{replica}")
+            index = bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+
+    def remove(self, node):
+        """
+        Take a node off the ring.
+
+        Args:
+            node (int): The node to remove.
+        """
+        kept = [(point, owner) for point, owner
+                in zip(self._points, self._nodes) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._nodes = [owner for _, owner in kept]
+
+
+    def owner(self, key):
+        """
+        Return the node a key belongs to.
+
+        Args:
+            key (str): The key, a player name for example.
+
+        Return:
+            int:
+                The node.
+
+        Raises:
+            LookupError: If the ring has no nodes.
+        """
+        if not self._points:
+            raise LookupError("The ring has no nodes.")
+        index = bisect(self._points, _hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+
+
+def _serve_shard(name, capacity, config, name_width, rng, year,
+                 requests, replies):
+    """
+    Play the sessions of one shard in a worker process.
+
+    The worker maps its shard's store and answers batches of
+    (slot, answer) pairs until it is sent None. Sessions are read
+    from and written back to the shared store on every step, so the
+    worker keeps no state of its own and its sessions can be moved
+    to another shard between batches.
+
+    An answer whose step fails leaves its session as it was and is
+    answered with an ("error", message) effect, so one bad session
+    can not stop the worker and leave the manager waiting.
+    """
+    store = SessionStore.attach(name, capacity, config, name_width)
+    engine = GameEngine(config, rng, year)
+    try:
+        for batch in iter(requests.get, None):
+            results = []
+            for slot, answer in batch:
+                try:
+                    if answer is None:
+                        state, effects = engine.start()
+                    else:
+                        state, effects = engine.step(store.load_state(slot),
+                                                     answer)
+                    store.save_state(slot, state)
+                except Exception as error:
+                    effects = (("error", f"{type(error).__name__}: {error}"),)
+                results.append(effects)
+            replies.put(results)
+    finally:
+        store.close()
+
+
+
+class _Worker:
+    """
+    A worker process with its shard's store and queues.
+    """
+    __slots__ = ("store", "process", "requests", "replies")
+
+    def __init__(self, store, process, requests, replies):
+        self.store = store
+        self.process = process
+        self.requests = requests
+        self.replies = replies
+
+
+
+class ShardManager:
+    """
+    A class playing sessions in worker processes, sharded by player.
+
+    Every worker plays its sessions with a GameEngine, outside of the
+    GIL of the other workers, and keeps them in a SessionStore in
+    shared memory. The manager owns the slots: it routes each answer
+    to the worker of the player's shard, and can read any session or
+    move it between shards by copying its row, without pickling.
+
+    Players are placed on shards by consistent hashing, so adding or
+    removing a worker only moves the sessions of the shards it gains
+    or loses. Sessions are moved between batches, while the workers
+    wait, and continue where they were on their new worker.
+
+    Answers are sent in batches, one message per worker per batch,
+    so the cost of talking to the workers is shared by every answer
+    of the batch and throughput grows with the number of cores.
+
+    Attributes:
+        capacity (int): The number of session slots per worker.
+        config (GameConfig): The rules of every session.
+        name_width (int): The most bytes a player name may take.
+        year (int): The year ages are counted to, or None for the
+            current year.
+        workers (dict): The running workers by number.
+        directory (dict): The worker number and slot of the
+            session of every player.
+    """
+    def __init__(self, workers=None, capacity=10_000, config=None, seed=None,
+                 name_width=32, year=None, replicas=64):
+        """
+        Initialize the ShardManager instance and start the workers.
+
+        Args:
+            workers (int): The number of worker processes. One per
+                CPU is started if not given.
+            capacity (int): The number of session slots per worker.
+            config (GameConfig): The rules of every session.
+            seed (int): The seed the workers' streams are spawned from.
+            name_width (int): The most bytes a player name may take.
+            year (int): The year ages are counted to.
+            replicas (int): The points per worker on the hash ring.
+        """
+        self.capacity = capacity
+        self.config = config if config is not None else GameConfig()
+        self.name_width = name_width
+        self.year = year
+        self.workers = {}
+        self.directory = {}
+        self._ring = HashRing(replicas=replicas)
+        self._rng = SessionRNG(seed)
+        self._next_worker = 0
+        for _ in range(workers or os.cpu_count() or 1):
+            self._start_worker()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def _start_worker(self):
+        """
+        Start a worker process with an empty shard.
+
+        Return:
+            int:
+                The worker number.
+        """
+        number = self._next_worker
+        self._next_worker += 1
+        store = SessionStore.shared(self.capacity, self.config,
+                                    self.name_width)
+        requests = multiprocessing.SimpleQueue()
+        replies = multiprocessing.SimpleQueue()
+        process = multiprocessing.Process(
+            target=_serve_shard, daemon=True,
+            args=(store.shared_memory.name, self.capacity, self.config,
+                  self.name_width, self._rng.spawn(), self.year,
+                  requests, replies))
+        process.start()
+        self.workers[number] = _Worker(store, process, requests, replies)
+        self._ring.add(number)
+        return number
+
+
+    def _stop_worker(self, number):
+        """
+        Stop a worker and free its shard, which must be empty.
+        """
+        worker = self.workers.pop(number)
+        worker.requests.put(None)
+        worker.process.join()
+        worker.store.close(unlink=True)
+
+
+    def _move(self, player, target):
+        """
+        Move a player's session to the shard of another worker.
+        """
+        number, slot = self.directory[player]
+        store = self.workers[number].store
+        target_store = self.workers[target].store
+        target_slot = target_store.allocate()
+        store.copy_to(slot, target_store, target_slot)
+        store.release(slot)
+        self.directory[player] = (target, target_slot)
+
+
+    def _rebalance(self):
+        """
+        Move every session whose player hashes to another worker now.
+
+        Return:
+            int:
+                The number of sessions moved.
+        """
+        owner = self._ring.owner
+        moves = [(player, owner(player))
+                 for player, (number, _) in self.directory.items()
+                 if owner(player) != number]
+        for player, target in moves:
+            self._move(player, target)
+        return len(moves)
+
+
+    def add_worker(self):
+        """
+        Start another worker and move to it the sessions of its shards.
+
+        Return:
+            int:
+                The number of the new worker.
+        """
+        number = self._start_worker()
+        self._rebalance()
+        return number
+
+
+    def remove_worker(self, number):
+        """
+        Move a worker's sessions to the other workers and stop it.
+
+        Args:
+            number (int): The worker to remove.
+
+        Raises:
+            ValueError: If it is the last worker.
+        """
+        if len(self.workers) == 1:
+            raise ValueError("The last worker can not be removed.")
+        self._ring.remove(number)
+        self._rebalance()
+        self._stop_worker(number)
+
+
+    def submit(self, answers):
+        """
+        Play one batch of answers.
+
+        Args:
+            answers (list): (player, answer) pairs. An answer of None
+                starts a session for the player.
+
+        Return:
+            list:
+                The effects of every answer, as GameEngine.step
+                returns them, in the order of the answers. An answer
+                whose step failed gets an ("error", message) effect
+                and leaves its session as it was.
+
+        Raises:
+            KeyError: If a player without a session answers.
+            ValueError: If a player with a session starts another.
+            MemoryError: If the player's shard is full.
+        """
+        batches = {number: [] for number in self.workers}
+        routes = []
+        for player, answer in answers:
+            if answer is None:
+                if player in self.directory:
+                    raise ValueError(f"{player} already has a session.")
+                number = self._ring.owner(player)
+                slot = self.workers[number].store.allocate()
+                self.directory[player] = (number, slot)
+            else:
+                number, slot = self.directory[player]
+            batch = batches[number]
+            routes.append((number, len(batch)))
+            batch.append((slot, answer))
+
+        # Send every batch before waiting, so the workers play together
+        for number, batch in batches.items():
+            if batch:
+                self.workers[number].requests.put(batch)
+        replies = {number: self.workers[number].replies.get()
+                   for number, batch in batches.items() if batch}
+
+        results = [replies[number][index] for number, index in routes]
+        for (player, _), effects in zip(answers, results):
+            if effects[-1] == EXIT:
+                number, slot = self.directory.pop(player)
+                self.workers[number].store.release(slot)
+        return results
+
+
+    def session(self, player):
+        """
+        Read a player's session from shared memory.
+
+        Args:
+            player (str): The player.
+
+        Return:
+            GameState:
+                The state of the session.
+
+        Raises:
+            KeyError: If the player has no session.
+        """
+        number, slot = self.directory[player]
+        return self.workers[number].store.load_state(slot)
+
+
+    def close(self):
+        """
+        Stop every worker and free the shared memory.
+        """
+        for number in list(self.workers):
+            self._stop_worker(number)
+        self.directory.clear()
+
+
+
+def _bench(workers, sessions, batch_size):
+    """
+    Register players in batches and report the answers per second.
+    """
+    players = [f"Player{index}" for index in range(sessions)]
+    with ShardManager(workers, capacity=sessions) as manager:
+        start = time.perf_counter()
+        for first in range(0, sessions, batch_size):
+            batch = players[first:first + batch_size]
+            for answer in (None, "Ada", "19900101", "x"):
+                manager.submit([(player, answer) for player in batch])
+        elapsed = time.perf_counter() - start
+    return sessions * 4 / elapsed
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the answers per second of sharded workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for workers in sorted({1, args.workers}):
+        rate = _bench(workers, args.sessions, args.batch_size)
+        print(f"{workers} workers: {rate:,.0f} answers per second")
@@ -0,0 +1,294 @@
+import argparse
+import time
+import numpy as np
+
+
+
+class SimulationResult:
+    """
+    A class holding the outcome of a batch of simulated rounds.
+
+    Every array has one entry per round, in the order
+    the rounds were played.
+
+    Attributes:
+        tries (numpy.ndarray): The number of guesses made in each round.
+        won (numpy.ndarray): True where the round ended with the
+            lucky number, False where it ended in GAME OVER.
+    """
+    def __init__(self, tries, won):
+        """
+        Initialize the SimulationResult instance.
+
+        Args:
+            tries (numpy.ndarray): The number of guesses per round.
+            won (numpy.ndarray): The outcome of each round.
+        """
+        self.tries = tries
+        self.won = won
+
+
+    def __len__(self):
+        """
+        Return the number of simulated rounds.
+        """
+        return len(self.tries)
+
+
+    def win_rate(self):
+        """
+        Return the share of rounds that ended with the lucky number.
+
+        Return:
+            float:
+                A value between 0 and 1.
+        """
+        if len(self) == 0:
+            return 0.0
+        return float(np.count_nonzero(self.won)) / len(self)
+
+
+    def game_over_rate(self):
+        """
+        Return the share of rounds that ended in GAME OVER.
+
+        Return:
+            float:
+                A value between 0 and 1.
+        """
+        if len(self) == 0:
+            return 0.0
+        return 1.0 - self.win_rate()
+
+
+    def tries_histogram(self):
+        """
+        Count how many rounds ended after each number of tries.
+
+        Return:
+            numpy.ndarray:
+                An array where index n holds the number of rounds
+                that ended on try n.
+        """
+        return np.bincount(self.tries)
+
+
+
+def value_dtype(low, high):
+    """
+    Pick the smallest signed integer type that can hold
+    every value between low and high, and their differences.
+
+    Args:
+        low (int): The smallest value that can be drawn.
+        high (int): The largest value that can be drawn.
+
+    Return:
+        numpy.dtype:
+            The dtype to store lucky lists in.
+    """
+    span = max(abs(low), abs(high), high - low)
+    if span < 2 ** 15:
+        return np.dtype(np.int16)
+    if span < 2 ** 31:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def generate_rounds(n_rounds, rng, list_size=10, low=0, high=100):
+    """
+    Generate the lucky lists for many rounds at once.
+
+    Each row is one round's lucky_list. As in
+    Game.generate_lucky_number, the lucky number
+    is the last number of the list.
+
+    Args:
+        n_rounds (int): The number of rounds to generate.
+        rng (numpy.random.Generator): The generator to draw from.
+        list_size (int): The length of every lucky_list.
+        low (int): The smallest number that can be drawn.
+        high (int): The largest number that can be drawn.
+
+    Return:
+        numpy.ndarray:
+            An array of shape (n_rounds, list_size).
+    """
+    return rng.integers(low, high, size=(n_rounds, list_size),
+                        dtype=value_dtype(low, high), endpoint=True)
+
+
+def _pick_random(lists, visible, rng):
+    """
+    Pick a uniformly random visible number in every row.
+    """
+    # Give every hidden number a key below any random key
+    # so that argmax only ever lands on a visible number
+    keys = rng.random(lists.shape, dtype=np.float32)
+    keys[~visible] = -1.0
+    return keys.argmax(axis=1)
+
+
+def _pick_smallest(lists, visible, rng):
+    """
+    Pick the smallest visible number in every row.
+    """
+    hidden = np.iinfo(lists.dtype).max
+    return np.where(visible, lists, hidden).argmin(axis=1)
+
+
+def _pick_largest(lists, visible, rng):
+    """
+    Pick the largest visible number in every row.
+    """
+    hidden = np.iinfo(lists.dtype).min
+    return np.where(visible, lists, hidden).argmax(axis=1)
+
+
+def _pick_median(lists, visible, rng):
+    """
+    Pick the visible number nearest to the median of the
+    visible numbers in every row, the lower one of two.
+    """
+    # Sort the hidden numbers after every visible one
+    hidden = np.iinfo(lists.dtype).max
+    order = np.where(visible, lists, hidden).argsort(axis=1, kind="stable")
+    middle = (visible.sum(axis=1) - 1) // 2
+    return order[np.arange(len(lists)), middle]
+
+
+# Guessing strategies by name. Each one receives the lists being played,
+# a mask of the numbers the player can see and a generator, and
+# returns the column of the number guessed in every row.
+STRATEGIES = {
+    "random": _pick_random,
+    "smallest": _pick_smallest,
+    "largest": _pick_largest,
+    "median": _pick_median,
+}
+
+
+def play_rounds(lists, window=10, strategy="random", rng=None):
+    """
+    Play every row of lists as one round of Lucky Number.
+
+    The rules are those of Game.ask_for_player_input and
+    Game.handle_wrong_guess: the first guess is made from the
+    whole list, a wrong guess removes the guessed number and
+    only numbers within window of the lucky number stay visible.
+    The round is over when the lucky number is guessed or when
+    fewer than 2 numbers are left to pick from.
+
+    Args:
+        lists (numpy.ndarray): The lucky lists, one round per row,
+            with the lucky number in the last column.
+        window (int): How far from the lucky number a number
+            may be and still stay in the shorter list.
+        strategy (str): The name of a strategy in STRATEGIES.
+        rng (numpy.random.Generator): The generator used by the
+            strategy. A fresh one is created if not given.
+
+    Return:
+        SimulationResult:
+            The tries and outcome of every round.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    pick = STRATEGIES[strategy]
+
+    n_rounds, list_size = lists.shape
+    lucky = lists[:, -1:]
+    # Masks that never change during a round
+    is_lucky = lists == lucky
+    in_window = np.abs(lists - lucky) <= window
+    # Numbers that have not been guessed yet,
+    # and numbers the player can currently see
+    alive = np.ones(lists.shape, dtype=bool)
+    visible = alive.copy()
+
+    tries = np.zeros(n_rounds, dtype=np.int32)
+    won = np.zeros(n_rounds, dtype=bool)
+    # Indices of the rounds that are still being played
+    rows = np.arange(n_rounds)
+
+    # Every wrong guess removes a number,
+    # so no round can last longer than the list
+    for try_number in range(1, list_size + 1):
+        if rows.size == 0:
+            break
+        columns = pick(lists[rows], visible[rows], rng)
+        tries[rows] = try_number
+
+        # Rounds where the lucky number was picked are won
+        hit = is_lucky[rows, columns]
+        won[rows[hit]] = True
+
+        # Remove the wrong guesses and build the shorter lists
+        missed = rows[~hit]
+        alive[missed, columns[~hit]] = False
+        shorter = alive[missed] & in_window[missed]
+        visible[missed] = shorter
+
+        # Keep playing only where there are enough numbers left
+        rows = missed[shorter.sum(axis=1) >= 2]
+
+    return SimulationResult(tries, won)
+
+
+def simulate_rounds(n_rounds, list_size=10, low=0, high=100, window=10,
+                    strategy="random", seed=None, chunk_size=65536):
+    """
+    Generate and play many rounds of Lucky Number without a player.
+
+    The rounds are played in chunks so that the
+    working arrays stay small and in cache.
+
+    Args:
+        n_rounds (int): The number of rounds to play.
+        list_size (int): The length of every lucky_list.
+        low (int): The smallest number that can be drawn.
+        high (int): The largest number that can be drawn.
+        window (int): The elimination window of the shorter list.
+        strategy (str): The name of a strategy in STRATEGIES.
+        seed (int or numpy.random.SeedSequence): Seed for the
+            generator, for reproducible runs.
+        chunk_size (int): The number of rounds played at a time.
+
+    Return:
+        SimulationResult:
+            The tries and outcome of every round.
+    """
+    rng = np.random.default_rng(seed)
+    tries = np.empty(n_rounds, dtype=np.int32)
+    won = np.empty(n_rounds, dtype=bool)
+
+    for start in range(0, n_rounds, chunk_size):
+        stop = min(start + chunk_size, n_rounds)
+        lists = generate_rounds(stop - start, rng, list_size, low, high)
+        result = play_rounds(lists, window, strategy, rng)
+        tries[start:stop] = result.tries
+        won[start:stop] = result.won
+
+    return SimulationResult(tries, won)
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play Lucky Number rounds without a player.")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES),
+                        default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate_rounds(args.rounds, strategy=args.strategy,
+                             seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Rounds played: {len(result)}")
+    print(f"Rounds per second: {len(result) / elapsed:,.0f}")
+    print(f"Win rate: {result.win_rate():.4f}")
+    print(f"Game over rate: {result.game_over_rate():.4f}")
+    print(f"Tries histogram: {result.tries_histogram().tolist()}")
@@ -0,0 +1,251 @@
+import argparse
+import time
+from collections import OrderedDict
+import numpy as np
+from game import GameConfig
+from simulation import generate_rounds
+
+
+
+class Solver:
+    """
+    A class computing the exact odds of a round under optimal play.
+
+    The player sees the lucky_list but not which number is lucky,
+    so every number is equally likely to be the lucky one (a number
+    drawn twice is twice as likely). After a wrong guess the player
+    sees the shorter list, which rules out every lucky number that
+    would have given a different shorter list. The rules are those
+    of Game.check_guess and Game.eliminate_guess.
+
+    A state is the numbers the player can pick from and the numbers
+    that may still be the lucky one. States are canonicalized before they are looked up, by
+    sorting, shifting the smallest number to 0 and mirroring, since
+    none of these change the odds. Results are kept in a memo table
+    of bounded size that evicts the least recently used state.
+
+    Attributes:
+        window (int): The elimination window of the shorter list.
+        maxsize (int): The most states kept in the memo table.
+        hits (int): How many lookups were answered from the memo table.
+        misses (int): How many lookups had to be computed.
+    """
+    def __init__(self, window=10, maxsize=1_000_000):
+        """
+        Initialize the Solver instance.
+
+        Args:
+            window (int): The elimination window of the shorter list.
+            maxsize (int): The most states kept in the memo table.
+        """
+        self.window = window
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+
+
+    def cache_info(self):
+        """
+        Return the memo table statistics.
+
+        Return:
+            dict:
+                The hits, misses, hit rate, size and maxsize.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._memo),
+            "maxsize": self.maxsize,
+        }
+
+
+    def _canonical(self, numbers, hypotheses):
+        """
+        Return the key of a state that is the same for every
+        shifted or mirrored copy of it.
+        """
+        low = numbers[0]
+        high = numbers[-1]
+        shifted = (tuple(x - low for x in numbers),
+                   tuple(x - low for x in hypotheses))
+        mirrored = (tuple(high - x for x in reversed(numbers)),
+                    tuple(high - x for x in reversed(hypotheses)))
+        return min(shifted, mirrored)
+
+
+    def _shorter_list(self, numbers, lucky_number):
+        """
+        Return the numbers within window of a lucky number.
+        """
+        return tuple(x for x in numbers if abs(x - lucky_number) <= self.window)
+
+
+    def _state(self, lucky_list, visible):
+        """
+        Return the sorted numbers to pick from and the possible
+        lucky numbers of a round.
+
+        Only numbers that would have given the visible shorter list
+        can be the lucky number. Every number within window of one
+        of them is in the shorter list, so the numbers outside it
+        can never matter again and are left out of the state.
+        """
+        numbers = tuple(sorted(int(x) for x in lucky_list))
+        if visible is None:
+            return numbers, tuple(sorted(set(numbers)))
+        visible = tuple(sorted(int(x) for x in visible))
+        hypotheses = tuple(number for number in sorted(set(visible))
+                           if self._shorter_list(numbers, number) == visible)
+        return visible, hypotheses
+
+
+    def _outcomes(self, numbers, hypotheses, guess):
+        """
+        Return the win probability and expected tries of a guess,
+        playing optimally afterwards.
+        """
+        # A lucky number drawn twice is twice as likely
+        weights = {number: numbers.count(number) for number in hypotheses}
+        total = sum(weights.values())
+        win = weights.get(guess, 0) / total
+        tries = 1.0
+        # The numbers left after removing one copy of the guess
+        index = numbers.index(guess)
+        remaining = numbers[:index] + numbers[index + 1:]
+
+        # Group the other possible lucky numbers by the shorter
+        # list the player would see next
+        next_states = {}
+        for lucky_number in hypotheses:
+            if lucky_number == guess:
+                continue
+            shorter = self._shorter_list(remaining, lucky_number)
+            # Fewer than 2 numbers left is GAME OVER
+            if len(shorter) >= 2:
+                next_states.setdefault(shorter, []).append(lucky_number)
+
+        for shorter, lucky_numbers in next_states.items():
+            weight = sum(weights[number] for number in lucky_numbers)
+            next_win, next_tries = self._solve(shorter, tuple(lucky_numbers))
+            win += weight / total * next_win
+            tries += weight / total * next_tries
+        return win, tries
+
+
+    @staticmethod
+    def _better(odds, best):
+        """
+        Check whether odds beat the best odds so far: winning as
+        often as possible, then in as few tries as possible.
+        Probabilities that only differ by rounding are equal.
+        """
+        if abs(odds[0] - best[0]) > 1e-9:
+            return odds[0] > best[0]
+        return odds[1] < best[1] - 1e-9
+
+
+    def _solve(self, numbers, hypotheses):
+        """
+        Return the odds of a state, using the memo table.
+        """
+        key = self._canonical(numbers, hypotheses)
+        if key in self._memo:
+            self.hits += 1
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        self.misses += 1
+
+        numbers, hypotheses = key
+        best = None
+        for guess in sorted(set(numbers)):
+            win, tries = self._outcomes(numbers, hypotheses, guess)
+            if best is None or self._better((win, tries), best):
+                best = (win, tries)
+
+        self._memo[key] = best
+        if len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+        return best
+
+
+    def solve(self, lucky_list, visible=None):
+        """
+        Compute the odds of a round under optimal play.
+
+        Args:
+            lucky_list (iterable): The numbers left in the round.
+            visible (iterable): The shorter list the player picks
+                from, or None on the first guess of the round.
+
+        Return:
+            tuple:
+                The probability of guessing the lucky number and
+                the expected number of tries.
+        """
+        return self._solve(*self._state(lucky_list, visible))
+
+
+    def best_guess(self, lucky_list, visible=None):
+        """
+        Return the guess with the best odds in a state.
+
+        Args:
+            lucky_list (iterable): The numbers left in the round.
+            visible (iterable): The shorter list the player picks
+                from, or None on the first guess of the round.
+
+        Return:
+            int:
+                The number to guess.
+        """
+        numbers, hypotheses = self._state(lucky_list, visible)
+        best_guess = None
+        best = None
+        for guess in sorted(set(numbers)):
+            win, tries = self._outcomes(numbers, hypotheses, guess)
+            if best is None or self._better((win, tries), best):
+                best_guess = guess
+                best = (win, tries)
+        return best_guess
+
+
+    def odds_table(self, lists):
+        """
+        Compute the odds of many rounds.
+
+        Args:
+            lists (iterable): The lucky lists, one per round.
+
+        Return:
+            numpy.ndarray:
+                One row per round holding the win probability
+                and the expected number of tries.
+        """
+        return np.array([self.solve(lucky_list) for lucky_list in lists],
+                        dtype=float).reshape(-1, 2)
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute the exact odds of rounds under optimal play.")
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = GameConfig()
+    lists = generate_rounds(args.rounds, np.random.default_rng(args.seed),
+                            config.list_size, config.low, config.high)
+    solver = Solver(config.window)
+    start = time.perf_counter()
+    table = solver.odds_table(lists)
+    elapsed = time.perf_counter() - start
+
+    print(f"Rounds solved: {len(table)} in {elapsed:.2f}s")
+    print(f"Mean win probability: {table[:, 0].mean():.4f}")
+    print(f"Mean expected tries: {table[:, 1].mean():.3f}")
+    print(f"Memo table: {solver.cache_info()}")
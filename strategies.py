@@ -0,0 +1,187 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from game import GameConfig
+from simulation import STRATEGIES, simulate_rounds
+
+
+
+class StrategyReport:
+    """
+    A class summarizing how a guessing strategy does over many rounds.
+
+    Attributes:
+        strategy (str): The name of the strategy.
+        wins_by_tries (numpy.ndarray): Index n holds the number of
+            rounds won on try n.
+        losses_by_tries (numpy.ndarray): Index n holds the number of
+            rounds that ended in GAME OVER on try n.
+    """
+    def __init__(self, strategy, wins_by_tries, losses_by_tries):
+        """
+        Initialize the StrategyReport instance.
+
+        Args:
+            strategy (str): The name of the strategy.
+            wins_by_tries (numpy.ndarray): Rounds won per try.
+            losses_by_tries (numpy.ndarray): Rounds lost per try.
+        """
+        self.strategy = strategy
+        self.wins_by_tries = wins_by_tries
+        self.losses_by_tries = losses_by_tries
+
+
+    @property
+    def rounds(self):
+        """
+        The number of rounds played.
+        """
+        return int(self.wins_by_tries.sum() + self.losses_by_tries.sum())
+
+
+    def tries_distribution(self):
+        """
+        Return the share of rounds that ended on each try.
+
+        Return:
+            numpy.ndarray:
+                Index n holds the share of rounds that ended on try n.
+        """
+        return (self.wins_by_tries + self.losses_by_tries) / max(self.rounds, 1)
+
+
+    def win_rate(self):
+        """
+        Return the share of rounds won.
+        """
+        return float(self.wins_by_tries.sum()) / max(self.rounds, 1)
+
+
+    def game_over_rate(self):
+        """
+        Return the share of rounds that ended in GAME OVER.
+        """
+        return float(self.losses_by_tries.sum()) / max(self.rounds, 1)
+
+
+    def mean_tries(self):
+        """
+        Return the mean number of tries per round.
+        """
+        tries = np.arange(len(self.wins_by_tries))
+        return float((tries * (self.wins_by_tries + self.losses_by_tries))
+                     .sum()) / max(self.rounds, 1)
+
+
+    def merge(self, other):
+        """
+        Add the rounds of another report of the same strategy.
+
+        Args:
+            other (StrategyReport): The report to add.
+        """
+        self.wins_by_tries = self.wins_by_tries + other.wins_by_tries
+        self.losses_by_tries = self.losses_by_tries + other.losses_by_tries
+
+
+
+def _play_shard(strategy, n_rounds, config, seed_sequence):
+    """
+    Play one shard of rounds in a worker process.
+
+    Only the tries histograms are sent back to the parent,
+    so the cost of merging does not grow with the shard size.
+    """
+    result = simulate_rounds(n_rounds, config.list_size, config.low,
+                             config.high, config.window, strategy,
+                             seed=seed_sequence)
+    # One bin per possible number of tries
+    length = config.list_size + 1
+    wins = np.bincount(result.tries[result.won], minlength=length)
+    losses = np.bincount(result.tries[~result.won], minlength=length)
+    return StrategyReport(strategy, wins, losses)
+
+
+def evaluate_strategies(strategies, n_rounds, config=None, workers=None,
+                        shard_size=1_000_000, seed=None):
+    """
+    Play every strategy on many simulated rounds in a process pool.
+
+    The rounds of each strategy are split into shards, every shard
+    is played by a worker process with its own random stream, and
+    the shard results are merged into one report per strategy.
+    The shards share nothing, so the work spreads evenly over
+    the worker processes.
+
+    Args:
+        strategies (list): The names of strategies in STRATEGIES.
+        n_rounds (int): The number of rounds to play per strategy.
+        config (GameConfig): The rules to play by.
+        workers (int): The number of worker processes. One per
+            CPU core is used if not given.
+        shard_size (int): The most rounds a shard plays.
+        seed (int): Seed for reproducible results.
+
+    Return:
+        dict:
+            A StrategyReport for each strategy name.
+
+    Raises:
+        ValueError: If a strategy is unknown.
+    """
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+    if config is None:
+        config = GameConfig()
+
+    shard_sizes = [min(shard_size, n_rounds - start)
+                   for start in range(0, n_rounds, shard_size)]
+    root = np.random.SeedSequence(seed)
+    reports = {strategy: StrategyReport(strategy,
+                                        np.zeros(config.list_size + 1, int),
+                                        np.zeros(config.list_size + 1, int))
+               for strategy in strategies}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for strategy, strategy_seed in zip(strategies,
+                                           root.spawn(len(strategies))):
+            for size, shard_seed in zip(shard_sizes,
+                                        strategy_seed.spawn(len(shard_sizes))):
+                futures.append(pool.submit(_play_shard, strategy, size,
+                                           config, shard_seed))
+        for future in futures:
+            shard = future.result()
+            reports[shard.strategy].merge(shard)
+    return reports
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare guessing strategies on simulated rounds.")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("strategies", nargs="*", default=sorted(STRATEGIES))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reports = evaluate_strategies(args.strategies, args.rounds,
+                                  workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'strategy':<10} {'win rate':>9} {'game over':>10} "
+          f"{'mean tries':>11}  tries distribution")
+    for name, report in reports.items():
+        distribution = " ".join(f"{share:.3f}" for share
+                                in report.tries_distribution()[1:])
+        print(f"{name:<10} {report.win_rate():>9.4f} "
+              f"{report.game_over_rate():>10.4f} "
+              f"{report.mean_tries():>11.3f}  {distribution}")
+    total = args.rounds * len(reports)
+    print(f"\n{total:,} rounds with {args.workers} workers in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} rounds per second)")
@@ -0,0 +1,183 @@
+from array import array
+import random
+import unittest
+from candidates import (CandidateSet, SortedCandidateSet, in_dealt_order,
+                        make_candidates)
+from game import GameConfig
+
+
+
+class TestCandidateSet(unittest.TestCase):
+    """
+    A class for testing the CandidateSet class.
+    """
+    def setUp(self):
+        """
+        This method sets up a set with duplicates, with 35
+        as the lucky number, for each test.
+        """
+        self.candidates = CandidateSet([10, 30, 30, 40, 50, 100, 35], 35)
+
+
+    def test_membership(self):
+        """
+        Test checking numbers against the set.
+
+        Assertions:
+        - Numbers of the list are in the set.
+        - Other numbers, also outside [0, 100], are not.
+        """
+        self.assertIn(30, self.candidates)
+        self.assertIn(100, self.candidates)
+        self.assertNotIn(31, self.candidates)
+        self.assertNotIn(-1, self.candidates)
+        self.assertNotIn(1000, self.candidates)
+
+
+    def test_remove_keeps_duplicates(self):
+        """
+        Test that removing a duplicate only removes one copy.
+
+        Assertions:
+        - The first removal leaves one 30 in the set.
+        - The second removal takes the last 30 out.
+        - Removing a missing number returns False.
+        """
+        self.assertTrue(self.candidates.remove(30))
+        self.assertIn(30, self.candidates)
+        self.assertEqual(self.candidates.count(30), 1)
+        self.assertTrue(self.candidates.remove(30))
+        self.assertNotIn(30, self.candidates)
+        self.assertFalse(self.candidates.remove(30))
+        self.assertEqual(len(self.candidates), 5)
+
+
+    def test_shorter_list(self):
+        """
+        Test the numbers kept within 10 of the lucky number.
+
+        Assertions:
+        - The shorter list holds both copies of 30, 35 and 40.
+        - The window count follows removals inside and outside it.
+        """
+        self.assertEqual(self.candidates.shorter_list(), [30, 30, 35, 40])
+        self.assertEqual(self.candidates.window_count, 4)
+        self.candidates.remove(50)
+        self.assertEqual(self.candidates.window_count, 4)
+        self.candidates.remove(40)
+        self.assertEqual(self.candidates.window_count, 3)
+        self.assertEqual(self.candidates.shorter_list(), [30, 30, 35])
+
+
+    def test_in_dealt_order(self):
+        """
+        Test putting the shorter list back in dealt order.
+
+        Assertions:
+        - The numbers are in the order of the lucky_list.
+        - Of a number drawn twice and guessed once, the last copy
+          is the one left, as list.remove takes the first.
+        """
+        self.assertEqual(in_dealt_order([50, 20, 45, 90, 40], [40, 45, 50]),
+                         [50, 45, 40])
+        self.assertEqual(in_dealt_order(array("b", [30, 90, 35, 30, 25]),
+                                        [25, 30, 35]), [35, 30, 25])
+
+
+    def test_to_list(self):
+        """
+        Test listing every number left.
+
+        Assertion:
+        - The numbers are listed in ascending order with duplicates.
+        """
+        self.assertEqual(self.candidates.to_list(),
+                         [10, 30, 30, 35, 40, 50, 100])
+
+
+    def test_window_at_the_edge_of_the_range(self):
+        """
+        Test a window reaching past the ends of the range.
+
+        Assertion:
+        - Only numbers inside [0, 100] are listed.
+        """
+        candidates = CandidateSet([0, 5, 98, 100], 100)
+        self.assertEqual(candidates.shorter_list(), [98, 100])
+        candidates = CandidateSet([0, 5, 98, 100], 0)
+        self.assertEqual(candidates.shorter_list(), [0, 5])
+
+
+    def test_values_outside_range(self):
+        """
+        Test building a set from a number outside the range.
+
+        Assertion:
+        - A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            CandidateSet([101], 35)
+
+
+
+class TestSortedCandidateSet(unittest.TestCase):
+    """
+    A class for testing the SortedCandidateSet class.
+    """
+    def test_matches_candidate_set(self):
+        """
+        Test that both indexes agree on random lists and removals.
+
+        Assertion:
+        - Membership, counts, window counts and lists are the
+          same after every removal.
+        """
+        rng = random.Random(3)
+        for _ in range(50):
+            values = [rng.randint(0, 100) for _ in range(30)]
+            lucky_number = values[-1]
+            dense = CandidateSet(values, lucky_number)
+            sorted_set = SortedCandidateSet(values, lucky_number)
+            for guess in [rng.randint(-5, 105) for _ in range(40)]:
+                self.assertEqual(dense.remove(guess), sorted_set.remove(guess))
+                self.assertEqual(guess in dense, guess in sorted_set)
+                self.assertEqual(dense.count(guess), sorted_set.count(guess))
+                self.assertEqual(dense.window_count, sorted_set.window_count)
+                self.assertEqual(dense.shorter_list(), sorted_set.shorter_list())
+                self.assertEqual(dense.to_list(), sorted_set.to_list())
+                self.assertEqual(len(dense), len(sorted_set))
+
+
+    def test_window_below_zero_with_unsigned_values(self):
+        """
+        Test a window reaching below the smallest unsigned value.
+
+        Assertion:
+        - The shorter list holds the numbers near the lucky number.
+        """
+        candidates = SortedCandidateSet(array("I", [0, 3, 500, 3]), 3, 10)
+        self.assertEqual(candidates.shorter_list(), [0, 3, 3])
+        self.assertNotIn(-1, candidates)
+
+
+    def test_make_candidates(self):
+        """
+        Test picking an index for a config.
+
+        Assertions:
+        - The original game uses the bitmap index.
+        - Wide ranges and long lists use the sorted index.
+        """
+        self.assertIsInstance(make_candidates([1, 2], 2, GameConfig()),
+                              CandidateSet)
+        self.assertIsInstance(
+            make_candidates([1, 2], 2, GameConfig(high=10 ** 8)),
+            SortedCandidateSet)
+        self.assertIsInstance(
+            make_candidates([1, 2], 2, GameConfig(list_size=1000)),
+            SortedCandidateSet)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+import checkpoint
+from checkpoint import CheckpointError, capture, read_snapshot, restore
+from engine import GameEngine
+from rng import SessionRNG
+from session_store import SessionStore
+
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    A class for testing checkpoints of live sessions.
+    """
+    def setUp(self):
+        """
+        Fill a store with sessions in the middle of rounds.
+        """
+        self.store = SessionStore(capacity=8)
+        self.engine = GameEngine(rng=SessionRNG(9))
+        self.states = {}
+        for name in ("Ada", "Bo", "Cy"):
+            state, _ = self.engine.start()
+            for answer in (name, "19900101"):
+                state, _ = self.engine.step(state, answer)
+            slot = self.store.allocate()
+            self.store.save_state(slot, state)
+            self.states[slot] = state
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+
+    def test_full_and_deltas(self):
+        """
+        Test restoring a full checkpoint and the deltas after it.
+
+        Assertions:
+        - A delta holds only the slots changed since the last checkpoint.
+        - Restoring gives the sessions as at the last checkpoint,
+          released slots included, and the restored store can go on.
+        """
+        checkpoint.save(self.store, self.path("full"), full=True)
+        self.assertFalse(self.store.dirty.any())
+
+        slot = next(iter(self.states))
+        state = self.states[slot]
+        wrong = next(number for number in state.remaining
+                     if number != state.lucky_number)
+        state, _ = self.engine.step(state, str(wrong))
+        self.store.save_state(slot, state)
+        delta = checkpoint.save(self.store, self.path("delta1"))
+        self.assertEqual(delta.slots.tolist(), [slot])
+
+        self.store.release(2)
+        checkpoint.save(self.store, self.path("delta2"))
+
+        restored = restore([self.path("full"), self.path("delta1"),
+                            self.path("delta2")])
+        self.assertEqual(len(restored), 2)
+        self.assertEqual(restored.load_state(slot), state)
+        self.assertFalse(restored.in_use[2])
+        for name, field in self.store.fields().items():
+            np.testing.assert_array_equal(restored.fields()[name], field)
+        self.assertEqual(restored.allocate(), 2)
+        self.assertEqual(restored.checkpoint_sequence, 2)
+
+
+    def test_deltas_must_follow(self):
+        """
+        Test restoring checkpoints that do not follow each other.
+
+        Assertion:
+        - CheckpointError is raised for a missing full checkpoint
+          or a skipped delta.
+        """
+        checkpoint.save(self.store, self.path("full"), full=True)
+        checkpoint.save(self.store, self.path("delta1"))
+        checkpoint.save(self.store, self.path("delta2"))
+        with self.assertRaises(CheckpointError):
+            restore([self.path("delta1")])
+        with self.assertRaises(CheckpointError):
+            restore([self.path("full"), self.path("delta2")])
+
+
+    def test_damaged_files(self):
+        """
+        Test reading files that are not sound checkpoints.
+
+        Assertion:
+        - CheckpointError is raised for another file, another
+          version and a damaged body.
+        """
+        stream = io.BytesIO()
+        capture(self.store, full=True).write(stream)
+        data = stream.getvalue()
+        with self.assertRaises(CheckpointError):
+            read_snapshot(io.BytesIO(b"not a checkpoint"))
+        with self.assertRaises(CheckpointError):
+            read_snapshot(io.BytesIO(data[:4] + b"\x09\x00" + data[6:]))
+        with self.assertRaises(CheckpointError):
+            read_snapshot(io.BytesIO(data[:-1]))
+        self.assertEqual(len(read_snapshot(io.BytesIO(data)).slots), 3)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from candidates import make_candidates
+from deck import DeckExhausted, RoundDeck, build_deck
+from engine import GameEngine
+from game import Game, GameConfig
+from tournament import Tournament
+
+
+
+class TestRoundDeck(unittest.TestCase):
+    """
+    A class for testing decks of pre-generated rounds.
+    """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rounds.deck")
+        build_deck(self.path, 1000, seed=7, chunk_size=300)
+
+
+    def test_rounds(self):
+        """
+        Test the rounds of a deck.
+
+        Assertions:
+        - Every round's lucky number is the last number of its list.
+        - The precomputed window count is the one Game counts.
+        """
+        deck = RoundDeck(self.path)
+        self.assertEqual(len(deck), 1000)
+        config = GameConfig()
+        for index in (0, 299, 300, 999):
+            record = deck.records[index]
+            numbers = record["numbers"].tolist()
+            self.assertEqual(record["lucky_number"], numbers[-1])
+            candidates = make_candidates(numbers, numbers[-1], config)
+            self.assertEqual(record["window_count"], candidates.window_count)
+
+
+    def test_shards(self):
+        """
+        Test dealing a deck from several shards.
+
+        Assertions:
+        - The shards deal every round once and no round twice.
+        - A shard raises DeckExhausted when it has dealt every round.
+        - A cursor carries on where an earlier deck stopped.
+        """
+        dealt = []
+        for shard in range(3):
+            deck = RoundDeck(self.path, shard, 3)
+            while len(deck):
+                dealt.append(deck.draw())
+            with self.assertRaises(DeckExhausted):
+                deck.draw()
+        self.assertEqual(sorted(dealt), list(range(1000)))
+
+        deck = RoundDeck(self.path, 1, 3, cursor=10)
+        self.assertEqual(deck.draw(), 1 + 10 * 3)
+
+
+    def test_games_deal_from_a_deck(self):
+        """
+        Test a Game, a GameEngine and a Tournament dealing from a deck.
+
+        Assertions:
+        - Each round started is the next round of the deck.
+        - The engine and the tournament take the window count
+          from the deck.
+        - A game with other rules is refused.
+        """
+        deck = RoundDeck(self.path)
+        records = deck.records
+        game = Game(deck=deck)
+        game.reset_round()
+        self.assertEqual(list(game.lucky_list), records["numbers"][0].tolist())
+
+        engine = GameEngine(deck=deck)
+        state, _ = engine.start()
+        for answer in ("Ada", "19900101"):
+            state, _ = engine.step(state, answer)
+        self.assertEqual(list(state.lucky_list), records["numbers"][1].tolist())
+        self.assertEqual(state.window_count, records["window_count"][1])
+
+        tournament = Tournament(3, deck=deck)
+        self.assertEqual(list(tournament.lucky_list),
+                         records["numbers"][2].tolist())
+        self.assertEqual(tournament.window_counts.tolist(),
+                         [records["window_count"][2]] * 3)
+
+        with self.assertRaises(ValueError):
+            Game(GameConfig(list_size=5), deck=deck).reset_round()
+
+
+    def test_not_a_deck(self):
+        with open(self.path, "r+b") as deck:
+            deck.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            RoundDeck(self.path)
+        with self.assertRaises(ValueError):
+            RoundDeck(self.path, shard=2, shards=2)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+from engine import (GameEngine, GameState, NAME_TOO_LONG, PHASE_GUESS,
+                    PHASE_OVER, PHASE_PLAY_AGAIN, PROMPT_GUESS, show_effects)
+from game import Game
+from inputs import ScriptedInput
+from loadgen import play_scripted
+from renderer import EventRenderer, NullRenderer
+from replay import Transcript
+from rng import SessionRNG
+
+
+
+class TestGameEngine(unittest.TestCase):
+    """
+    A class for testing the step-based game engine.
+    """
+    def register(self, engine, birthdate="19900101"):
+        state, _ = engine.start()
+        state, _ = engine.step(state, "Ada")
+        return engine.step(state, birthdate)
+
+
+    def test_register_and_deal(self):
+        """
+        Test registering a player and dealing the first round.
+
+        Assertions:
+        - Invalid answers, and names too long to store, keep the
+          state and ask again.
+        - A valid birthdate deals a round and asks for a guess.
+        - Steps never change the state they are given.
+        """
+        engine = GameEngine(rng=SessionRNG(1))
+        state, effects = engine.start()
+        same, effects = engine.step(state, "A1")
+        self.assertIs(same, state)
+        self.assertEqual(effects[0], ("invalid_name",))
+        same, effects = engine.step(state, "A" * 33)
+        self.assertIs(same, state)
+        self.assertEqual(effects[0], NAME_TOO_LONG)
+
+        state, _ = engine.step(state, "Ada")
+        same, effects = engine.step(state, "1990")
+        self.assertIs(same, state)
+        self.assertEqual(effects[0][0], "invalid_birthdate")
+
+        dealt, effects = engine.step(state, "19900101")
+        self.assertEqual(state.lucky_list, ())
+        self.assertEqual(dealt.phase, PHASE_GUESS)
+        self.assertEqual(dealt.lucky_number, dealt.lucky_list[-1])
+        self.assertEqual(dealt.remaining, tuple(sorted(dealt.lucky_list)))
+        self.assertEqual(effects[-2], ("show_list", dealt.lucky_list))
+        self.assertIs(effects[-1], PROMPT_GUESS)
+
+
+    def test_guesses(self):
+        """
+        Test guessing in a dealt round.
+
+        Assertions:
+        - A wrong guess removes one copy and shows the shorter list,
+          in the order dealt.
+        - Invalid guesses count as tries.
+        - The lucky number wins the round.
+        """
+        engine = GameEngine(rng=SessionRNG(3))
+        state, _ = self.register(engine)
+        state = state._replace(lucky_list=(5, 12, 40, 12, 10),
+                               lucky_number=10, remaining=(5, 10, 12, 12, 40),
+                               window_count=4)
+
+        state, effects = engine.step(state, "12")
+        self.assertEqual(state.remaining, (5, 10, 12, 40))
+        self.assertEqual(state.window_count, 3)
+        self.assertEqual(effects[0], ("wrong_guess", 1, (5, 12, 10)))
+
+        state, effects = engine.step(state, "x")
+        self.assertEqual(effects[0], ("invalid_number",))
+        state, effects = engine.step(state, "99")
+        self.assertEqual(effects[0], ("invalid_choice",))
+        self.assertEqual(state.tries_count, 4)
+
+        state, effects = engine.step(state, "10")
+        self.assertEqual(state.phase, PHASE_PLAY_AGAIN)
+        self.assertEqual(effects[1], ("round_over", True, 10, 4))
+
+
+    def test_game_over_and_leave(self):
+        """
+        Test a round ending in GAME OVER and leaving the game.
+
+        Assertions:
+        - The round is over when fewer than two numbers are
+          left within the window.
+        - Answering no ends the session, and stepping an
+          ended session raises ValueError.
+        """
+        engine = GameEngine(rng=SessionRNG(3))
+        state, _ = self.register(engine)
+        state = state._replace(lucky_list=(50, 5, 55, 10), lucky_number=10,
+                               remaining=(5, 10, 50, 55), window_count=2)
+        state, effects = engine.step(state, "50")
+        self.assertEqual(state.window_count, 2)
+        self.assertEqual(effects[0], ("wrong_guess", 1, (5, 10)))
+
+        state, effects = engine.step(state, "5")
+        self.assertEqual(effects[:2], (("game_over",),
+                                       ("round_over", False, 10, 2)))
+
+        state, effects = engine.step(state, "n")
+        self.assertEqual(state.phase, PHASE_OVER)
+        self.assertIsNone(show_effects(effects, NullRenderer()))
+        with self.assertRaises(ValueError):
+            engine.step(state, "y")
+
+
+    def test_underage(self):
+        engine = GameEngine(year=2024)
+        state, effects = self.register(engine, "20100101")
+        self.assertEqual(state.phase, PHASE_OVER)
+        self.assertEqual(effects, (("underage",), ("exit",)))
+
+
+    def test_plays_like_game(self):
+        """
+        Test that the engine and Game play the same session the same.
+
+        Assertions:
+        - The same answers and the same seeded stream give the
+          same round results and show the same events.
+        """
+        engine = GameEngine(rng=SessionRNG(11))
+        shown = EventRenderer()
+        answers = ["Ada", "19900101"]
+        results = []
+        state, effects = self.register(engine)
+        show_effects(effects, shown)
+        # Each round: an invalid guess, one wrong guess and the lucky
+        # number, unless the wrong guess ended the round
+        for answer in ["x", "101", "wrong", "lucky", "y",
+                       "wrong", "lucky", "n"]:
+            if state.phase == PHASE_PLAY_AGAIN and answer == "lucky":
+                continue
+            if answer == "wrong":
+                answer = next(number for number in state.remaining
+                              if number != state.lucky_number)
+            elif answer == "lucky":
+                answer = state.lucky_number
+            answers.append(str(answer))
+            state, effects = engine.step(state, str(answer))
+            show_effects(effects, shown)
+            results.extend((effect[2], effect[3], effect[1])
+                           for effect in effects if effect[0] == "round_over")
+        self.assertEqual(state.phase, PHASE_OVER)
+
+        game_shown = EventRenderer()
+        game = Game(rng=SessionRNG(11), renderer=game_shown)
+        transcript = Transcript.for_game(game)
+        game.input_source = ScriptedInput(answers)
+        play_scripted(game)
+        self.assertEqual(results, transcript.results)
+
+        def normalized(events):
+            return [{name: list(value) if name == "numbers" else value
+                     for name, value in event.items()}
+                    for event in events if event["event"] != "message"]
+        self.assertEqual(normalized(shown.drain()),
+                         normalized(game_shown.drain()))
+
+
+    def test_states_are_cheap(self):
+        """
+        Test that states are plain immutable tuples.
+        """
+        state = GameState()
+        with self.assertRaises(AttributeError):
+            state.tries_count = 2
+        self.assertFalse(hasattr(state, "__dict__"))
+
+
+
+if __name__ == "__main__":
+    unittest.main()
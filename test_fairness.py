@@ -0,0 +1,121 @@
+import unittest
+import numpy as np
+from fairness import FairnessMonitor, chi_square_p_value
+from game import GameConfig
+from simulation import generate_rounds
+
+
+
+class TestFairnessMonitor(unittest.TestCase):
+    """
+    A class for testing the streaming fairness monitor.
+    """
+    def test_counts(self):
+        """
+        Test the counts of a few lists.
+
+        Assertions:
+        - Lists holding a number twice are counted once each.
+        - The lucky number's first position is counted.
+        - Lists can be given one at a time.
+        """
+        monitor = FairnessMonitor(GameConfig(list_size=4, low=1, high=4))
+        monitor.update([[1, 2, 3, 3], [1, 2, 3, 4]])
+        monitor.update([4, 2, 3, 4])
+        self.assertEqual(monitor.rounds, 3)
+        self.assertEqual(monitor.duplicate_lists, 2)
+        self.assertEqual(monitor.position_counts.tolist(), [1, 0, 1, 1])
+        self.assertEqual(monitor.value_counts.tolist(), [2, 3, 4, 3])
+        self.assertEqual(monitor.lucky_counts.tolist(), [0, 0, 1, 2])
+
+
+    def test_fair_generator(self):
+        """
+        Test lists from the game's generator.
+
+        Assertions:
+        - No window raises an alert.
+        - The duplicate rate is close to the fair rate.
+        """
+        monitor = FairnessMonitor(window_rounds=50_000)
+        rng = np.random.default_rng(3)
+        for _ in range(4):
+            monitor.update(generate_rounds(60_000, rng))
+        report = monitor.report()
+        self.assertEqual(report["rounds"], 240_000)
+        self.assertEqual(report["alerts"], 0)
+        for name in ("values", "lucky_numbers", "positions"):
+            self.assertGreater(report[name]["p_value"], 1e-4)
+        self.assertAlmostEqual(report["duplicates"]["rate"],
+                               report["duplicates"]["expected_rate"], places=2)
+
+
+    def test_drift_alerts(self):
+        """
+        Test a generator that starts drawing low numbers more often.
+
+        Assertions:
+        - The window with the drift alerts on the values.
+        - on_alert is called with the alert.
+        """
+        raised = []
+        monitor = FairnessMonitor(window_rounds=20_000, on_alert=raised.append)
+        rng = np.random.default_rng(4)
+        monitor.update(generate_rounds(20_000, rng))
+        self.assertEqual(len(monitor.alerts), 0)
+        skewed = generate_rounds(20_000, rng)
+        skewed[:, :5] //= 2
+        monitor.update(skewed)
+        self.assertIn("values", [alert["test"] for alert in raised])
+        self.assertEqual(list(monitor.alerts), raised)
+
+
+    def test_wide_range(self):
+        """
+        Test a range wider than the most bins.
+
+        Assertion:
+        - Values share bins and every value is counted.
+        """
+        config = GameConfig(list_size=3, low=-1000, high=1_000_000)
+        monitor = FairnessMonitor(config, max_bins=100)
+        lists = generate_rounds(1000, np.random.default_rng(5), 3, -1000,
+                                1_000_000)
+        monitor.update(lists)
+        self.assertEqual(monitor.bins, 100)
+        self.assertEqual(monitor.value_counts.sum(), 3000)
+
+
+    def test_range_not_divisible_by_bins(self):
+        """
+        Test a range that does not split evenly into bins.
+
+        Assertions:
+        - Values 0 to 4 in 2 bins hold 3 and 2 values, and one
+          of each matches the expected counts exactly.
+        - A fair generator over 0 to 9999 in 4096 bins raises
+          no alert, and its values look fair.
+        """
+        monitor = FairnessMonitor(GameConfig(list_size=1, high=4), max_bins=2)
+        monitor.update(np.arange(5)[:, np.newaxis])
+        self.assertEqual(monitor.value_counts.tolist(), [3, 2])
+        self.assertAlmostEqual(monitor.report()["values"]["chi_square"], 0)
+
+        config = GameConfig(high=9999)
+        monitor = FairnessMonitor(config, window_rounds=100_000)
+        monitor.update(generate_rounds(200_000, np.random.default_rng(4),
+                                       config.list_size, config.low,
+                                       config.high))
+        self.assertEqual(monitor.report()["alerts"], 0)
+        self.assertGreater(monitor.report()["values"]["p_value"], 1e-4)
+
+
+    def test_chi_square_p_value(self):
+        self.assertAlmostEqual(chi_square_p_value(100, 100), 0.48, places=2)
+        self.assertLess(chi_square_p_value(200, 100), 1e-6)
+        self.assertEqual(chi_square_p_value(5, 0), 1.0)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@ import sys
 from io import StringIO
 import unittest
 from unittest.mock import patch, Mock
-from game import Game
+from game import Game, GameConfig
 
 
 
@@ -199,6 +199,28 @@ class TestGame(unittest.TestCase):
         self.assertTrue(0 <= self.game.lucky_number <= 100)
 
 
+    def test_generate_two_rounds(self):
+        """
+        Test dealing two rounds with the generate methods.
+
+        The numbers still in play are indexed on the first guess of
+        a round, and the index must follow every newly dealt list.
+
+        Assertions:
+        - The lucky number of each round is a winning guess.
+        - A list set by hand is indexed again as well.
+        """
+        for _ in range(2):
+            self.game.generate_lucky_list()
+            self.game.generate_lucky_number()
+            self.game.player_input = self.game.lucky_number
+            self.assertEqual(self.game.check_guess(), "win")
+        self.game.lucky_list = [10, 20, 30]
+        self.game.lucky_number = 30
+        self.game.player_input = 30
+        self.assertEqual(self.game.check_guess(), "win")
+
+
     def test_handle_wrong_guess(self):
         """
         Test the handle_wrong_guess method of the Game class.
@@ -226,6 +248,79 @@ class TestGame(unittest.TestCase):
                 self.assertIn("Let's try again", output)
 
 
+    def test_shorter_list_keeps_dealt_order(self):
+        """
+        Test the order of the shorter list shown after a wrong guess.
+
+        Assertion:
+        - The numbers left are shown in the order they were dealt.
+        """
+        self.game.lucky_list = [50, 20, 45, 90, 40]
+        self.game.lucky_number = 40
+        self.game.player_input = 20
+        self.assertTrue(self.game.eliminate_guess())
+        self.assertEqual(list(self.game.shorter_lucky_list), [50, 45, 40])
+
+
+    def test_handle_wrong_guess_duplicates(self):
+        """
+        Test the handle_wrong_guess method with a number drawn twice.
+
+        Guessing a number that is in the list twice only removes
+        one copy, so the other copy stays in the shorter list.
+
+        Assertions:
+        - The first wrong guess leaves [30, 35] to pick from.
+        - Guessing the other 30 ends the round in GAME OVER.
+        """
+        self.game.lucky_list = [30, 90, 30, 35]
+        self.game.lucky_number = 35
+        self.game.player_input = 30
+        with StringIO() as mock_output:
+            with patch("sys.stdout", mock_output):
+                self.assertTrue(self.game.handle_wrong_guess())
+                self.assertIn("[30, 35]", mock_output.getvalue())
+                self.assertFalse(self.game.handle_wrong_guess())
+                self.assertIn("GAME OVER", mock_output.getvalue())
+
+
+    def test_configured_round(self):
+        """
+        Test a round with a configured list size and range.
+
+        Assertions:
+        - The lucky_list has the configured size, the lucky number last.
+        - Every number is within the configured range.
+        - The shorter list only keeps numbers within the window.
+        """
+        game = Game(GameConfig(list_size=100000, low=-10 ** 8,
+                               high=10 ** 8, window=10 ** 6))
+        game.reset_round()
+        self.assertEqual(len(game.lucky_list), 100000)
+        self.assertEqual(game.lucky_list[-1], game.lucky_number)
+        self.assertTrue(min(game.lucky_list) >= -10 ** 8)
+        self.assertTrue(max(game.lucky_list) <= 10 ** 8)
+
+        game.player_input = next(num for num in game.lucky_list
+                                 if num != game.lucky_number)
+        if game.eliminate_guess():
+            for num in game.shorter_lucky_list:
+                self.assertTrue(abs(num - game.lucky_number) <= 10 ** 6)
+
+
+    def test_invalid_config(self):
+        """
+        Test configs that do not make a playable game.
+
+        Assertion:
+        - Each one raises a ValueError.
+        """
+        for arguments in [{"list_size": 0}, {"low": 5, "high": 4},
+                          {"window": -1}]:
+            with self.assertRaises(ValueError):
+                GameConfig(**arguments)
+
+
     def test_congratulate_player(self):
         """
         Test the congratulate_player method of the Game class.
@@ -271,6 +366,62 @@ class TestGame(unittest.TestCase):
         self.assertEqual(captured_output.getvalue(), expected_output)
 
 
+    # Mock user input as "maybe" and then "Y"
+    @patch("builtins.input", side_effect=["maybe", " Y "])
+    def test_play_again_yes(self, mock_input):
+        """
+        Test the play_again method when the player wants another round.
+
+        Assertions:
+        - Method returns True once the player answers 'y'.
+        - The invalid answer is reported in the output.
+        """
+        with StringIO() as mock_output:
+            with patch("sys.stdout", mock_output):
+                self.assertTrue(self.game.play_again())
+                self.assertIn("Invalid input.", mock_output.getvalue())
+
+
+    # Mock user input as "n"
+    @patch("builtins.input", side_effect=["n"])
+    def test_play_again_no(self, mock_input):
+        """
+        Test the play_again method when the player wants to stop.
+
+        Assertion:
+        - Method returns False without exiting the game.
+        """
+        self.assertFalse(self.game.play_again())
+
+
+    def test_play_session_many_rounds(self):
+        """
+        Test that play_session can play more rounds than the
+        recursion limit allows nested calls.
+
+        Every round is won on the first try and the player
+        asks for another round until 3000 rounds are played.
+
+        Assertions:
+        - The session exits through exit_game after the last round.
+        - Every round was played.
+        """
+        rounds = []
+
+        def answer(prompt):
+            if prompt.startswith("Pick"):
+                rounds.append(self.game.lucky_number)
+                return str(self.game.lucky_number)
+            return "y" if len(rounds) < 3000 else "n"
+
+        with StringIO() as mock_output:
+            with patch("sys.stdout", mock_output), \
+                    patch("builtins.input", new=answer):
+                with self.assertRaises(SystemExit):
+                    self.game.play_session()
+        self.assertEqual(len(rounds), 3000)
+
+
 
 if __name__ == '__main__':
     unittest.main()
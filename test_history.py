@@ -0,0 +1,161 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from game import Game, GameConfig
+from history import RoundLog, HEADER_SIZE
+from rng import SessionRNG
+
+
+
+class TestRoundLog(unittest.TestCase):
+    """
+    A class for testing the RoundLog class.
+    """
+    def setUp(self):
+        """
+        This method creates a log file path for each test.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rounds.log")
+
+
+    def play(self, log, name, results, timestamp=0.0):
+        """
+        Log one round per result for a player.
+        """
+        game = Game(log.config, SessionRNG(1))
+        game.player_name = name
+        game.player_birthdate = "19900101"
+        for tries, won in results:
+            game.reset_round()
+            game.tries_count = tries
+            log.append(game, won, timestamp)
+            timestamp += 1.0
+        return timestamp
+
+
+    def test_batched_append(self):
+        """
+        Test that records are written in batches.
+
+        Assertions:
+        - Nothing is written before a batch is full.
+        - Every record is read back after a flush.
+        """
+        log = RoundLog(self.path, batch_size=4)
+        self.play(log, "Anna", [(1, True)] * 3)
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE)
+        self.play(log, "Anna", [(2, False)] * 3)
+        self.assertEqual(os.path.getsize(self.path),
+                         HEADER_SIZE + 4 * log.dtype.itemsize)
+        records = log.records()
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records["tries"].tolist(), [1, 1, 1, 2, 2, 2])
+        self.assertEqual(records["name"][0], b"Anna")
+        log.close()
+
+
+    def test_reopen(self):
+        """
+        Test reopening a log.
+
+        Assertions:
+        - The config and records are read from the file.
+        - A log with another config is refused.
+        """
+        config = GameConfig(list_size=5, high=1000)
+        with RoundLog(self.path, config) as log:
+            self.play(log, "Anna", [(1, True)] * 2)
+        log = RoundLog(self.path)
+        self.assertEqual(log.config.list_size, 5)
+        self.assertEqual(len(log.records()), 2)
+        self.assertEqual(len(log.records()["lucky_list"][0]), 5)
+        with self.assertRaises(ValueError):
+            RoundLog(self.path, GameConfig())
+
+
+    def test_index_and_leaderboards(self):
+        """
+        Test the player index and the leaderboards.
+
+        Assertions:
+        - A player's rounds are found in the order they were played.
+        - Rounds logged after an index build are added to it.
+        - Most wins and fewest tries rank the players.
+        """
+        log = RoundLog(self.path, batch_size=3)
+        now = self.play(log, "Anna", [(3, True), (2, False)])
+        now = self.play(log, "Bo", [(1, True), (4, True), (2, True)], now)
+        self.assertEqual(log.build_index(), 5)
+        now = self.play(log, "Anna", [(2, True)], now)
+        self.play(log, "Eva", [(5, False)], now)
+        self.assertEqual(log.build_index(), 7)
+
+        anna = log.player_rounds("Anna", "19900101")
+        self.assertEqual(anna["tries"].tolist(), [3, 2, 2])
+        self.assertEqual(anna["time"].tolist(), [0.0, 1.0, 5.0])
+        self.assertEqual(len(log.player_rounds("Nobody", "19900101")), 0)
+        self.assertEqual(log.most_wins(2), [("Bo", "19900101", 3),
+                                            ("Anna", "19900101", 2)])
+        self.assertEqual(log.fewest_tries(), [("Bo", "19900101", 1),
+                                              ("Anna", "19900101", 2)])
+        self.assertEqual(len(log.between(1.0, 4.0)), 3)
+        log.close()
+
+
+    def test_player_totals(self):
+        """
+        Test the per-player totals kept with the index.
+
+        Assertions:
+        - Each player's rounds, wins and best tries are added up
+          over several builds.
+        - Lost totals are counted again on the next build.
+        """
+        log = RoundLog(self.path, batch_size=2)
+        now = self.play(log, "Anna", [(3, True), (2, False)])
+        log.build_index()
+        self.play(log, "Anna", [(2, True), (1, False)], now)
+        log.build_index()
+        totals = log.players()
+        self.assertEqual(len(totals), 1)
+        self.assertEqual((int(totals["rounds"][0]), int(totals["wins"][0]),
+                          int(totals["best_tries"][0]),
+                          int(totals["first"][0])), (4, 2, 2, 0))
+
+        os.remove(log.players_path)
+        self.assertEqual(len(log.players()), 0)
+        log.build_index()
+        self.assertEqual(log.most_wins(), [("Anna", "19900101", 2)])
+        log.close()
+
+
+    def test_game_logs_rounds(self):
+        """
+        Test that a game with a history logs every round it plays.
+
+        Assertion:
+        - The round is logged with its outcome and tries.
+        """
+        log = RoundLog(self.path)
+        game = Game(rng=SessionRNG(2), history=log)
+        game.player_name = "Anna"
+        with patch("sys.stdout", new=io.StringIO()), \
+                patch("builtins.input",
+                      new=lambda prompt: str(game.lucky_number)):
+            game.start_new_round()
+        records = log.records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records["won"][0], 1)
+        self.assertEqual(records["tries"][0], 1)
+        self.assertEqual(records["lucky_list"][0].tolist(),
+                         game.lucky_list.tolist())
+        log.close()
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from game import Game
+from inputs import ScriptedInput, ScriptEnded
+from renderer import NullRenderer
+from rng import SessionRNG
+
+
+
+class TestScriptedInput(unittest.TestCase):
+    """
+    A class for testing the ScriptedInput class.
+    """
+    def test_answers_in_order(self):
+        """
+        Test reading a script.
+
+        Assertions:
+        - The answers are given in order, as strings.
+        - Asking past the end raises ScriptEnded.
+        - The time between answers is recorded if asked for.
+        """
+        latencies = []
+        source = ScriptedInput(["anna", 19900101], latencies)
+        self.assertEqual(source.read("Name: ", 0), "anna")
+        self.assertEqual(source.read("Birthdate: ", 1), "19900101")
+        with self.assertRaises(ScriptEnded):
+            source.read("Guess: ", 2)
+        self.assertEqual(source.answered, 2)
+        self.assertEqual(len(latencies), 2)
+
+
+    def test_game_reads_script(self):
+        """
+        Test a game played from scripts in many threads.
+
+        Assertions:
+        - Each game registers its own player.
+        - A script worked out from the game wins every round.
+        """
+        def play(name):
+            game = Game(rng=SessionRNG(len(name)), renderer=NullRenderer())
+
+            def script():
+                yield name
+                yield "19900101"
+                for _ in range(50):
+                    yield game.lucky_number
+
+            game.input_source = ScriptedInput(script())
+            game.get_player_name()
+            game.get_player_birthdate()
+            wins = [game.start_new_round() for _ in range(50)]
+            return game.player_name, all(wins)
+
+        names = ["anna", "bo", "eva", "li"] * 25
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(play, names))
+        self.assertEqual(results, [(name.capitalize(), True) for name in names])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from game import Game
+from inputs import ScriptedInput
+from loadgen import player_script, play_scripted, run_load
+from renderer import NullRenderer
+from replay import Transcript
+from rng import SessionRNG
+
+
+
+class TestLoadgen(unittest.TestCase):
+    """
+    A class for testing the scripted load generator.
+    """
+    def test_player_script(self):
+        """
+        Test that a scripted player plays every round to the end.
+
+        Assertions:
+        - The session registers, plays three rounds and leaves.
+        - Every round gets one wrong guess, and is won unless
+          the wrong guess ended it.
+        """
+        game = Game(rng=SessionRNG(4), renderer=NullRenderer())
+        transcript = Transcript.for_game(game)
+        game.input_source = ScriptedInput(player_script(game, rounds=3))
+        answers = play_scripted(game)
+        self.assertEqual(len(transcript.results), 3)
+        wins = sum(won for _, _, won in transcript.results)
+        self.assertEqual(answers, 2 + 3 * 2 + wins)
+
+
+    def test_run_load(self):
+        """
+        Test a small load run over several threads.
+
+        Assertion:
+        - Every session is played and the report is filled in.
+        """
+        report = run_load(200, rounds=2, threads=4, seed=1)
+        self.assertEqual(report["sessions"], 200)
+        self.assertGreater(report["answers"], 200 * 6)
+        self.assertGreater(report["sessions_per_second"], 0)
+        self.assertLessEqual(report["session_p50_ms"], report["session_p99_ms"])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
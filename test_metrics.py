@@ -0,0 +1,130 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+from game import Game
+from metrics import (GameMetrics, ROUNDS_STARTED, ROUNDS_WON, GAME_OVERS,
+                     GUESSES, WRONG_GUESSES, INVALID_GUESSES, PLAYERS_ELIGIBLE,
+                     PLAY_AGAIN_NO, PROMPT_GUESS, TIME_BUCKETS)
+from rng import SessionRNG
+
+
+
+class TestGameMetrics(unittest.TestCase):
+    """
+    A class for testing the GameMetrics class.
+    """
+    def test_round_over(self):
+        """
+        Test recording finished rounds.
+
+        Assertions:
+        - Wins and game overs are counted apart.
+        - Rounds longer than max_tries land in the last bucket.
+        """
+        metrics = GameMetrics(max_tries=4)
+        metrics.round_over(True, 1)
+        metrics.round_over(False, 3)
+        metrics.round_over(True, 9)
+        self.assertEqual(metrics.counters[ROUNDS_WON], 2)
+        self.assertEqual(metrics.counters[GAME_OVERS], 1)
+        self.assertEqual(metrics.tries_histogram.tolist(), [0, 1, 0, 1, 1])
+
+
+    def test_time_prompt(self):
+        """
+        Test recording prompt times.
+
+        Assertions:
+        - The count and total are kept per prompt.
+        - Each time lands in its power of two bucket.
+        """
+        metrics = GameMetrics()
+        metrics.time_prompt(PROMPT_GUESS, 1000)
+        metrics.time_prompt(PROMPT_GUESS, 1023)
+        start = PROMPT_GUESS * TIME_BUCKETS
+        self.assertEqual(metrics.prompt_counts[PROMPT_GUESS], 2)
+        self.assertEqual(metrics.prompt_totals[PROMPT_GUESS], 2023)
+        self.assertEqual(metrics.prompt_buckets[start + 10], 2)
+
+
+    def test_merge_and_export(self):
+        """
+        Test merging metrics and exporting a snapshot.
+
+        Assertions:
+        - Merging adds every buffer.
+        - The JSON export holds the counters by name.
+        """
+        first = GameMetrics()
+        second = GameMetrics()
+        first.count(GUESSES)
+        second.count(GUESSES)
+        second.round_over(True, 2)
+        first.merge(second)
+        snapshot = json.loads(first.to_json())
+        self.assertEqual(snapshot["counters"]["guesses"], 2)
+        self.assertEqual(snapshot["counters"]["rounds_won"], 1)
+        self.assertEqual(snapshot["tries_histogram"][2], 1)
+        self.assertEqual(len(snapshot["prompts"]["guess"]["buckets_ns_log2"]),
+                         TIME_BUCKETS)
+
+
+
+class TestGameInstrumentation(unittest.TestCase):
+    """
+    A class for testing the metrics recorded by Game.
+    """
+    def test_session_events(self):
+        """
+        Test the events of a scripted session.
+
+        Assertions:
+        - Rounds, guesses and outcomes are counted.
+        - Every answer to a guess prompt is timed.
+        """
+        metrics = GameMetrics()
+        game = Game(rng=SessionRNG(3), metrics=metrics)
+        game.player_age = 30
+        game.reset_round()
+        wrong = next(number for number in game.lucky_list
+                     if number != game.lucky_number)
+        answers = iter(["x", "1000", str(wrong), str(game.lucky_number)])
+
+        with patch("sys.stdout", new=io.StringIO()):
+            game.check_age_eligibility()
+            with patch("builtins.input", new=lambda prompt: next(answers)):
+                game.ask_for_player_input()
+            with patch("builtins.input", return_value="n"):
+                game.play_again()
+
+        self.assertEqual(metrics.counters[ROUNDS_STARTED], 1)
+        self.assertEqual(metrics.counters[PLAYERS_ELIGIBLE], 1)
+        self.assertEqual(metrics.counters[GUESSES], 3)
+        self.assertEqual(metrics.counters[INVALID_GUESSES], 2)
+        self.assertEqual(metrics.counters[WRONG_GUESSES], 1)
+        self.assertEqual(metrics.counters[ROUNDS_WON], 1)
+        self.assertEqual(metrics.tries_histogram[4], 1)
+        self.assertEqual(metrics.counters[PLAY_AGAIN_NO], 1)
+        self.assertEqual(metrics.prompt_counts[PROMPT_GUESS],
+                         game.tries_count)
+
+
+    def test_disabled(self):
+        """
+        Test that a game without metrics still plays.
+
+        Assertion:
+        - The game has no metrics and the round is won.
+        """
+        game = Game(rng=SessionRNG(3))
+        game.reset_round()
+        with patch("sys.stdout", new=io.StringIO()), \
+                patch("builtins.input", return_value=str(game.lucky_number)):
+            self.assertTrue(game.ask_for_player_input())
+        self.assertIsNone(game.metrics)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
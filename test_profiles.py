@@ -0,0 +1,99 @@
+import unittest
+from metrics import (GameMetrics, PROFILE_EVICTIONS, PROFILE_HITS,
+                     PROFILE_INVALID)
+from profiles import ProfileCache
+
+
+
+class TestProfileCache(unittest.TestCase):
+    """
+    A class for testing the cache of returning players' profiles.
+    """
+    def test_lookup(self):
+        """
+        Test looking up a player twice.
+
+        Assertions:
+        - The profile holds the parsed birthdate, age and eligibility.
+        - The second lookup, with the name in other capitals, is a hit.
+        """
+        cache = ProfileCache()
+        profile = cache.lookup("gullbritt", "19901231", year=2024)
+        self.assertEqual((profile.name, profile.birth_year, profile.birth_month,
+                          profile.birth_day), ("Gullbritt", 1990, 12, 31))
+        self.assertEqual(profile.age, 34)
+        self.assertTrue(profile.eligible)
+
+        self.assertIs(cache.lookup("GULLBRITT", "19901231", year=2024), profile)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+
+    def test_invalid_answers_are_not_kept(self):
+        """
+        Test looking up invalid names and birthdates.
+
+        Assertions:
+        - Invalid answers are not kept.
+        - They are counted apart, not as misses, so they
+          do not lower the hit rate.
+        """
+        metrics = GameMetrics()
+        cache = ProfileCache(metrics=metrics)
+        cache.lookup("Ada", "19901231")
+        cache.lookup("Ada", "19901231")
+        self.assertIsNone(cache.lookup("R2D2", "19901231"))
+        self.assertIsNone(cache.lookup("Ada", "1990"))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual((cache.misses, cache.invalid), (1, 2))
+        self.assertEqual(cache.hit_rate, 0.5)
+        self.assertEqual(metrics.counters[PROFILE_INVALID], 2)
+
+
+    def test_expiry(self):
+        """
+        Test a profile looked up again in a later year.
+
+        Assertions:
+        - The age and eligibility are counted again.
+        - The lookup counts as expired, not as a hit.
+        """
+        cache = ProfileCache()
+        profile = cache.lookup("Kid", "20070101", year=2024)
+        self.assertFalse(profile.eligible)
+        profile = cache.lookup("Kid", "20070101", year=2025)
+        self.assertEqual(profile.age, 18)
+        self.assertTrue(profile.eligible)
+        self.assertEqual((cache.hits, cache.expired), (0, 1))
+
+
+    def test_eviction(self):
+        """
+        Test a full cache.
+
+        Assertions:
+        - The least recently used profile is dropped.
+        - Hits and evictions are counted in the metrics.
+        """
+        metrics = GameMetrics()
+        cache = ProfileCache(max_size=2, metrics=metrics)
+        cache.lookup("Ada", "19900101", year=2024)
+        cache.lookup("Bo", "19900101", year=2024)
+        cache.lookup("Ada", "19900101", year=2024)
+        cache.lookup("Cy", "19900101", year=2024)
+        self.assertEqual(len(cache), 2)
+        cache.lookup("Ada", "19900101", year=2024)
+        cache.lookup("Bo", "19900101", year=2024)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(metrics.counters[PROFILE_HITS], 2)
+        self.assertEqual(metrics.counters[PROFILE_EVICTIONS], 2)
+
+
+    def test_size(self):
+        with self.assertRaises(ValueError):
+            ProfileCache(max_size=0)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from game import Game
+from registration import (validate_chunk, register_players, read_chunks,
+                          REJECT_NAME, REJECT_FORMAT, REJECT_DATE, REJECT_AGE,
+                          REJECT_NAME_LENGTH, REJECT_RECORD)
+
+
+
+class TestRegistration(unittest.TestCase):
+    """
+    A class for testing the bulk registration of players.
+    """
+    def setUp(self):
+        """
+        This method creates a directory for the files of each test.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+
+    def test_validate_chunk_matches_game(self):
+        """
+        Test that records are validated as in Game.
+
+        Assertions:
+        - Each record gets the reason matching the Game validators.
+        - Ages are counted from the birth year.
+        """
+        names = ["gullbritt", "Gull3", "", "anna", "bo", "eva", "li"]
+        birthdates = ["19900101", "19900101", "19900101", "1990011",
+                      "18990101", "19901301", "20100101"]
+        capitalized, ages, reasons = validate_chunk(names, birthdates, 2024)
+
+        self.assertEqual(reasons.tolist(),
+                         ["", REJECT_NAME, REJECT_NAME, REJECT_FORMAT,
+                          REJECT_DATE, REJECT_DATE, REJECT_AGE])
+        self.assertEqual(capitalized[0], "Gullbritt")
+        self.assertEqual(ages[0], 34)
+        for name, birthdate, reason in zip(names, birthdates, reasons):
+            if reason == REJECT_NAME:
+                self.assertIsNone(Game.validate_player_name(name))
+            elif reason in (REJECT_FORMAT, REJECT_DATE):
+                self.assertIsNotNone(Game.validate_birthdate(birthdate))
+
+
+    def test_overlong_fields(self):
+        """
+        Test that overlong fields are rejected without widening the chunk.
+
+        Assertions:
+        - A name over 32 bytes and a birthdate over 8 characters
+          are rejected, and a 32-byte name is not.
+        - The arrays keep their fixed width.
+        """
+        names = ["a" * 32, "b" * 10_000, "\u00e9" * 17, "anna"]
+        birthdates = ["19900101", "19900101", "19900101", "1" * 10_000]
+        capitalized, _, reasons = validate_chunk(names, birthdates, 2024)
+        self.assertEqual(reasons.tolist(),
+                         ["", REJECT_NAME_LENGTH, REJECT_NAME_LENGTH,
+                          REJECT_FORMAT])
+        self.assertEqual(capitalized.dtype.itemsize, 33 * 4)
+
+
+    def test_register_csv_in_chunks(self):
+        """
+        Test registering a CSV file over several chunks.
+
+        Assertions:
+        - The counts add up over every chunk.
+        - Eligible and rejected records go to their own files.
+        """
+        source = self.path("players.csv")
+        with open(source, "w", newline="") as players:
+            writer = csv.writer(players)
+            writer.writerow(["name", "birthdate"])
+            for index in range(25):
+                writer.writerow(["anna" if index % 5 else "4nna", "19900101"])
+
+        summary = register_players(source, self.path("eligible.csv"),
+                                   self.path("rejected.csv"), chunk_size=4,
+                                   reference_date=date(2024, 6, 1))
+
+        self.assertEqual(summary.read, 25)
+        self.assertEqual(summary.eligible, 20)
+        self.assertEqual(summary.rejected[REJECT_NAME], 5)
+        with open(self.path("eligible.csv")) as eligible:
+            rows = list(csv.reader(eligible))
+        self.assertEqual(rows[1], ["Anna", "19900101", "34"])
+        self.assertEqual(len(rows), 21)
+        with open(self.path("rejected.csv")) as rejected:
+            rows = list(csv.reader(rejected))
+        self.assertEqual(rows[1], ["4nna", "19900101", REJECT_NAME])
+
+
+    def test_read_jsonl(self):
+        """
+        Test reading a JSONL file.
+
+        Assertions:
+        - Numbers are read as strings and blank lines are skipped.
+        - Empty objects, lines that are not objects and broken
+          JSON go to the rejected output with a reason.
+        """
+        source = self.path("players.jsonl")
+        with open(source, "w") as players:
+            players.write(json.dumps({"name": "bo", "birthdate": 19800101}))
+            players.write("\n\n{}\n[1,2]\n{\"name\": \n")
+        chunks = list(read_chunks(source))
+        self.assertEqual(chunks, [(["bo", "", "[1,2]", '{"name":'],
+                                   ["19800101", "", None, None])])
+
+        summary = register_players(source, self.path("eligible.csv"),
+                                   self.path("rejected.csv"),
+                                   reference_date=date(2024, 6, 1))
+        self.assertEqual(summary.eligible, 1)
+        self.assertEqual(summary.rejected[REJECT_NAME], 1)
+        self.assertEqual(summary.rejected[REJECT_RECORD], 2)
+        with open(self.path("rejected.csv")) as rejected:
+            rows = list(csv.reader(rejected))
+        self.assertEqual(rows[1:], [["", "", REJECT_NAME],
+                                    ["[1,2]", "", REJECT_RECORD],
+                                    ['{"name":', "", REJECT_RECORD]])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
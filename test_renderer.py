@@ -0,0 +1,117 @@
+import io
+import unittest
+from array import array
+from unittest.mock import patch
+from game import Game
+from renderer import (TerminalRenderer, NullRenderer, EventRenderer,
+                      format_numbers)
+from rng import SessionRNG
+
+
+
+class CountingStream(io.StringIO):
+    """
+    A stream counting how many times it is written to.
+    """
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+
+class TestRenderer(unittest.TestCase):
+    """
+    A class for testing the renderers.
+    """
+    def test_format_numbers(self):
+        """
+        Test formatting short and long lists.
+
+        Assertions:
+        - A short list is shown like print shows it.
+        - A long list shows its ends and its length.
+        """
+        self.assertEqual(format_numbers(array("B", [1, 2, 3]), 3), "[1, 2, 3]")
+        self.assertEqual(format_numbers(list(range(10)), 4),
+                         "[0, 1, ..., 8, 9] (10 numbers)")
+        self.assertEqual(format_numbers(list(range(10)), 3),
+                         "[0, ..., 8, 9] (10 numbers)")
+
+
+    def test_terminal_buffers_until_flush(self):
+        """
+        Test that the terminal renderer writes once per flush.
+
+        Assertions:
+        - Nothing is written before the flush.
+        - The messages are written in one write, each on its own line.
+        """
+        stream = CountingStream()
+        renderer = TerminalRenderer(stream)
+        renderer.wrong_guess(2, array("B", [30, 35]))
+        renderer.game_over()
+        self.assertEqual(stream.writes, 0)
+        renderer.flush()
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue(),
+                         "Wrong number. This was your 2 try.\n"
+                         "Let's try again from a shorter list.\n"
+                         "[30, 35]\nGAME OVER\n")
+
+
+    def test_game_flushes_before_prompt(self):
+        """
+        Test that a buffered game shows its messages before asking.
+
+        Assertion:
+        - The list is written before the player is asked to guess.
+        """
+        stream = io.StringIO()
+        game = Game(rng=SessionRNG(1), renderer=TerminalRenderer(stream))
+        shown = []
+
+        def answer(prompt):
+            shown.append(stream.getvalue())
+            return str(game.lucky_number)
+
+        with patch("builtins.input", new=answer):
+            game.start_new_round()
+        self.assertEqual(shown[0], f"{game.lucky_list.tolist()}\n")
+        self.assertNotIn("Congratulations!", shown[0])
+
+
+    def test_events_and_null(self):
+        """
+        Test the event and null renderers on a round.
+
+        Assertions:
+        - The events of a round come out in order with their fields.
+        - A game with a null renderer plays without showing anything.
+        """
+        renderer = EventRenderer()
+        game = Game(rng=SessionRNG(1), renderer=renderer)
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            game.reset_round()
+            game.renderer.show_list(game.lucky_list)
+            game.player_input = game.lucky_number
+            game.congratulate_player(1)
+        events = renderer.drain()
+        self.assertEqual([event["event"] for event in events],
+                         ["show_list", "congratulate"])
+        self.assertIs(events[0]["numbers"], game.lucky_list)
+        self.assertEqual(events[1]["tries_count"], 1)
+        self.assertEqual(output.getvalue(), "")
+
+        game = Game(rng=SessionRNG(1), renderer=NullRenderer())
+        with patch("builtins.input",
+                   new=lambda prompt: str(game.lucky_number)), \
+                patch("sys.stdout", new=io.StringIO()) as output:
+            self.assertTrue(game.start_new_round())
+        self.assertEqual(output.getvalue(), "")
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from game import Game, GameConfig
+from renderer import EventRenderer
+from replay import Transcript, TranscriptLog, replay, replay_log
+from rng import SessionRNG
+
+
+
+def record_session(seed, config=None):
+    """
+    Play a session like main.py with scripted answers
+    and return its transcript.
+    """
+    game = Game(config, SessionRNG(seed))
+    transcript = Transcript.for_game(game)
+    rounds = []
+
+    def answer(prompt):
+        if prompt.startswith("Enter your first name"):
+            # One invalid name first
+            return "4nna" if not transcript.inputs else "anna"
+        if prompt.startswith("Enter your birthdate"):
+            return "19900101"
+        if prompt.startswith("Do you want"):
+            rounds.append(None)
+            return "y" if len(rounds) < 5 else "n"
+        # Guess the smallest number still in play, once
+        # the invalid guess of each round is made
+        if game.tries_count == 1 and transcript.inputs[-1] != "x":
+            return "x"
+        return str(min(game.round_candidates().to_list()))
+
+    with patch("builtins.input", new=answer), \
+            patch("sys.stdout", new=io.StringIO()):
+        try:
+            game.get_player_name()
+            game.get_player_birthdate()
+            game.calculate_player_age()
+            game.check_age_eligibility()
+            game.play_session()
+        except SystemExit:
+            pass
+    return transcript
+
+
+
+class TestReplay(unittest.TestCase):
+    """
+    A class for testing session transcripts and their replay.
+    """
+    def test_record_and_replay(self):
+        """
+        Test replaying a recorded session.
+
+        Assertions:
+        - Every answer and round is recorded with a time.
+        - The transcript survives JSON.
+        - The replay gives the same rounds.
+        """
+        transcript = record_session(7)
+        self.assertEqual(len(transcript.results), 5)
+        self.assertEqual(len(transcript.inputs), len(transcript.offsets))
+        recorded = Transcript.from_json(transcript.to_json())
+        self.assertEqual(recorded.results, transcript.results)
+        self.assertEqual(replay(recorded), transcript.results)
+
+
+    def test_replay_ignores_todays_date(self):
+        """
+        Test that ages are counted to the year the session was played.
+
+        Assertion:
+        - A player who was 17 when the session was recorded
+          is still turned away in the replay.
+        """
+        recorded = Transcript(SessionRNG(1).key, started=0.0)
+        recorded.inputs = ["anna", "19530101", "5"]
+        renderer = EventRenderer()
+        self.assertEqual(replay(recorded, renderer), [])
+        self.assertEqual(renderer.drain()[-1]["event"], "underage")
+
+
+    def test_replay_log(self):
+        """
+        Test replaying a log of sessions and finding a changed one.
+
+        Assertions:
+        - Every session is replayed.
+        - Only the changed session is reported, by line number.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "transcripts.jsonl")
+        log = TranscriptLog(path)
+        for seed in range(5):
+            transcript = record_session(seed, GameConfig(list_size=20))
+            if seed == 3:
+                lucky_number, tries, won = transcript.results[0]
+                transcript.results[0] = (lucky_number, tries + 1, won)
+            log.write(transcript)
+        log.close()
+
+        sessions, mismatches = replay_log(path, workers=1, batch_size=2)
+        self.assertEqual(sessions, 5)
+        self.assertEqual([mismatch[0] for mismatch in mismatches], [4])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
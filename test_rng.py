@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from game import Game, GameConfig
+from rng import SessionRNG
+
+
+
+def deal_round(_):
+    """
+    Deal a round from the shared stream, in a worker process.
+    """
+    game = Game()
+    game.reset_round()
+    return game.lucky_list.tolist()
+
+
+
+class TestSessionRNG(unittest.TestCase):
+    """
+    A class for testing the SessionRNG class.
+    """
+    def test_seeded_streams_repeat(self):
+        """
+        Test that the same seed gives the same numbers.
+
+        Assertion:
+        - Two streams with the same seed draw the same list.
+        """
+        config = GameConfig()
+        first = SessionRNG(5).draw_numbers(10, config)
+        second = SessionRNG(5).draw_numbers(10, config)
+        self.assertEqual(first.tolist(), second.tolist())
+
+
+    def test_spawned_streams_differ(self):
+        """
+        Test that spawned streams are independent.
+
+        Assertion:
+        - Sibling streams draw different numbers.
+        """
+        config = GameConfig(high=10 ** 9)
+        children = SessionRNG(5).spawn(3)
+        draws = {tuple(child.draw_numbers(10, config)) for child in children}
+        self.assertEqual(len(draws), 3)
+
+
+    def test_from_key(self):
+        """
+        Test replaying a stream from its key.
+
+        Assertions:
+        - A stream recreated from a spawned stream's key draws
+          the same numbers.
+        - The key survives pickling, for sending it to a worker.
+        """
+        config = GameConfig()
+        child = SessionRNG(5).spawn()
+        key = pickle.loads(pickle.dumps(child.key))
+        replayed = SessionRNG.from_key(key)
+        self.assertEqual(child.draw_numbers(20, config).tolist(),
+                         replayed.draw_numbers(20, config).tolist())
+
+
+    def test_draws_in_range(self):
+        """
+        Test drawing numbers in a configured range.
+
+        Assertion:
+        - Every number is within the range.
+        """
+        config = GameConfig(low=-5, high=5)
+        numbers = SessionRNG(1).draw_numbers(1000, config)
+        self.assertTrue(numbers.min() >= -5)
+        self.assertTrue(numbers.max() <= 5)
+        self.assertTrue(-5 <= SessionRNG(1).draw_number(config) <= 5)
+
+
+    def test_games_in_threads(self):
+        """
+        Test dealing rounds from many threads at once.
+
+        Assertion:
+        - Each game deals the same rounds as it does on its own.
+        """
+        def deal(key):
+            game = Game(rng=SessionRNG.from_key(key))
+            rounds = []
+            for _ in range(200):
+                game.reset_round()
+                rounds.append(game.lucky_list.tolist())
+            return rounds
+
+        keys = [child.key for child in SessionRNG(9).spawn(8)]
+        expected = [deal(key) for key in keys]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            self.assertEqual(list(pool.map(deal, keys)), expected)
+
+
+    def test_game_round_uses_its_stream(self):
+        """
+        Test that a seeded game deals a reproducible round.
+
+        Assertions:
+        - Two games with the same seed deal the same round.
+        - The lucky number is the last number of the list.
+        """
+        first = Game(rng=SessionRNG(11))
+        second = Game(rng=SessionRNG(11))
+        first.reset_round()
+        second.reset_round()
+        self.assertEqual(first.lucky_list, second.lucky_list)
+        self.assertEqual(first.lucky_number, first.lucky_list[-1])
+
+
+    @unittest.skipUnless(hasattr(os, "register_at_fork"), "needs fork")
+    def test_forked_processes_deal_their_own_rounds(self):
+        """
+        Test dealing from the shared stream in forked processes.
+
+        Assertion:
+        - Processes forked after the parent dealt a round
+          do not deal the same rounds.
+        """
+        deal_round(None)
+        with multiprocessing.get_context("fork").Pool(3) as pool:
+            rounds = pool.map(deal_round, range(3), chunksize=1)
+        self.assertEqual(len({tuple(numbers) for numbers in rounds}), 3)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+import ast
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from metrics import GameMetrics
+from profiles import ProfileCache
+from replay import Transcript, TranscriptLog, replay
+from server import GameServer
+
+
+
+class Client:
+    """
+    A minimal line protocol client for talking to the server in tests.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.lines = []
+
+
+    async def read_until_prompt(self):
+        """
+        Read lines until the server asks a question.
+
+        Return:
+            string:
+                The prompt, or None if the server closed the connection.
+        """
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return None
+            text = line.decode().rstrip("\n")
+            self.lines.append(text)
+            # Every prompt ends with a colon and a space
+            if text.endswith(": "):
+                return text
+
+
+    async def answer(self, text):
+        self.writer.write((text + "\n").encode())
+        await self.writer.drain()
+
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    """
+    A class for testing the asyncio game server.
+    """
+    async def asyncSetUp(self):
+        """
+        Start a server on a free port for each test.
+        """
+        self.server = GameServer(port=0, verbose=False)
+        self.port = await self.server.start()
+
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        return Client(reader, writer)
+
+
+    async def play_one_round(self, client, name="Gullbritt"):
+        """
+        Register a player, win one round and leave.
+
+        Return:
+            list:
+                Every line the client received.
+        """
+        await client.read_until_prompt()
+        await client.answer(name)
+        await client.read_until_prompt()
+        await client.answer("19901231")
+        await client.read_until_prompt()
+        # The lucky number is the last number of the list shown
+        lucky_list = next(ast.literal_eval(line) for line in client.lines
+                          if line.startswith("["))
+        await client.answer(str(lucky_list[-1]))
+        await client.read_until_prompt()
+        await client.answer("n")
+        # Read the goodbye until the server closes the connection
+        self.assertIsNone(await client.read_until_prompt())
+        return client.lines
+
+
+    async def test_full_session(self):
+        """
+        Test a session that wins one round and leaves the game.
+
+        Assertions:
+        - The player is congratulated and told goodbye.
+        - The server stays up and reports the session's latency.
+        """
+        client = await self.connect()
+        lines = await self.play_one_round(client)
+        self.assertIn("Congratulations!", lines)
+        self.assertIn("Thank you for playing! Goodbye.", lines)
+
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.server.active_sessions, 0)
+        report = self.server.reports[-1]
+        self.assertEqual(report["player"], "Gullbritt")
+        self.assertEqual(report["rounds"], 1)
+        self.assertEqual(report["answers"], 4)
+
+
+    async def test_transcripts_replay(self):
+        """
+        Test that a recorded session replays the same with Game.
+
+        Assertions:
+        - The session's answers and round are recorded.
+        - Replaying the transcript gives the same round result.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "transcripts.jsonl")
+        self.server.transcripts = TranscriptLog(path)
+        await self.play_one_round(await self.connect())
+        await asyncio.sleep(0.01)
+        self.server.transcripts.close()
+
+        with open(path) as log:
+            recorded = Transcript.from_json(log.readline())
+        self.assertEqual(recorded.inputs[:2], ["Gullbritt", "19901231"])
+        self.assertEqual(len(recorded.results), 1)
+        self.assertEqual(replay(recorded), recorded.results)
+
+
+    async def test_metrics(self):
+        """
+        Test that sessions record the same metrics as Game.
+
+        Assertions:
+        - Every prompt of the session is timed.
+        - The eligibility and play again answers are counted.
+        - The exported snapshot holds the counters.
+        """
+        self.server.metrics = GameMetrics()
+        await self.play_one_round(await self.connect())
+        await asyncio.sleep(0.01)
+
+        snapshot = self.server.metrics.snapshot()
+        self.assertEqual(list(self.server.metrics.prompt_counts), [1, 1, 1, 1])
+        self.assertEqual(snapshot["counters"]["players_eligible"], 1)
+        self.assertEqual(snapshot["counters"]["rounds_won"], 1)
+        self.assertEqual(snapshot["counters"]["play_again_no"], 1)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "metrics.json")
+        self.server.export_metrics(path)
+        with open(path) as exported:
+            self.assertEqual(json.load(exported)["counters"],
+                             snapshot["counters"])
+
+
+    async def test_returning_player_profile(self):
+        """
+        Test a player coming back with a profile cache.
+
+        Assertions:
+        - The second session finds the player's profile.
+        - Both sessions play their round.
+        """
+        self.server.profiles = ProfileCache()
+        for _ in range(2):
+            lines = await self.play_one_round(await self.connect())
+            self.assertIn("Congratulations!", lines)
+        self.assertEqual(self.server.profiles.hits, 1)
+        self.assertEqual(self.server.reports[-1]["player"], "Gullbritt")
+
+
+    async def test_underage_player_ends_only_their_session(self):
+        """
+        Test that an underage player is turned away
+        without stopping the server.
+
+        Assertions:
+        - The underage player is told they can not play.
+        - Another player can still play afterwards.
+        """
+        client = await self.connect()
+        await client.read_until_prompt()
+        await client.answer("Kid")
+        await client.read_until_prompt()
+        await client.answer("20200101")
+        self.assertIsNone(await client.read_until_prompt())
+        self.assertIn("You must be 18 years or older to play this game.",
+                      client.lines)
+
+        lines = await self.play_one_round(await self.connect())
+        self.assertIn("Thank you for playing! Goodbye.", lines)
+
+
+    async def test_disconnect_mid_session(self):
+        """
+        Test that a client disconnecting in the middle of a
+        session only ends that session.
+
+        Assertions:
+        - The session is reported as finished.
+        - No sessions are left active.
+        """
+        client = await self.connect()
+        await client.read_until_prompt()
+        await client.answer("Gullbritt")
+        await client.read_until_prompt()
+        client.writer.close()
+        await client.writer.wait_closed()
+
+        for _ in range(100):
+            if self.server.active_sessions == 0:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.server.active_sessions, 0)
+        self.assertEqual(self.server.reports[-1]["player"], "Gullbritt")
+
+
+    async def test_concurrent_sessions(self):
+        """
+        Test many players playing at the same time.
+
+        Assertions:
+        - Every player finishes their session.
+        """
+        clients = [await self.connect() for _ in range(200)]
+        results = await asyncio.gather(
+            *(self.play_one_round(client) for client in clients))
+        for lines in results:
+            self.assertIn("Thank you for playing! Goodbye.", lines)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
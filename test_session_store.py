@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+from engine import GameEngine
+from game import Game
+from history import RoundLog
+from rng import SessionRNG
+from session_store import SessionStore
+
+
+
+class TestSessionStore(unittest.TestCase):
+    """
+    A class for testing the SessionStore class.
+    """
+    def setUp(self):
+        """
+        This method sets up a small store and a game in the middle
+        of a round for each test.
+        """
+        self.store = SessionStore(capacity=4)
+        self.game = Game()
+        self.game.player_name = "Gullbritt"
+        self.game.player_birthdate = "19901231"
+        self.game.player_age = 33
+        self.game.reset_round()
+        self.game.tries_count = 3
+        self.game.player_input = int(self.game.lucky_list[0])
+
+
+    def test_game_has_no_instance_dict(self):
+        """
+        Test that Game keeps its state in slots.
+
+        Assertion:
+        - A Game instance has no __dict__.
+        """
+        self.assertFalse(hasattr(self.game, "__dict__"))
+
+
+    def test_save_and_load(self):
+        """
+        Test that a game survives a round trip through the store.
+
+        Assertions:
+        - The loaded game holds the lucky_list as it was dealt, and
+          the numbers that were not guessed yet as its candidates.
+        - Every other attribute of the loaded game equals the saved one.
+        - The resumed round can be logged.
+        """
+        self.game.eliminate_guess()
+        slot = self.store.allocate()
+        self.store.save(slot, self.game)
+        loaded = self.store.load(slot)
+        self.assertEqual(loaded.lucky_list, self.game.lucky_list)
+        self.assertEqual(loaded.round_candidates().to_list(),
+                         self.game.candidates.to_list())
+        for name in ("player_name", "player_birthdate", "player_age",
+                     "lucky_number", "tries_count", "player_input"):
+            self.assertEqual(getattr(loaded, name), getattr(self.game, name))
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with RoundLog(os.path.join(directory.name, "rounds.log")) as log:
+            log.append(loaded, False)
+            self.assertEqual(log.records()["lucky_list"][0].tolist(),
+                             list(self.game.lucky_list))
+
+
+    def test_shared_store(self):
+        """
+        Test a store in shared memory seen from a second mapping.
+
+        Assertions:
+        - A session saved in one mapping is read from the other.
+        - Engine states round trip through a slot.
+        """
+        store = SessionStore.shared(capacity=4)
+        self.addCleanup(store.close, True)
+        slot = store.allocate()
+        store.save(slot, self.game)
+        attached = SessionStore.attach(store.shared_memory.name, capacity=4)
+        self.addCleanup(attached.close)
+        self.assertEqual(attached.load(slot).player_name, "Gullbritt")
+        self.assertEqual(len(attached), 1)
+
+        engine = GameEngine(rng=SessionRNG(2))
+        state, _ = engine.start()
+        for answer in ("Ada", "19900101"):
+            state, _ = engine.step(state, answer)
+        attached.save_state(slot, state)
+        state, _ = engine.step(state, str(state.lucky_list[0]))
+        attached.save_state(slot, state)
+        self.assertEqual(store.load_state(slot), state)
+
+
+    def test_allocate_and_release(self):
+        """
+        Test handing out and freeing slots.
+
+        Assertions:
+        - The store counts the slots in use.
+        - A released slot is cleared and can be handed out again.
+        - Allocating from a full store raises MemoryError.
+        """
+        slots = [self.store.allocate() for _ in range(4)]
+        self.assertEqual(len(self.store), 4)
+        with self.assertRaises(MemoryError):
+            self.store.allocate()
+
+        self.store.save(slots[1], self.game)
+        self.store.release(slots[1])
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.player_names[slots[1]], b"")
+        self.assertEqual(self.store.allocate(), slots[1])
+
+
+    def test_save_rejects_long_lists(self):
+        """
+        Test saving a lucky_list longer than the store allows.
+
+        Assertion:
+        - Method raises a ValueError.
+        """
+        self.game.lucky_list.extend([1, 2, 3])
+        self.game.candidates = None
+        with self.assertRaises(ValueError):
+            self.store.save(self.store.allocate(), self.game)
+
+
+    def test_save_rejects_values_that_do_not_fit(self):
+        """
+        Test saving values wider than the store's columns.
+
+        Assertions:
+        - A guess wider than 64 bits raises a ValueError.
+        - A negative age, from a birthdate in the future, is stored.
+        """
+        slot = self.store.allocate()
+        self.game.player_input = 2 ** 64
+        with self.assertRaises(ValueError):
+            self.store.save(slot, self.game)
+        self.game.player_input = 2 ** 40
+        self.game.player_age = -4
+        self.game.tries_count = 70000
+        self.store.save(slot, self.game)
+        loaded = self.store.load(slot)
+        self.assertEqual((loaded.player_input, loaded.player_age,
+                          loaded.tries_count), (2 ** 40, -4, 70000))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from engine import (NAME_TOO_LONG, PHASE_GUESS, PHASE_PLAY_AGAIN,
+                    PROMPT_BIRTHDATE)
+from shards import HashRing, ShardManager
+
+
+
+class TestHashRing(unittest.TestCase):
+    """
+    A class for testing consistent hashing of players to workers.
+    """
+    def test_adding_a_node_moves_few_keys(self):
+        """
+        Test placing keys as nodes come and go.
+
+        Assertions:
+        - Every node gets a share of the keys.
+        - A new node only takes keys, and about its share of them.
+        - Removing it puts every key back where it was.
+        """
+        keys = [f"Player{index}" for index in range(4000)]
+        ring = HashRing(range(4))
+        before = {key: ring.owner(key) for key in keys}
+        self.assertEqual(set(before.values()), {0, 1, 2, 3})
+
+        ring.add(4)
+        moved = [key for key in keys if ring.owner(key) != before[key]]
+        self.assertTrue(all(ring.owner(key) == 4 for key in moved))
+        self.assertLess(len(moved), len(keys) / 3)
+
+        ring.remove(4)
+        self.assertEqual({key: ring.owner(key) for key in keys}, before)
+
+
+    def test_empty_ring(self):
+        with self.assertRaises(LookupError):
+            HashRing().owner("Ada")
+
+
+
+class TestShardManager(unittest.TestCase):
+    """
+    A class for testing sessions played in worker processes.
+    """
+    def setUp(self):
+        self.manager = ShardManager(workers=2, capacity=64, seed=5)
+        self.addCleanup(self.manager.close)
+        self.players = [f"Player{index}" for index in range(20)]
+
+
+    def register(self):
+        for answer in (None, "Ada", "19900101"):
+            effects = self.manager.submit(
+                [(player, answer) for player in self.players])
+        return effects
+
+
+    def test_sessions_in_shared_memory(self):
+        """
+        Test playing a batch of sessions over two workers.
+
+        Assertions:
+        - Every session is dealt a round, read from shared memory.
+        - Both workers hold sessions.
+        - A finished session frees its slot.
+        """
+        effects = self.register()
+        for player, player_effects in zip(self.players, effects):
+            state = self.manager.session(player)
+            self.assertEqual(state.phase, PHASE_GUESS)
+            self.assertEqual(player_effects[-2][0], "show_list")
+            self.assertEqual(sorted(player_effects[-2][1]),
+                             list(state.remaining))
+        self.assertEqual({number for number, _
+                          in self.manager.directory.values()}, {0, 1})
+
+        player = self.players[0]
+        lucky_number = self.manager.session(player).lucky_number
+        self.manager.submit([(player, str(lucky_number))])
+        self.assertEqual(self.manager.session(player).phase, PHASE_PLAY_AGAIN)
+        self.manager.submit([(player, "n")])
+        self.assertNotIn(player, self.manager.directory)
+        self.assertEqual(sum(len(worker.store)
+                             for worker in self.manager.workers.values()), 19)
+
+
+    def test_rebalance(self):
+        """
+        Test adding and removing workers in the middle of rounds.
+
+        Assertions:
+        - Sessions moved to a new worker keep their state.
+        - Removing a worker moves its sessions to the others.
+        - Moved sessions can be played on to the end of the round.
+        """
+        self.register()
+        before = {player: self.manager.session(player)
+                  for player in self.players}
+
+        number = self.manager.add_worker()
+        self.assertIn(number, {number for number, _
+                               in self.manager.directory.values()})
+        self.manager.remove_worker(0)
+        self.assertNotIn(0, {number for number, _
+                             in self.manager.directory.values()})
+        for player in self.players:
+            self.assertEqual(self.manager.session(player), before[player])
+
+        effects = self.manager.submit(
+            [(player, str(before[player].lucky_number))
+             for player in self.players])
+        for player_effects in effects:
+            self.assertEqual(player_effects[0][0], "congratulate")
+
+
+    def test_answers_the_store_can_not_hold(self):
+        """
+        Test answers that once stopped a worker.
+
+        Assertions:
+        - A name too long to store is asked for again.
+        - A birthdate in the future gives a negative age, which
+          is stored, and the session ends as underage.
+        - A step that fails returns an error effect, and the
+          worker goes on playing.
+        """
+        effects = self.manager.submit([("Long", None), ("Future", None)])
+        effects = self.manager.submit([("Long", "A" * 40),
+                                       ("Future", "Ada")])
+        self.assertEqual(effects[0][0], NAME_TOO_LONG)
+        effects = self.manager.submit([("Future", "20300101")])
+        self.assertEqual(effects[0], (("underage",), ("exit",)))
+
+        with ShardManager(workers=1, capacity=4, name_width=4) as manager:
+            manager.submit([("Ada", None)])
+            effects = manager.submit([("Ada", "Gullbritt")])
+            self.assertEqual(effects[0][0][0], "error")
+            effects = manager.submit([("Ada", "Ada")])
+            self.assertEqual(effects[0][-1], PROMPT_BIRTHDATE)
+
+
+    def test_unknown_player(self):
+        with self.assertRaises(KeyError):
+            self.manager.submit([("Nobody", "y")])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import numpy as np
+from simulation import generate_rounds, play_rounds, simulate_rounds
+
+
+
+class TestSimulation(unittest.TestCase):
+    """
+    A class for testing the headless simulation engine.
+    """
+    def test_generate_rounds(self):
+        """
+        Test that generate_rounds draws one lucky_list per row.
+
+        Assertions:
+        - The array has one row per round and one column per number.
+        - Every number is within the range [0, 100].
+        """
+        rng = np.random.default_rng(1)
+        lists = generate_rounds(1000, rng)
+        self.assertEqual(lists.shape, (1000, 10))
+        self.assertTrue(lists.min() >= 0)
+        self.assertTrue(lists.max() <= 100)
+
+
+    def test_play_rounds_only_lucky_numbers(self):
+        """
+        Test a round where every number is the lucky number.
+
+        Assertions:
+        - Every round is won on the first try.
+        """
+        lists = np.full((50, 10), 42)
+        result = play_rounds(lists, rng=np.random.default_rng(1))
+        self.assertTrue(result.won.all())
+        self.assertTrue((result.tries == 1).all())
+
+
+    def test_play_rounds_isolated_lucky_number(self):
+        """
+        Test a round where no other number is within 10 of the lucky number.
+
+        A single wrong guess leaves only the lucky number in the
+        shorter list, so every round ends on the first try and is
+        won about one time out of three.
+
+        Assertions:
+        - Every round ends on the first try.
+        - The win rate is close to 1/3.
+        """
+        lists = np.tile(np.array([0, 100, 50]), (30000, 1))
+        result = play_rounds(lists, rng=np.random.default_rng(1))
+        self.assertTrue((result.tries == 1).all())
+        self.assertAlmostEqual(result.win_rate(), 1 / 3, delta=0.02)
+
+
+    def test_play_rounds_shorter_list(self):
+        """
+        Test that wrong guesses shrink the list to the window.
+
+        With [0, 30, 40, 35] and lucky number 35, the shorter list
+        after a wrong guess holds at most 30, 40 and 35, so no round
+        can last longer than 3 tries. A wrong first guess always
+        leaves at least 2 numbers, so a round that ends on the
+        first try was won.
+
+        Assertions:
+        - No round takes more than 3 tries.
+        - Every round that ends on try 1 is won.
+        """
+        lists = np.tile(np.array([0, 30, 40, 35]), (10000, 1))
+        result = play_rounds(lists, rng=np.random.default_rng(1))
+        self.assertTrue(result.tries.max() <= 3)
+        self.assertTrue(result.won[result.tries == 1].all())
+
+
+    def test_simulate_rounds_reproducible(self):
+        """
+        Test that simulate_rounds is reproducible with a seed.
+
+        Assertions:
+        - Two runs with the same seed give the same results.
+        - The win and game over rates add up to 1.
+        """
+        first = simulate_rounds(10000, seed=7, chunk_size=3000)
+        second = simulate_rounds(10000, seed=7, chunk_size=3000)
+        self.assertTrue(np.array_equal(first.tries, second.tries))
+        self.assertTrue(np.array_equal(first.won, second.won))
+        self.assertAlmostEqual(first.win_rate() + first.game_over_rate(), 1)
+        self.assertEqual(first.tries_histogram().sum(), 10000)
+
+
+    def test_deterministic_strategies(self):
+        """
+        Test the strategies that do not depend on chance.
+
+        With [50, 20, 45, 90, 40] and lucky number 40, the shorter
+        list after a wrong guess is [50, 45, 40].
+
+        Assertions:
+        - "smallest" guesses 20 and then 40, winning on try 2.
+        - "largest" guesses 90, 50 and 45 and runs out of numbers.
+        - "median" guesses 45 and then 40, winning on try 2.
+        """
+        lists = np.array([[50, 20, 45, 90, 40]])
+        expected = {"smallest": (2, True), "largest": (3, False),
+                    "median": (2, True)}
+        for strategy, (tries, won) in expected.items():
+            result = play_rounds(lists, strategy=strategy)
+            self.assertEqual(result.tries[0], tries, strategy)
+            self.assertEqual(result.won[0], won, strategy)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
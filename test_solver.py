@@ -0,0 +1,121 @@
+import unittest
+from solver import Solver
+
+
+
+class TestSolver(unittest.TestCase):
+    """
+    A class for testing the Solver class.
+    """
+    def setUp(self):
+        """
+        This method sets up a new Solver for each test.
+        """
+        self.solver = Solver()
+
+
+    def test_single_number(self):
+        """
+        Test a list holding only the lucky number.
+
+        Assertion:
+        - The round is won on the first try.
+        """
+        self.assertEqual(self.solver.solve([50]), (1.0, 1.0))
+
+
+    def test_isolated_numbers(self):
+        """
+        Test a list where no two numbers are within 10 of each other.
+
+        Every wrong guess leaves the lucky number alone in the
+        shorter list, so only the first guess can win.
+
+        Assertion:
+        - The round is won one time in three, after one try.
+        """
+        win, tries = self.solver.solve([0, 100, 50])
+        self.assertAlmostEqual(win, 1 / 3)
+        self.assertAlmostEqual(tries, 1.0)
+
+
+    def test_duplicates(self):
+        """
+        Test a list where one number was drawn twice.
+
+        The duplicate 35 is twice as likely to be lucky, but
+        guessing 90 first always wins: if 90 is wrong, both 35s
+        are left in the shorter list and 35 must be lucky.
+
+        Assertions:
+        - The round is always won, in 1 + 2/3 tries on average.
+        - The best guess is 90.
+        """
+        win, tries = self.solver.solve([35, 35, 90])
+        self.assertAlmostEqual(win, 1.0)
+        self.assertAlmostEqual(tries, 5 / 3)
+        self.assertEqual(self.solver.best_guess([35, 35, 90]), 90)
+
+
+    def test_shorter_list_narrows_the_lucky_number(self):
+        """
+        Test a state after a wrong guess.
+
+        With [10, 20, 30] left and [10, 20] shown, only 10 gives
+        that shorter list (20 would also keep 30), so the lucky
+        number is known.
+
+        Assertions:
+        - The round is won for sure on the next try.
+        - The best guess is 10.
+        """
+        self.assertEqual(self.solver.solve([10, 20, 30], [10, 20]),
+                         (1.0, 1.0))
+        self.assertEqual(self.solver.best_guess([10, 20, 30], [10, 20]), 10)
+
+
+    def test_shifted_and_mirrored_states_share_the_memo(self):
+        """
+        Test that states differing by a shift or a mirror are
+        looked up instead of computed again.
+
+        Assertions:
+        - The shifted list is a memo hit with the same odds.
+        - The mirrored list is a memo hit with the same odds.
+        """
+        odds = self.solver.solve([10, 15, 20, 60])
+        hits = self.solver.hits
+        self.assertEqual(self.solver.solve([40, 45, 50, 90]), odds)
+        self.assertEqual(self.solver.hits, hits + 1)
+        self.assertEqual(self.solver.solve([0, 40, 45, 50]), odds)
+        self.assertEqual(self.solver.hits, hits + 2)
+
+
+    def test_memo_is_bounded(self):
+        """
+        Test that the memo table never grows above its size.
+
+        Assertion:
+        - The table holds at most maxsize states.
+        """
+        solver = Solver(maxsize=10)
+        solver.odds_table([[0, 5, 12, 20, 26, 33, 40, 44, 52, 61]])
+        self.assertLessEqual(solver.cache_info()["size"], 10)
+        self.assertGreater(solver.cache_info()["misses"], 10)
+
+
+    def test_odds_table(self):
+        """
+        Test computing the odds of several rounds.
+
+        Assertion:
+        - The table has a row of win probability and tries per round.
+        """
+        table = self.solver.odds_table([[50], [0, 100, 50]])
+        self.assertEqual(table.shape, (2, 2))
+        self.assertAlmostEqual(table[1, 0], 1 / 3)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
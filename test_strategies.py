@@ -0,0 +1,74 @@
+import unittest
+from game import GameConfig
+from strategies import evaluate_strategies
+
+
+
+class TestStrategies(unittest.TestCase):
+    """
+    A class for testing the strategy evaluator.
+    """
+    def test_evaluate_strategies(self):
+        """
+        Test evaluating strategies over several shards and workers.
+
+        Assertions:
+        - Every strategy plays every round.
+        - The win and game over rates add up to 1.
+        - The tries distribution adds up to 1.
+        """
+        reports = evaluate_strategies(["random", "median"], 25000,
+                                      workers=2, shard_size=10000, seed=3)
+        self.assertEqual(sorted(reports), ["median", "random"])
+        for report in reports.values():
+            self.assertEqual(report.rounds, 25000)
+            self.assertAlmostEqual(report.win_rate()
+                                   + report.game_over_rate(), 1)
+            self.assertAlmostEqual(report.tries_distribution().sum(), 1)
+            self.assertTrue(1 <= report.mean_tries() <= 10)
+
+
+    def test_evaluate_strategies_reproducible(self):
+        """
+        Test that a seed gives the same results whatever the
+        number of workers.
+
+        Assertion:
+        - One and two workers give the same tries histograms.
+        """
+        first = evaluate_strategies(["smallest"], 20000, workers=1,
+                                    shard_size=5000, seed=8)
+        second = evaluate_strategies(["smallest"], 20000, workers=2,
+                                     shard_size=5000, seed=8)
+        self.assertEqual(first["smallest"].wins_by_tries.tolist(),
+                         second["smallest"].wins_by_tries.tolist())
+        self.assertEqual(first["smallest"].losses_by_tries.tolist(),
+                         second["smallest"].losses_by_tries.tolist())
+
+
+    def test_configured_game(self):
+        """
+        Test evaluating a strategy on a configured game.
+
+        Assertion:
+        - The histograms have a bin per possible number of tries.
+        """
+        reports = evaluate_strategies(["random"], 1000, workers=1,
+                                      config=GameConfig(list_size=4))
+        self.assertEqual(len(reports["random"].wins_by_tries), 5)
+
+
+    def test_unknown_strategy(self):
+        """
+        Test evaluating a strategy that does not exist.
+
+        Assertion:
+        - A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            evaluate_strategies(["psychic"], 10)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
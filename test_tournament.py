@@ -0,0 +1,122 @@
+import unittest
+import numpy as np
+from engine import GameEngine, PHASE_GUESS
+from game import GameConfig
+from tournament import (GAME_OVER, OUTCOME_FINISHED, OUTCOME_GAME_OVER,
+                        OUTCOME_INVALID, OUTCOME_WIN, OUTCOME_WRONG, PLAYING,
+                        WON, Tournament)
+
+
+
+class TestTournament(unittest.TestCase):
+    """
+    A class for testing tournaments sharing one round.
+    """
+    def setUp(self):
+        # 12 is in the list twice, 40 is outside the window of 10
+        self.tournament = Tournament(4, numbers=[5, 12, 40, 12, 10])
+
+
+    def test_guesses(self):
+        """
+        Test a batch of guesses of every kind.
+
+        Assertions:
+        - A wrong guess removes one copy of the number only for
+          the entrant who made it.
+        - Invalid guesses cost a try, and a win keeps its try.
+        """
+        tournament = self.tournament
+        outcomes = tournament.guess([0, 1, 2, 3], [12, 99, 10, 40])
+        self.assertEqual(outcomes.tolist(), [OUTCOME_WRONG, OUTCOME_INVALID,
+                                             OUTCOME_WIN, OUTCOME_WRONG])
+        self.assertEqual(tournament.numbers_left(0), [5, 10, 12, 40])
+        self.assertEqual(tournament.numbers_left(1), [5, 10, 12, 12, 40])
+        self.assertEqual(tournament.tries_counts.tolist(), [2, 2, 1, 2])
+        self.assertEqual(tournament.window_counts.tolist(), [3, 4, 4, 4])
+
+        outcomes = tournament.guess([0, 2], [12, 5])
+        self.assertEqual(outcomes.tolist(), [OUTCOME_WRONG, OUTCOME_FINISHED])
+        outcomes = tournament.guess([0], [12])
+        self.assertEqual(outcomes.tolist(), [OUTCOME_INVALID])
+
+
+    def test_game_over(self):
+        """
+        Test an entrant who eliminates the window.
+
+        Assertion:
+        - The round ends in GAME OVER when fewer than two numbers
+          are left within the window, without counting another try.
+        """
+        tournament = self.tournament
+        for guess in (12, 12):
+            tournament.guess([3], [guess])
+        outcomes = tournament.guess([3], [5])
+        self.assertEqual(outcomes.tolist(), [OUTCOME_GAME_OVER])
+        self.assertEqual(tournament.states[3], GAME_OVER)
+        self.assertEqual(tournament.tries_counts[3], 3)
+
+
+    def test_ranking(self):
+        """
+        Test the ranking of the winners as they win.
+
+        Assertions:
+        - Winners are ranked by tries_count, ties sharing a place.
+        - Standings list the fewest tries first, ties in the
+          order they won.
+        """
+        tournament = self.tournament
+        tournament.guess([0, 1], [40, 10])
+        tournament.guess([0, 2], [10, 10])
+        tournament.guess([3], [10])
+        self.assertEqual([tournament.rank(player) for player in range(4)],
+                         [4, 1, 1, 1])
+        self.assertEqual(tournament.standings(3), [(1, 1), (2, 1), (3, 1)])
+        self.assertEqual(tournament.standings()[-1], (0, 2))
+        with self.assertRaises(ValueError):
+            tournament.guess([1, 1], [5, 5])
+
+
+    def test_plays_like_the_engine(self):
+        """
+        Test many entrants guessing at random against the engine.
+
+        Assertion:
+        - Every entrant ends with the outcome and tries_count the
+          engine gives for the same guesses.
+        """
+        rng = np.random.default_rng(8)
+        config = GameConfig(list_size=70, high=60)
+        numbers = rng.integers(0, 60, 70, endpoint=True).tolist()
+        players = 200
+        tournament = Tournament(players, config, numbers=numbers)
+        engine = GameEngine(config)
+        remaining = tuple(sorted(numbers))
+        window = sum(abs(number - numbers[-1]) <= config.window
+                     for number in numbers)
+        states = [engine.start()[0]._replace(
+            phase=PHASE_GUESS, lucky_list=tuple(numbers),
+            lucky_number=numbers[-1], remaining=remaining,
+            window_count=window) for _ in range(players)]
+
+        while (tournament.states == PLAYING).any():
+            playing = np.flatnonzero(tournament.states == PLAYING)
+            guesses = rng.choice(numbers + [-1], len(playing))
+            tournament.guess(playing, guesses)
+            for player, guess in zip(playing.tolist(), guesses.tolist()):
+                states[player], _ = engine.step(states[player], str(guess))
+
+        for player, state in enumerate(states):
+            self.assertEqual(state.tries_count,
+                             tournament.tries_counts[player])
+            self.assertEqual(tournament.states[player] == WON,
+                             state.window_count >= 2)
+            self.assertEqual(tournament.numbers_left(player),
+                             list(state.remaining))
+
+
+
+if __name__ == "__main__":
+    unittest.main()
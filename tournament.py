@@ -0,0 +1,275 @@
+import argparse
+import time
+import numpy as np
+from game import GameConfig, GUESS_INVALID, GUESS_WIN, GUESS_WRONG
+from rng import SessionRNG, thread_stream
+
+
+
+# The outcome of a guess, by index in OUTCOMES
+OUTCOME_INVALID = 0
+OUTCOME_WRONG = 1
+OUTCOME_WIN = 2
+OUTCOME_GAME_OVER = 3
+OUTCOME_FINISHED = 4
+OUTCOMES = (GUESS_INVALID, GUESS_WRONG, GUESS_WIN, "game_over", "finished")
+
+# The state of an entrant
+PLAYING = 0
+WON = 1
+GAME_OVER = 2
+
+
+
+class Tournament:
+    """
+    A class playing one round of Lucky Number with many entrants
+    guessing against the same lucky_list.
+
+    The round is dealt once and never changes. What each entrant
+    has eliminated is a bitset with one bit per number of the list,
+    the numbers in ascending order, so the copies of a number are
+    neighbouring bits and a wrong guess clears the lowest bit still
+    set among them, as Game removes one copy. An entrant costs a
+    few bytes: the bitset, the tries count, the count of numbers
+    left within the window and a state.
+
+    Guesses are handled in batches with array operations, and the
+    ranking of the winners by tries_count is kept up to date as
+    they win, so standings are read without sorting anyone.
+
+    Attributes:
+        config (GameConfig): The rules of the round.
+        lucky_list (tuple): The numbers of the round, in dealt order.
+        lucky_number (int): The lucky number, the last of the list.
+        players (int): The number of entrants, numbered from 0.
+        tries_counts (numpy.ndarray): The number of each entrant's
+            next try, or of the try that ended their round.
+        states (numpy.ndarray): PLAYING, WON or GAME_OVER per entrant.
+        window_counts (numpy.ndarray): How many numbers each entrant
+            has left within the window, the lucky number included.
+        bits (numpy.ndarray): The numbers each entrant has left, one
+            row of 64-bit words per entrant.
+    """
+    __slots__ = ("config", "lucky_list", "lucky_number", "players",
+                 "tries_counts", "states", "window_counts", "bits",
+                 "_sorted", "_values", "_value_masks", "_value_in_window",
+                 "_winners", "_win_counts")
+
+    def __init__(self, players, config=None, rng=None, numbers=None,
+                 deck=None):
+        """
+        Initialize the Tournament instance and deal its round.
+
+        Args:
+            players (int): The number of entrants.
+            config (GameConfig): The rules of the round.
+            rng (SessionRNG): The stream to deal the round from. The
+                stream shared by the current thread is used if not given.
+            numbers (list): The lucky_list to play instead of dealing
+                one, the lucky number last.
+            deck (RoundDeck): Pre-generated rounds to deal the round
+                from instead of drawing it, with its window count.
+        """
+        self.config = config if config is not None else GameConfig()
+        window_count = None
+        if numbers is None and deck is not None:
+            numbers, window_count = deck.deal(self.config)
+        elif numbers is None:
+            rng = rng if rng is not None else thread_stream()
+            numbers = rng.draw_numbers(self.config.list_size, self.config)
+        self.lucky_list = tuple(int(number) for number in numbers)
+        self.lucky_number = self.lucky_list[-1]
+        self.players = players
+
+        # Bit i stands for the i-th smallest number of the list
+        self._sorted = tuple(sorted(self.lucky_list))
+        size = len(self._sorted)
+        words = -(-size // 64)
+        values, starts, counts = np.unique(
+            np.array(self._sorted, dtype=np.int64), return_index=True,
+            return_counts=True)
+        self._values = values
+        self._value_masks = np.zeros((len(values), words), dtype=np.uint64)
+        for index, (start, count) in enumerate(zip(starts, counts)):
+            for bit in range(start, start + count):
+                self._value_masks[index, bit // 64] |= np.uint64(1 << bit % 64)
+        self._value_in_window = (np.abs(values - self.lucky_number)
+                                 <= self.config.window)
+        full = self._value_masks.sum(axis=0, dtype=np.uint64)
+
+        self.bits = np.tile(full, (players, 1))
+        self.tries_counts = np.ones(players, dtype=np.uint32)
+        self.states = np.zeros(players, dtype=np.uint8)
+        if window_count is None:
+            window_count = int(counts[self._value_in_window].sum())
+        self.window_counts = np.full(players, window_count, dtype=np.uint32)
+        # The winners by tries_count, in arrays in the order they won
+        self._winners = {}
+        self._win_counts = np.zeros(size + 2, dtype=np.int64)
+
+
+    def guess(self, players, guesses):
+        """
+        Handle one guess of each of a batch of entrants.
+
+        A guess outside the numbers an entrant has left is invalid
+        and costs a try, as in Game. An answer that is not a number
+        can be passed as any number outside the list.
+
+        Args:
+            players (numpy.ndarray): The entrants guessing, each at
+                most once per batch.
+            guesses (numpy.ndarray): The number each entrant picked.
+
+        Return:
+            numpy.ndarray:
+                The index in OUTCOMES of every guess's outcome.
+
+        Raises:
+            ValueError: If an entrant guesses twice in the batch.
+        """
+        players = np.asarray(players, dtype=np.intp)
+        guesses = np.asarray(guesses, dtype=np.int64)
+        # Marking every entrant of the batch is cheaper than sorting them
+        marks = np.zeros(self.players, dtype=bool)
+        marks[players] = True
+        if np.count_nonzero(marks) != len(players):
+            raise ValueError("An entrant can only guess once per batch.")
+        outcomes = np.full(len(players), OUTCOME_INVALID, dtype=np.uint8)
+
+        playing = self.states[players] == PLAYING
+        index = np.minimum(np.searchsorted(self._values, guesses),
+                           len(self._values) - 1)
+        owned = self.bits[players] & self._value_masks[index]
+        has = (owned != 0).any(axis=1) & (self._values[index] == guesses)
+        has &= playing
+        win = has & (guesses == self.lucky_number)
+        wrong = has & ~win
+
+        # Clear the lowest bit left of each wrong guess's number
+        rows = players[wrong]
+        wrong_owned = owned[wrong]
+        word = np.argmax(wrong_owned != 0, axis=1)
+        low_bit = wrong_owned[np.arange(len(rows)), word]
+        low_bit &= ~low_bit + np.uint64(1)
+        self.bits[rows, word] ^= low_bit
+        self.window_counts[rows] -= self._value_in_window[index[wrong]]
+        over = self.window_counts[rows] < 2
+
+        ended = win.copy()
+        ended[wrong] = over
+        outcomes[~playing] = OUTCOME_FINISHED
+        outcomes[wrong] = np.where(over, OUTCOME_GAME_OVER, OUTCOME_WRONG)
+        outcomes[win] = OUTCOME_WIN
+        self.states[rows[over]] = GAME_OVER
+        # Every try that does not end the round moves on to the next
+        self.tries_counts[players[playing & ~ended]] += 1
+        self._record_winners(players[win])
+        return outcomes
+
+
+    def _record_winners(self, winners):
+        """
+        Add winners to the ranking, those of one batch in entrant order.
+        """
+        if not len(winners):
+            return
+        self.states[winners] = WON
+        tries = self.tries_counts[winners]
+        if tries.max() >= len(self._win_counts):
+            grown = np.zeros(int(tries.max()) * 2, dtype=np.int64)
+            grown[:len(self._win_counts)] = self._win_counts
+            self._win_counts = grown
+        np.add.at(self._win_counts, tries, 1)
+        # Keep the winners of the batch as one array per tries_count
+        order = np.argsort(tries, kind="stable")
+        counts, starts = np.unique(tries[order], return_index=True)
+        for count, group in zip(counts.tolist(),
+                                np.split(winners[order], starts[1:])):
+            self._winners.setdefault(count, []).append(group)
+
+
+    def rank(self, player):
+        """
+        Return an entrant's place among the winners, winners with
+        the same tries_count sharing a place.
+
+        Args:
+            player (int): The entrant.
+
+        Return:
+            int:
+                The place, 1 for the fewest tries, or None if the
+                entrant has not won.
+        """
+        if self.states[player] != WON:
+            return None
+        return int(self._win_counts[:self.tries_counts[player]].sum()) + 1
+
+
+    def standings(self, count=10):
+        """
+        Return the best winners so far.
+
+        Args:
+            count (int): The most winners to return.
+
+        Return:
+            list:
+                (entrant, tries_count) of the winners with the fewest
+                tries, those with the same tries in the order they won.
+        """
+        standings = []
+        for tries in sorted(self._winners):
+            for group in self._winners[tries]:
+                for player in group[:count - len(standings)].tolist():
+                    standings.append((player, tries))
+                if len(standings) == count:
+                    return standings
+        return standings
+
+
+    def numbers_left(self, player):
+        """
+        Return the numbers an entrant has not eliminated yet.
+
+        Args:
+            player (int): The entrant.
+
+        Return:
+            list:
+                The numbers left, in ascending order.
+        """
+        words = self.bits[player].tolist()
+        return [number for bit, number in enumerate(self._sorted)
+                if words[bit // 64] >> (bit % 64) & 1]
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play a tournament round with random guesses.")
+    parser.add_argument("--players", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = SessionRNG(args.seed)
+    tournament = Tournament(args.players, rng=rng)
+    choices = np.random.default_rng(args.seed)
+    everyone = np.arange(args.players)
+    batches = 0
+    start = time.perf_counter()
+    while True:
+        playing = everyone[tournament.states == PLAYING]
+        if not len(playing):
+            break
+        guesses = choices.choice(tournament.lucky_list, len(playing))
+        tournament.guess(playing, guesses)
+        batches += 1
+    elapsed = time.perf_counter() - start
+    print(f"{args.players:,} entrants finished in {batches} batches, "
+          f"{elapsed:.2f}s, {tournament.bits.nbytes / args.players:.0f} "
+          f"bytes of bitset each")
+    print(f"Winners: {int((tournament.states == WON).sum()):,}, "
+          f"top 5: {tournament.standings(5)}")